@@ -0,0 +1,144 @@
+import fnmatch
+import re
+import threading
+from collections import namedtuple
+
+from sequence import SEQUENCE_ADDRESS
+from unified_expressions import PARAM_ALIASES
+
+# Listener -> processor message with the drop counts since the last report
+DropReport = namedtuple('DropReport', ['counts', 'receive_time'])
+
+_OTHER = '<other>'
+
+
+def parse_patterns(specs):
+    """
+    Split --allow arguments into individual patterns.
+
+    Args:
+        specs (list): Strings with one or more comma-separated patterns
+
+    Returns:
+        list: Non-empty patterns
+    """
+    return [pattern.strip() for spec in specs for pattern in spec.split(',') if pattern.strip()]
+
+
+class AddressFilter:
+    """
+    Listener-side allowlist for OSC addresses.
+
+    An address passes when its parameter name (last path segment) is a
+    FACIAL_PARAMS name or alias, compared case-insensitively like
+    AddressResolver does, or when it matches one of the extra patterns.
+    Patterns with ``*``, ``?`` or ``[`` are globs over the full address;
+    anything else is an address prefix. Decisions are memoized per address,
+    so in steady state a check is one dict probe.
+
+    Dropped messages are only counted, per address, and handed out in
+    periodic reports so the processor can still show what was filtered.
+    A lock guards the memo and the counts, so one filter can serve the
+    worker threads of a ThreadingOSCUDPServer.
+    """
+
+    def __init__(self, patterns=(), alias_table=None, report_interval=1.0,
+                 max_addresses=4096, max_tracked=256):
+        """
+        Args:
+            patterns (iterable): Extra prefixes or globs to let through
+            alias_table (Mapping, optional): Name -> slot, defaults to PARAM_ALIASES
+            report_interval (float): Minimum seconds between drop reports
+            max_addresses (int): Maximum number of memoized decisions
+            max_tracked (int): Distinct dropped addresses counted individually
+                per report; the rest are counted as '<other>'
+        """
+        if alias_table is None:
+            alias_table = PARAM_ALIASES
+
+        self.names = frozenset(name.lower() for name in alias_table)
+        self.patterns = tuple(patterns)
+        self.prefixes = tuple(p for p in self.patterns if not any(c in p for c in '*?['))
+        globs = [p for p in self.patterns if p not in self.prefixes]
+        self.glob = re.compile('|'.join(fnmatch.translate(p) for p in globs)) if globs else None
+
+        self.report_interval = report_interval
+        self.max_addresses = max_addresses
+        self.max_tracked = max_tracked
+
+        self._lock = threading.Lock()
+        self._decisions = {}
+        self._pending = {}
+        self._next_report = 0.0
+
+        self.passed = 0
+        self.dropped = 0
+
+    def _decide(self, address):
+        if address == SEQUENCE_ADDRESS:
+            return True             # Load generator markers, needed for loss reports
+        if address.rsplit('/', 1)[-1].lower() in self.names:
+            return True
+        if self.prefixes and address.startswith(self.prefixes):
+            return True
+        return self.glob is not None and self.glob.match(address) is not None
+
+    def allows(self, address):
+        """
+        Check one address, counting it as passed or dropped.
+
+        Args:
+            address (str): Full OSC address
+
+        Returns:
+            bool: True if the message should be forwarded
+        """
+        with self._lock:
+            return self._allows(address)
+
+    def _allows(self, address):
+        allowed = self._decisions.get(address)
+        if allowed is None:
+            allowed = self._decide(address)
+            if len(self._decisions) >= self.max_addresses:
+                # Evict the oldest decision to keep the memo bounded
+                del self._decisions[next(iter(self._decisions))]
+            self._decisions[address] = allowed
+
+        if allowed:
+            self.passed += 1
+            return True
+
+        self.dropped += 1
+        pending = self._pending
+        if address in pending:
+            pending[address] += 1
+        elif len(pending) < self.max_tracked:
+            pending[address] = 1
+        else:
+            pending[_OTHER] = pending.get(_OTHER, 0) + 1
+        return False
+
+    def filter_batch(self, batch):
+        """Return the (address, value) pairs of a batch that pass."""
+        allows = self._allows
+        with self._lock:
+            return [item for item in batch if allows(item[0])]
+
+    def take_report(self, now):
+        """
+        Drop counts since the last report, at most once per report interval.
+
+        Args:
+            now (float): Current time.monotonic()
+
+        Returns:
+            dict: Address -> dropped messages, or None if nothing is due
+        """
+        with self._lock:
+            if now < self._next_report or not self._pending:
+                return None
+            self._next_report = now + self.report_interval
+            report = self._pending
+            self._pending = {}
+            return report
@@ -0,0 +1,296 @@
+import argparse
+import csv
+import logging
+import os
+import time
+from multiprocessing import Pool
+
+import numpy as np
+
+from classifier import EmotionModel
+from processor import FacialProcessor
+from recording import load_session, tick_boundaries
+from ringbuffer import RECORD_DTYPE
+from sender import NullSender
+from sentiment import HueBlender, get_emotion_engine
+from smoothing import FILTERS, make_filter
+
+FORMATS = ('npy', 'csv')
+
+# Per-worker state: a quiet logger and the most recently opened session
+_logger = logging.getLogger('analyze.worker')
+_session = {}
+
+
+def _init_worker():
+    # Sampled INFO blocks (breakdowns, hue details) are noise offline
+    logging.disable(logging.INFO)
+
+
+def _load(path):
+    records = _session.get(path)
+    if records is None:
+        _session.clear()
+        records = _session[path] = load_session(path)
+    return records
+
+
+def last_records(records):
+    """
+    Reduce records to the last one of every recognized slot, in arrival order.
+
+    The parameter state only depends on the latest value of each slot
+    (including the bit planes of binary parameters), so these records
+    rebuild the state reached after all of ``records``.
+
+    Args:
+        records (np.ndarray): RECORD_DTYPE records
+
+    Returns:
+        np.ndarray: At most one record per slot
+    """
+    records = records[records['slot'] >= 0]
+    _, last = np.unique(records['slot'][::-1], return_index=True)
+    return records[np.sort(len(records) - 1 - last)]
+
+
+def summarize_segment(job):
+    """Pool task: last record per slot of one record range of a session."""
+    path, begin, end = job
+    return last_records(_load(path)[begin:end])
+
+
+def analyze_chunk(job):
+    """
+    Pool task: score one range of ticks of a session.
+
+    The parameter state is rebuilt from ``job['initial']`` and the chunk's
+    records are applied tick by tick through a FacialProcessor, so address
+    resolution and binary decoding match live scoring. Frames are then
+    scored in one batch, blended and smoothed on recorded time. The first
+    ``job['warmup']`` ticks only prime the smoothing filter.
+
+    Returns:
+        tuple: (session times, raw hues, smoothed hues, scores) of the
+            ticks after the warm-up
+    """
+    processor = FacialProcessor(_logger, sender=NullSender(), model_path=job['model_path'])
+    processor.handle_records(job['initial'], live=False)
+    values = processor.values
+
+    # One plain copy of the chunk's records; slicing the memmap per tick is slow
+    offset = job['begin']
+    ends = job['ends'] - offset
+    records = np.array(_load(job['path'])[offset:offset + int(ends[-1])])
+
+    frames = np.empty((len(ends), len(values)))
+    begin = 0
+    for i, end in enumerate(ends.tolist()):
+        if end > begin:
+            processor.handle_records(records[begin:end], live=False)
+            begin = end
+        frames[i] = values
+
+    scores = processor.engine.score_batch(frames)
+    hues = np.fromiter(map(HueBlender(processor.engine.labels).blend, scores), dtype=np.float64, count=len(scores))
+
+    times = job['times']
+    update = make_filter(job['smoothing'], window=job['smoothing_window']).update
+    smoothed = np.fromiter(map(update, hues.tolist(), times.tolist()), dtype=np.float64, count=len(hues))
+
+    skip = job['warmup']
+    return times[skip:], hues[skip:], smoothed[skip:], scores[skip:]
+
+
+def plan_session(path, interval, chunk_ticks, warmup_ticks):
+    """
+    Split a session into chunks of ticks.
+
+    Each chunk replays from ``warmup_ticks`` before its first tick. The
+    records between consecutive replay starts form the segments whose
+    last-per-slot summaries give every chunk its starting state.
+
+    Returns:
+        dict: Tick grid, chunks as (replay start, first, end tick, first
+            record) and segment record ranges, or None for an empty session
+    """
+    records = load_session(path)
+    if len(records) == 0:
+        return None
+    times, ends = tick_boundaries(records['timestamp'], interval)
+
+    chunks = []
+    for first in range(0, len(ends), chunk_ticks):
+        replay = max(0, first - warmup_ticks)
+        begin = int(ends[replay - 1]) if replay else 0
+        chunks.append((replay, first, min(first + chunk_ticks, len(ends)), begin))
+
+    segments = [(path, previous[3], chunk[3]) for previous, chunk in zip(chunks, chunks[1:])]
+    return {'path': path, 'times': times, 'ends': ends, 'chunks': chunks, 'segments': segments}
+
+
+def timeline_dtype(labels):
+    """Columns of an output timeline: time, smoothed and raw hue, then every score."""
+    return np.dtype([('time', 'f8'), ('hue', 'f8'), ('hue_raw', 'f8')] + [(label, 'f8') for label in labels])
+
+
+class TimelineWriter:
+    """Write one session's timeline chunk by chunk, as .npy (structured) or .csv."""
+
+    def __init__(self, path, labels, ticks, output_format):
+        self.path = path
+        self.dtype = timeline_dtype(labels)
+        self.output_format = output_format
+        self.written = 0
+        if output_format == 'npy':
+            self._array = np.lib.format.open_memmap(path, mode='w+', dtype=self.dtype, shape=(ticks,))
+        else:
+            self._file = open(path, 'w', newline='', encoding='utf-8')
+            self._csv = csv.writer(self._file)
+            self._csv.writerow(self.dtype.names)
+
+    def write(self, times, hues, smoothed, scores):
+        if self.output_format == 'npy':
+            rows = self._array[self.written:self.written + len(times)]
+            rows['time'] = times
+            rows['hue'] = smoothed
+            rows['hue_raw'] = hues
+            for column, label in enumerate(self.dtype.names[3:]):
+                rows[label] = scores[:, column]
+        else:
+            self._csv.writerows(np.column_stack((times, smoothed, hues, scores)).tolist())
+        self.written += len(times)
+
+    def close(self):
+        if self.output_format == 'npy':
+            self._array.flush()
+            self._array = None
+        else:
+            self._file.close()
+
+
+def analyze_sessions(paths, output_dir, interval=1 / 30, output_format='npy', smoothing='circular_box',
+                     smoothing_window=10, model_path=None, workers=None, chunk_seconds=300.0,
+                     warmup_seconds=10.0, logger=None):
+    """
+    Score recorded sessions offline in a process pool.
+
+    Every session is cut into chunks of ``chunk_seconds`` of recorded time.
+    A first pool pass reduces the records between chunk starts to the last
+    value per slot, which the driver folds into each chunk's starting
+    state; a second pass scores the chunks. Both passes are independent per
+    chunk, so throughput scales with the number of workers. Box and
+    weighted filters are exact after ``smoothing_window`` warm-up ticks,
+    EMA and One Euro filters converge well within the default warm-up.
+
+    Args:
+        paths (list): Session files written with --record
+        output_dir (str): Directory for the timelines (<session name>.<format>)
+        interval (float): Seconds of recorded time between ticks
+        output_format (str): One of FORMATS
+        smoothing (str): Hue filter, one of smoothing.FILTERS
+        smoothing_window (int): Window size for box/weighted filters
+        model_path (str, optional): Score with a trained EmotionModel
+        workers (int, optional): Pool size, defaults to the CPU count
+        chunk_seconds (float): Recorded seconds per chunk
+        warmup_seconds (float): Recorded seconds replayed before each chunk
+        logger (logging.Logger, optional): Progress output
+
+    Returns:
+        dict: Sessions, records, ticks, wall time and throughput
+    """
+    if logger is None:
+        logger = logging.getLogger(__name__)
+    labels = EmotionModel.load(model_path).labels if model_path else get_emotion_engine().labels
+    chunk_ticks = max(1, int(round(chunk_seconds / interval)))
+    warmup_ticks = max(smoothing_window, int(round(warmup_seconds / interval)))
+    os.makedirs(output_dir, exist_ok=True)
+
+    start = time.perf_counter()
+    plans = [plan for plan in (plan_session(path, interval, chunk_ticks, warmup_ticks) for path in paths)
+             if plan is not None]
+    records = sum(int(plan['ends'][-1]) for plan in plans)
+    ticks = sum(len(plan['ends']) for plan in plans)
+
+    with Pool(workers, initializer=_init_worker) as pool:
+        # Pass 1: starting state of every chunk
+        summaries = iter(pool.map(summarize_segment, [segment for plan in plans for segment in plan['segments']]))
+        jobs = []
+        for plan in plans:
+            state = np.zeros(0, dtype=RECORD_DTYPE)
+            for replay, first, end, begin in plan['chunks']:
+                if replay:
+                    state = last_records(np.concatenate((state, next(summaries))))
+                jobs.append({
+                    'path': plan['path'],
+                    'initial': state,
+                    'begin': begin,
+                    'ends': plan['ends'][replay:end],
+                    'times': plan['times'][replay:end],
+                    'warmup': first - replay,
+                    'smoothing': smoothing,
+                    'smoothing_window': smoothing_window,
+                    'model_path': model_path,
+                })
+
+        # Pass 2: score the chunks, writing each session as its chunks arrive
+        results = pool.imap(analyze_chunk, jobs)
+        for plan in plans:
+            name = os.path.splitext(os.path.basename(plan['path']))[0]
+            writer = TimelineWriter(os.path.join(output_dir, f"{name}.{output_format}"), labels,
+                                    len(plan['ends']), output_format)
+            dominant = np.zeros(len(labels), dtype=np.int64)
+            for _ in plan['chunks']:
+                times, hues, smoothed, scores = next(results)
+                writer.write(times, hues, smoothed, scores)
+                dominant += np.bincount(scores.argmax(axis=1), minlength=len(labels))
+            writer.close()
+
+            shares = ", ".join(f"{labels[i]} {dominant[i] / writer.written:.0%}"
+                               for i in np.argsort(-dominant)[:3] if dominant[i])
+            logger.info(f"{plan['path']}: {writer.written} ticks, {len(plan['chunks'])} chunks -> {writer.path} "
+                        f"(dominant: {shares})")
+
+    elapsed = time.perf_counter() - start
+    return {
+        'sessions': len(plans),
+        'records': records,
+        'ticks': ticks,
+        'wall_seconds': elapsed,
+        'ticks_per_second': ticks / elapsed if elapsed > 0 else 0.0,
+        'records_per_second': records / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Score recorded sessions offline into emotion and hue timelines')
+    parser.add_argument('sessions', nargs='+', metavar='SESSION', help='Session files written with --record')
+    parser.add_argument('--output-dir', default='analysis', metavar='DIR',
+                        help='Where to write the timelines')
+    parser.add_argument('--format', default='npy', choices=FORMATS,
+                        help='npy: structured array with named columns; csv: same columns as text')
+    parser.add_argument('--interval', type=float, default=1 / 30,
+                        help='Seconds of recorded time between output frames')
+    parser.add_argument('--smoothing', default='circular_box', choices=FILTERS,
+                        help='Hue smoothing filter')
+    parser.add_argument('--smoothing-window', type=int, default=10,
+                        help='Window size (ticks) for box and weighted filters')
+    parser.add_argument('--model', default=None, metavar='PATH',
+                        help='Score with a trained classifier (see train_classifier.py)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Worker processes (default: CPU count)')
+    parser.add_argument('--chunk-seconds', type=float, default=300.0,
+                        help='Recorded seconds scored per task')
+    parser.add_argument('--warmup', type=float, default=10.0,
+                        help='Recorded seconds replayed before each chunk to prime the smoothing filter')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    logger = logging.getLogger('analyze')
+
+    stats = analyze_sessions(args.sessions, args.output_dir, args.interval, args.format, args.smoothing,
+                             args.smoothing_window, args.model, args.workers, args.chunk_seconds,
+                             args.warmup, logger)
+    logger.info(f"{stats['sessions']} sessions, {stats['ticks']} ticks ({stats['records']} records) "
+                f"in {stats['wall_seconds']:.1f}s: {stats['ticks_per_second']:.0f} ticks/s, "
+                f"{stats['records_per_second']:.0f} records/s")
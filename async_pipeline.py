@@ -0,0 +1,88 @@
+import asyncio
+import time
+import traceback
+
+from pythonosc import dispatcher, osc_server
+
+from address_filter import AddressFilter
+from diagnostics import stop_queue_logging
+from processor import FacialProcessor, setup_logging, add_scheduler_gauges
+from scheduler import TickScheduler
+from sender import OSCSender
+
+
+def handle_osc(processor, address, *args, address_filter=None):
+    try:
+        receive_time = time.monotonic()
+        if address_filter is not None and not address_filter.allows(address):
+            report = address_filter.take_report(receive_time)
+            if report is not None:
+                processor.record_dropped(report)
+            return
+        processor.handle_message(address, args[0], receive_time)
+    except Exception as e:
+        processor.error_tracking['processing_errors'] += 1
+        processor.logger.error(f"Processing Error: {str(e)}")
+        processor.logger.error(traceback.format_exc())
+
+
+async def tick_loop(processor, scheduler):
+    """Run scoring and sending on a fixed-rate loop timer."""
+    while True:
+        await asyncio.sleep(scheduler.time_until_deadline())
+
+        try:
+            scheduler.run_tick(processor.tick)
+        except Exception as e:
+            processor.error_tracking['processing_errors'] += 1
+            processor.logger.error(f"Processing Error: {str(e)}")
+            processor.logger.error(traceback.format_exc())
+
+
+async def run_pipeline(ip, port, debug_level=1, throttle_ms=1000,
+                       send_ip="127.0.0.1", send_port=9000, log_options=None, rate_hz=None,
+                       allow=None, **processor_options):
+    """
+    Listener and processor in a single asyncio event loop.
+
+    Incoming datagrams update the parameter state in place from the UDP
+    protocol callback, and a loop timer runs scoring and sending, so there
+    is no Queue hop or serialization between the two. With ``allow``, an
+    AddressFilter drops non-facial traffic before the processor sees it.
+    """
+    # Setup logging
+    logger = setup_logging(debug_level, **(log_options or {}))
+    logger.info(f"Starting facial parameter processor (asyncio mode)")
+    logger.info(f"Debug Level: {debug_level}, Throttle: {throttle_ms}ms")
+
+    sender = OSCSender(send_ip, send_port, verbose=debug_level >= 2)
+    processor = FacialProcessor(logger, throttle_ms, sender=sender, **processor_options)
+
+    address_filter = AddressFilter(allow) if allow is not None else None
+
+    disp = dispatcher.Dispatcher()
+    disp.set_default_handler(lambda addr, *args: handle_osc(processor, addr, *args,
+                                                            address_filter=address_filter))
+
+    server = osc_server.AsyncIOOSCUDPServer((ip, port), disp, asyncio.get_running_loop())
+    transport, _ = await server.create_serve_endpoint()
+    print(f"Listening for OSC messages on {ip}:{port}...")
+
+    # Tick at the fixed rate if given, otherwise once per throttle interval
+    scheduler = TickScheduler(rate_hz or 1000 / throttle_ms)
+    scheduler.add_stage(lambda: logger.info("Scheduler: %s", scheduler.stats()), every_seconds=10)
+    add_scheduler_gauges(processor, scheduler)
+
+    try:
+        await tick_loop(processor, scheduler)
+    finally:
+        transport.close()
+        if processor.metrics is not None:
+            processor.metrics.close()
+        processor.state.close()
+        sender.close()
+        stop_queue_logging()
+
+
+def start_async_pipeline(ip, port, debug_level=1, throttle_ms=1000, **options):
+    asyncio.run(run_pipeline(ip, port, debug_level, throttle_ms, **options))
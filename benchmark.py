@@ -0,0 +1,408 @@
+from multiprocessing import Queue, Process
+from collections import deque
+import argparse
+import datetime
+import json
+import logging
+import platform
+import random
+import socket
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+
+from listener import start_listener, start_fast_listener
+from processor import process_data, FacialProcessor
+from resolver import AddressResolver
+from ringbuffer import RECORD_DTYPE
+from sender import OSCSender, NullSender
+from osc_decoder import OSCDecoder
+from profiling import AllocationCounter
+from sentiment import calculate_emotion_scores, calculate_emotion_hue, smooth_value
+from smoothing import make_filter
+from unified_expressions import FACIAL_PARAMS, PARAM_NAMES
+
+IP = "127.0.0.1"
+PARAMETER_PREFIX = "/avatar/parameters/"
+
+# Forwarded probe values encode the message sequence number exactly in float32
+PROBE_ADDRESS = PARAMETER_PREFIX + "JawOpen"
+PROBE_SCALE = 2.0 ** -24
+
+# Most bytes a steady-state tick may have allocated at any point. The tick
+# path allocates no arrays, containers or strings; the budget only leaves
+# room for untracked transient Python ints and floats (about 250 B mean,
+# 410 B at most). One dict of scores or one NumPy reduction temporary
+# already exceeds it.
+TICK_PEAK_BUDGET = 512
+
+
+def summarize(samples_ns, operations=1):
+    """
+    Latency summary of per-call timings.
+
+    Args:
+        samples_ns (np.ndarray): Nanoseconds per timed call
+        operations (int): Operations per timed call
+
+    Returns:
+        dict: us/op and percentiles (microseconds per call)
+    """
+    samples_us = np.asarray(samples_ns, dtype=np.float64) / 1000
+    total = samples_us.sum()
+    return {
+        'calls': len(samples_us),
+        'us_per_op': total / (len(samples_us) * operations),
+        'ops_per_sec': len(samples_us) * operations / (total / 1e6) if total > 0 else 0.0,
+        'p50_us': float(np.percentile(samples_us, 50)),
+        'p99_us': float(np.percentile(samples_us, 99)),
+        'p999_us': float(np.percentile(samples_us, 99.9)),
+        'max_us': float(samples_us.max()),
+    }
+
+
+def bench(func, args_list, warmup=100, operations=1):
+    """
+    Time ``func`` once per argument tuple.
+
+    Args:
+        func (callable): Function under test
+        args_list (list): Argument tuples, one per call (cycled for warmup)
+        warmup (int): Untimed calls before measuring
+        operations (int): Operations per call, e.g. a batch size
+
+    Returns:
+        dict: See summarize
+    """
+    for i in range(warmup):
+        func(*args_list[i % len(args_list)])
+
+    clock = time.perf_counter_ns
+    samples = np.empty(len(args_list), dtype=np.int64)
+    for i, args in enumerate(args_list):
+        start = clock()
+        func(*args)
+        samples[i] = clock() - start
+    return summarize(samples, operations)
+
+
+def random_frames(count, seed=0):
+    """Random parameter dicts in the shape the processor historically passed around."""
+    rng = random.Random(seed)
+    return [{name: rng.random() for name in FACIAL_PARAMS} for _ in range(count)]
+
+
+def run_micro(iterations=10000, batch_size=256, seed=0):
+    """
+    Micro-benchmarks of the scoring, smoothing and resolution stages.
+
+    Returns:
+        dict: Benchmark name -> summary
+    """
+    rng = random.Random(seed)
+    results = {}
+    logger = logging.getLogger('benchmark')
+    logger.setLevel(logging.ERROR)           # Unrecognized-parameter warnings are expected here
+
+    frames = random_frames(min(iterations, 1000), seed)
+    frame_args = [(frames[i % len(frames)],) for i in range(iterations)]
+    results['calculate_emotion_scores'] = bench(calculate_emotion_scores, frame_args)
+
+    array_args = [(np.array(list(frames[i % len(frames)].values())),) for i in range(min(iterations, 1000))]
+    array_args = [array_args[i % len(array_args)] for i in range(iterations)]
+    results['calculate_emotion_scores_array'] = bench(calculate_emotion_scores, array_args)
+
+    score_args = [(calculate_emotion_scores(frame)[0],) for frame in frames]
+    score_args = [score_args[i % len(score_args)] for i in range(iterations)]
+    results['calculate_emotion_hue'] = bench(calculate_emotion_hue, score_args)
+
+    history = deque(maxlen=10)
+    hue_args = [(history, rng.random()) for _ in range(iterations)]
+    results['smooth_value'] = bench(smooth_value, hue_args)
+
+    hue_filter = make_filter('circular_box')
+    results['hue_filter_update'] = bench(hue_filter.update, [(rng.random(),) for _ in range(iterations)])
+
+    # Parameter resolution as done per message in process_data
+    names = list(PARAM_NAMES) + [f"Unknown{i}" for i in range(16)]
+    addresses = [PARAMETER_PREFIX + rng.choice(names) for _ in range(iterations)]
+    resolver = AddressResolver()
+    results['resolve_address'] = bench(resolver.resolve, [(address,) for address in addresses])
+
+    cold_addresses = [(PARAMETER_PREFIX + f"Cold{i}",) for i in range(iterations)]
+    results['resolve_address_uncached'] = bench(AddressResolver().resolve, cold_addresses, warmup=0)
+
+    processor = FacialProcessor(logger, sender=NullSender())
+    message_args = [(address, rng.random()) for address in addresses]
+    results['handle_message'] = bench(processor.handle_message, message_args)
+
+    batches = []
+    for _ in range(max(1, iterations // batch_size)):
+        records = np.zeros(batch_size, dtype=RECORD_DTYPE)
+        records['slot'] = [rng.randrange(-1, len(PARAM_NAMES)) for _ in range(batch_size)]
+        records['value'] = [rng.random() for _ in range(batch_size)]
+        batches.append((records,))
+    results['handle_records'] = bench(processor.handle_records, batches, warmup=10, operations=batch_size)
+
+    results['tick'] = bench(processor.update, [()] * iterations)
+
+    return results
+
+
+def check_tick_allocations(ticks=2000, batch_size=8, seed=0, peak_budget=TICK_PEAK_BUDGET):
+    """
+    Allocation regression check for the steady-state tick path.
+
+    Ticks run under tracemalloc with the bundle output enabled, alternating
+    between ticks after a batch of new values (rescoring) and ticks with
+    nothing new (skipped rescore). Input is applied outside the measured
+    region, so only ``FacialProcessor.tick`` is counted. Run by
+    tests/test_tick_allocations.py.
+
+    Args:
+        ticks (int): Measured ticks per case
+        batch_size (int): Records applied before each rescoring tick
+        seed (int): Random seed for the input values
+        peak_budget (int): Most transient bytes a tick may allocate
+
+    Returns:
+        dict: Per-case AllocationCounter summaries, plus 'passed'
+    """
+    rng = np.random.default_rng(seed)
+    logger = logging.getLogger('benchmark')
+    logger.setLevel(logging.ERROR)
+    sender = OSCSender(IP, _free_port())
+    processor = FacialProcessor(logger, sender=sender, output_prefix='/avatar/parameters/mood')
+
+    # Only weighted slots, so every batch actually changes the scores
+    slots = np.flatnonzero(processor.scorer.relevant)
+    batches = []
+    for _ in range(ticks):
+        records = np.zeros(batch_size, dtype=RECORD_DTYPE)
+        records['slot'] = rng.choice(slots, batch_size)
+        records['value'] = rng.random(batch_size)
+        records['timestamp'] = time.monotonic()
+        batches.append(records)
+
+    # Warm up caches, histograms and lazily built templates
+    for records in batches[:200]:
+        processor.handle_records(records)
+        processor.tick()
+
+    results = {}
+    tracemalloc.start()
+    try:
+        for case in ('rescore', 'steady'):
+            counter = AllocationCounter()
+            start = tracemalloc.get_traced_memory()[0]
+            for records in batches:
+                if case == 'rescore':
+                    processor.handle_records(records)
+                counter.begin()
+                processor.tick()
+                counter.end()
+            results[case] = counter.summary()
+            results[case]['net_bytes'] = tracemalloc.get_traced_memory()[0] - start
+    finally:
+        tracemalloc.stop()
+        sender.close()
+
+    results['peak_budget'] = peak_budget
+    results['passed'] = all(results[case]['peak_bytes_max'] <= peak_budget for case in ('rescore', 'steady'))
+    return results
+
+
+def _free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind((IP, 0))
+        return sock.getsockname()[1]
+
+
+def _capture(sock, send_times, received, stop):
+    """Collect forwarded probe messages and their arrival times."""
+    decoder = OSCDecoder()
+    buf = bytearray(65536)
+    out = []
+    clock = time.perf_counter_ns
+    while not stop.is_set():
+        try:
+            size = sock.recv_into(buf)
+        except socket.timeout:
+            continue
+        now = clock()
+        out.clear()
+        decoder.decode(buf, size, out)
+        for address, value in out:
+            if address == PROBE_ADDRESS:
+                received.append((int(round(value / PROBE_SCALE)), now))
+
+
+def run_end_to_end(messages=20000, rate=None, listener='pythonosc', throttle_ms=10, settle=2.0):
+    """
+    Push OSC over loopback UDP through the listener and process_data processes.
+
+    The processor forwards every recognized input to a local capture socket.
+    Each probe carries its sequence number in the value, so the capture side
+    measures per-message latency and loss.
+
+    Args:
+        messages (int): Number of probe messages
+        rate (float, optional): Send rate in messages/sec (None = as fast as possible)
+        listener (str): 'pythonosc' (start_listener) or 'fast' (start_fast_listener)
+        throttle_ms (int): Processor throttle interval
+        settle (float): Seconds to wait for stragglers after the last send
+
+    Returns:
+        dict: Throughput, loss and latency summary
+    """
+    if messages >= 1 << 24:
+        raise ValueError("At most 2**24 - 1 probe messages fit the float32 encoding")
+
+    listen_port = _free_port()
+    capture = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    capture.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+    capture.bind((IP, 0))
+    capture.settimeout(0.1)
+    capture_port = capture.getsockname()[1]
+
+    queue = Queue()
+    listener_target = start_fast_listener if listener == 'fast' else start_listener
+    processes = [
+        Process(target=listener_target, args=(queue, IP, listen_port), daemon=True),
+        Process(target=process_data, args=(queue, 0, throttle_ms, IP, capture_port),
+                kwargs={'forward': True}, daemon=True),
+    ]
+    for process in processes:
+        process.start()
+
+    send_times = np.zeros(messages, dtype=np.int64)
+    received = []
+    stop = threading.Event()
+    capture_thread = threading.Thread(target=_capture, args=(capture, send_times, received, stop), daemon=True)
+    capture_thread.start()
+
+    sender = OSCSender(IP, listen_port)
+    try:
+        # Wait until the pipeline forwards a warmup probe
+        deadline = time.monotonic() + 10
+        while not received and time.monotonic() < deadline:
+            sender.send(PROBE_ADDRESS, 0.0)
+            time.sleep(0.05)
+        if not received:
+            raise RuntimeError("Pipeline did not start within 10 seconds")
+        time.sleep(0.2)
+        received.clear()
+
+        clock = time.perf_counter_ns
+        interval_ns = int(1e9 / rate) if rate else 0
+        start = clock()
+        for seq in range(1, messages + 1):
+            if interval_ns:
+                target = start + seq * interval_ns
+                while clock() < target:
+                    pass
+            send_times[seq - 1] = clock()
+            sender.send(PROBE_ADDRESS, seq * PROBE_SCALE)
+        send_elapsed = (clock() - start) / 1e9
+
+        # Wait until nothing new arrives
+        last_count = -1
+        while len(received) != last_count:
+            last_count = len(received)
+            time.sleep(settle)
+    finally:
+        stop.set()
+        capture_thread.join()
+        capture.close()
+        sender.close()
+        for process in processes:
+            process.terminate()
+            process.join()
+
+    probes = [(seq, when) for seq, when in received if 1 <= seq <= messages]
+    unique = {seq for seq, _ in probes}
+    result = {
+        'listener': listener,
+        'messages_sent': messages,
+        'messages_received': len(unique),
+        'loss_fraction': 1 - len(unique) / messages,
+        'send_rate': messages / send_elapsed if send_elapsed > 0 else 0.0,
+    }
+    if probes:
+        arrivals = np.array([when for _, when in probes], dtype=np.int64)
+        latencies = arrivals - send_times[np.array([seq - 1 for seq, _ in probes])]
+        span = (arrivals.max() - send_times[0]) / 1e9
+        result['messages_per_sec'] = len(unique) / span if span > 0 else 0.0
+        result['latency'] = summarize(latencies)
+    return result
+
+
+def print_results(results):
+    for name, stats in results.get('micro', {}).items():
+        print(f"{name:34s} {stats['us_per_op']:9.3f} us/op  p50 {stats['p50_us']:8.2f}  "
+              f"p99 {stats['p99_us']:8.2f}  p999 {stats['p999_us']:8.2f} us")
+    for case in ('rescore', 'steady'):
+        if case in results.get('allocations', {}):
+            stats = results['allocations'][case]
+            print(f"tick allocations[{case}] peak {stats['peak_bytes_mean']:.0f} B mean, "
+                  f"{stats['peak_bytes_max']} B max (budget {results['allocations']['peak_budget']} B); "
+                  f"net {stats['blocks_mean']:.2f} blocks/tick")
+    for stats in results.get('end_to_end', []):
+        print(f"end_to_end[{stats['listener']}] sent {stats['messages_sent']} at {stats['send_rate']:.0f} msg/s, "
+              f"received {stats['messages_received']} ({stats['loss_fraction'] * 100:.2f}% loss)")
+        if 'latency' in stats:
+            latency = stats['latency']
+            print(f"  {stats['messages_per_sec']:.0f} msg/s  latency p50 {latency['p50_us']:.1f}  "
+                  f"p99 {latency['p99_us']:.1f}  p999 {latency['p999_us']:.1f} us")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark the listener -> processor -> sender pipeline')
+    parser.add_argument('--iterations', type=int, default=10000,
+                        help='Calls per micro-benchmark')
+    parser.add_argument('--messages', type=int, default=20000,
+                        help='Messages sent in the end-to-end benchmark')
+    parser.add_argument('--rate', type=float, default=None, metavar='MSG_PER_SEC',
+                        help='End-to-end send rate (default: as fast as possible)')
+    parser.add_argument('--listener', action='append', choices=['pythonosc', 'fast'],
+                        help='Listener(s) for the end-to-end benchmark (default: pythonosc); may be repeated')
+    parser.add_argument('--skip-micro', action='store_true',
+                        help='Only run the end-to-end benchmark')
+    parser.add_argument('--skip-e2e', action='store_true',
+                        help='Only run the micro-benchmarks')
+    parser.add_argument('--check-allocations', action='store_true',
+                        help='Only run the tick allocation regression check (writes no files) and '
+                             f'exit non-zero if a tick allocates more than {TICK_PEAK_BUDGET} bytes')
+    parser.add_argument('--output', default='benchmark_results.json', metavar='PATH',
+                        help='Write results as JSON to PATH')
+    args = parser.parse_args()
+
+    results = {
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'args': vars(args),
+    }
+
+    if args.check_allocations:
+        results['allocations'] = check_tick_allocations()
+        print_results(results)
+        if not results['allocations']['passed']:
+            raise SystemExit("Tick allocation check failed: a tick exceeded the allocation budget")
+        raise SystemExit(0)
+
+    if not args.skip_micro:
+        results['micro'] = run_micro(args.iterations)
+    if not args.skip_e2e:
+        results['end_to_end'] = [
+            run_end_to_end(args.messages, args.rate, listener)
+            for listener in (args.listener or ['pythonosc'])
+        ]
+
+    print_results(results)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
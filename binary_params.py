@@ -0,0 +1,121 @@
+from unified_expressions import PARAM_ALIASES
+
+# VRCFT binary parameters: base name -> (number of bits, has a Negative flag).
+# Bits are sent as <base>1, <base>2, <base>4, ... and <base>Negative.
+BINARY_PARAMS = {
+    "SmileSadLeft": (4, True),
+    "SmileSadRight": (4, True),
+    "SmileFrownLeft": (4, False),
+    "SmileFrownRight": (4, False),
+    "NoseSneerLeft": (3, False),
+    "NoseSneerRight": (3, False),
+    "NoseSneer": (3, False),
+    "CheekSquint": (3, False),
+}
+
+
+def build_lookup_table(bits, negative):
+    """
+    Precompute the decoded float for every bit combination.
+
+    Bit ``i`` of the index is the ``2**i`` plane; with ``negative`` the
+    next bit is the sign flag.
+
+    Returns:
+        tuple: Decoded value per bit mask
+    """
+    magnitude_mask = (1 << bits) - 1
+    sign_bit = 1 << bits
+    size = 1 << (bits + 1 if negative else bits)
+
+    table = []
+    for mask in range(size):
+        value = (mask & magnitude_mask) / magnitude_mask
+        if negative and mask & sign_bit:
+            value = -value
+        table.append(value)
+    return tuple(table)
+
+
+class BinaryParamDecoder:
+    """
+    Reconstruct VRCFT binary-encoded parameters from their bit planes.
+
+    Each group keeps its current bit mask. Every bit update flips one bit and
+    reads the decoded value from the group's lookup table. Callers store only
+    that value, in the slot of the base parameter.
+    """
+
+    def __init__(self, alias_table=None, binary_params=None):
+        """
+        Args:
+            alias_table (Mapping, optional): Name -> slot, defaults to PARAM_ALIASES
+            binary_params (dict, optional): Group table, defaults to BINARY_PARAMS
+        """
+        if alias_table is None:
+            alias_table = PARAM_ALIASES
+        if binary_params is None:
+            binary_params = BINARY_PARAMS
+
+        self.base_names = []
+        self.base_slots = []
+        self.tables = []
+        self.masks = []
+
+        # Bit slot -> (group, bit mask)
+        self.bit_slots = {}
+
+        for base_name, (bits, negative) in binary_params.items():
+            base_slot = alias_table.get(base_name)
+            if base_slot is None:
+                continue
+
+            group = len(self.base_slots)
+            self.base_names.append(base_name)
+            self.base_slots.append(base_slot)
+            self.tables.append(build_lookup_table(bits, negative))
+            self.masks.append(0)
+
+            suffixes = [str(1 << i) for i in range(bits)]
+            if negative:
+                suffixes.append("Negative")
+            for i, suffix in enumerate(suffixes):
+                bit_slot = alias_table.get(base_name + suffix)
+                if bit_slot is not None:
+                    self.bit_slots[bit_slot] = (group, 1 << i)
+
+    def slot_table(self, n_slots):
+        """
+        Per-slot bit info for fast lookups on the hot path.
+
+        Returns:
+            list: (group, bit mask) for bit slots, None elsewhere
+        """
+        table = [None] * n_slots
+        for slot, bit in self.bit_slots.items():
+            table[slot] = bit
+        return table
+
+    def apply(self, bit, value):
+        """
+        Apply one bit update.
+
+        Args:
+            bit (tuple): (group, bit mask) from ``bit_slots``
+            value (bool or float): Bit state (truthy / >= 0.5 means set)
+
+        Returns:
+            tuple: (base slot, decoded value)
+        """
+        group, bit_mask = bit
+        mask = self.masks[group]
+        if value >= 0.5:
+            mask |= bit_mask
+        else:
+            mask &= ~bit_mask
+        self.masks[group] = mask
+        return self.base_slots[group], self.tables[group][mask]
+
+    def value(self, group):
+        """Current decoded value of a group."""
+        return self.tables[group][self.masks[group]]
@@ -0,0 +1,305 @@
+import logging
+
+import numpy as np
+
+from sentiment import EMOTION_HUES, _as_float, clip_unit
+from unified_expressions import PARAM_NAMES
+
+
+def _softmax(logits, out):
+    """Row-wise softmax of a 2-D array into ``out``."""
+    np.subtract(logits, logits.max(axis=1, keepdims=True), out=out)
+    np.exp(out, out=out)
+    out /= out.sum(axis=1, keepdims=True)
+    return out
+
+
+class EmotionModel:
+    """
+    Learned emotion classifier over the full FACIAL_PARAMS vector.
+
+    Either a multinomial logistic regression (no hidden layer) or a small MLP
+    with one ReLU hidden layer, stored as plain NumPy arrays. It exposes the
+    same scoring interface as sentiment.EmotionEngine (``labels``, ``score``,
+    ``score_batch``, ``to_dict``, ...), so it can be passed to
+    ``calculate_emotion_scores`` as the engine. Scores are class
+    probabilities, which sum to 1 like the hand-tuned engine's.
+    """
+
+    def __init__(self, layers, labels, param_names=PARAM_NAMES):
+        """
+        Args:
+            layers (list): (weights, bias) per layer; weights are (inputs, outputs)
+            labels (tuple): Output labels, in column order
+            param_names (tuple): Slot -> parameter name of the input vector
+        """
+        self.layers = [(np.ascontiguousarray(w, dtype=np.float64), np.asarray(b, dtype=np.float64))
+                       for w, b in layers]
+        self.labels = tuple(labels)
+        self.emotions = tuple(label for label in self.labels if label != 'neutral')
+        self.param_names = tuple(param_names)
+
+        if self.layers[0][0].shape[0] != len(self.param_names):
+            raise ValueError("First layer does not match the parameter vector size")
+        if self.layers[-1][0].shape[1] != len(self.labels):
+            raise ValueError("Last layer does not match the number of labels")
+
+        # Scratch buffers for single-frame inference
+        self._input = np.zeros(len(self.param_names))
+        self._activations = [np.zeros(w.shape[1]) for w, _ in self.layers]
+        self._ones = np.ones(len(self.labels))
+        self._label_indices = tuple(range(len(self.labels)))
+        self._total = np.zeros(())
+
+    @property
+    def hidden_units(self):
+        return self.layers[0][0].shape[1] if len(self.layers) > 1 else 0
+
+    def vector_from_values(self, current_values):
+        """Build a slot-ordered value vector from a parameter dict (missing read as 0)."""
+        return np.array(
+            [_as_float(current_values.get(name, 0)) for name in self.param_names],
+            dtype=np.float64
+        )
+
+    def score(self, values):
+        """
+        Score a single frame.
+
+        Args:
+            values (np.ndarray): Parameter values in slot order
+
+        Returns:
+            np.ndarray: Class probabilities ordered like ``self.labels``
+        """
+        return self.score_into(values, np.empty(len(self.labels)))
+
+    def score_into(self, values, out):
+        """
+        Score a single frame into a preallocated array (no allocations).
+
+        Args:
+            values (np.ndarray): Parameter values in slot order
+            out (np.ndarray): Receives the class probabilities
+
+        Returns:
+            np.ndarray: ``out``
+        """
+        x = clip_unit(values, out=self._input)
+        last = len(self.layers) - 1
+        for i, (weights, bias) in enumerate(self.layers):
+            activations = self._activations[i]
+            np.dot(x, weights, out=activations)
+            activations += bias
+            if i < last:
+                np.maximum(activations, 0.0, out=activations)
+            x = activations
+
+        # Softmax; NumPy reductions (x.max()) allocate, a few items do not
+        self._total[()] = max(map(x.item, self._label_indices))
+        np.subtract(x, self._total, out=out)
+        np.exp(out, out=out)
+        out /= np.dot(self._ones, out, out=self._total)
+        return out
+
+    def score_batch(self, frames):
+        """
+        Score N frames at once.
+
+        Args:
+            frames (np.ndarray): Array of shape (N, n_params)
+
+        Returns:
+            np.ndarray: Array of shape (N, len(self.labels))
+        """
+        x = np.clip(np.asarray(frames, dtype=np.float64), 0.0, 1.0)
+        return _softmax(self._forward(x)[-1], np.empty((x.shape[0], len(self.labels))))
+
+    def _forward(self, x):
+        """Activations of every layer (logits last) for a batch."""
+        activations = []
+        last = len(self.layers) - 1
+        for i, (weights, bias) in enumerate(self.layers):
+            x = x @ weights + bias
+            if i < last:
+                x = np.maximum(x, 0.0)
+            activations.append(x)
+        return activations
+
+    def contributions(self, values, top=5):
+        """
+        Largest per-parameter logit contributions (logistic models only).
+
+        Returns:
+            dict: Label -> {param: contribution}, empty for MLPs
+        """
+        if len(self.layers) > 1:
+            return {}
+        weights = self.layers[0][0]
+        contributions = np.clip(values, 0.0, 1.0)[:, np.newaxis] * weights
+        breakdown = {}
+        for column, label in enumerate(self.labels):
+            strongest = np.argsort(-np.abs(contributions[:, column]))[:top]
+            breakdown[label] = {self.param_names[slot]: float(contributions[slot, column]) for slot in strongest}
+        return breakdown
+
+    def to_dict(self, scores):
+        """Map a score vector onto labels."""
+        return {label: float(score) for label, score in zip(self.labels, scores)}
+
+    def save(self, path):
+        """Write the model as a .npz archive."""
+        arrays = {}
+        for i, (weights, bias) in enumerate(self.layers):
+            arrays[f'w{i}'] = weights
+            arrays[f'b{i}'] = bias
+        np.savez(path, labels=np.array(self.labels), param_names=np.array(self.param_names), **arrays)
+
+    @classmethod
+    def load(cls, path, param_names=PARAM_NAMES):
+        """
+        Load a model saved with ``save``.
+
+        Input rows are remapped by parameter name, so a model keeps working
+        when FACIAL_PARAMS gains or reorders entries. Parameters the model
+        was not trained on get zero weight.
+        """
+        with np.load(path) as data:
+            labels = tuple(str(label) for label in data['labels'])
+            trained_names = [str(name) for name in data['param_names']]
+            layers = []
+            i = 0
+            while f'w{i}' in data:
+                layers.append((data[f'w{i}'], data[f'b{i}']))
+                i += 1
+
+        param_names = tuple(param_names)
+        if trained_names != list(param_names):
+            index = {name: row for row, name in enumerate(trained_names)}
+            first = layers[0][0]
+            remapped = np.zeros((len(param_names), first.shape[1]))
+            for slot, name in enumerate(param_names):
+                row = index.get(name)
+                if row is not None:
+                    remapped[slot] = first[row]
+            layers[0] = (remapped, layers[0][1])
+
+        return cls(layers, labels, param_names)
+
+
+class ModelScorer:
+    """
+    IncrementalScorer counterpart for an EmotionModel.
+
+    A model has no sparse weight structure to update incrementally, so any
+    changed slot triggers one full single-frame inference on the next tick.
+    """
+
+    def __init__(self, model):
+        self.engine = model
+        n_params = len(model.param_names)
+        self.relevant = np.ones(n_params, dtype=bool)
+        self.dirty = np.zeros(n_params, dtype=bool)
+        # Updated in place, like IncrementalScorer.scores
+        self.scores = model.score(np.zeros(n_params))
+        self.updates = 0
+        self.skipped = 0
+
+    def mark(self, slot):
+        self.dirty[slot] = True
+
+    def mark_many(self, slots):
+        self.dirty[slots] = True
+
+    def update(self, values):
+        """Rescore if any slot changed; returns True if it did."""
+        if not np.count_nonzero(self.dirty):
+            self.skipped += 1
+            return False
+        self.dirty.fill(False)
+        self.engine.score_into(values, self.scores)
+        self.updates += 1
+        return True
+
+
+def train_model(frames, targets, labels, hidden=0, epochs=500, learning_rate=0.01, l2=1e-4,
+                balance=True, seed=0, logger=None):
+    """
+    Fit an EmotionModel with full-batch Adam on the cross-entropy loss.
+
+    Args:
+        frames (np.ndarray): (N, n_params) parameter vectors in slot order
+        targets (np.ndarray): (N,) label indices into ``labels``
+        labels (tuple): Label names; each should have a hue in EMOTION_HUES
+        hidden (int): Hidden ReLU units (0 = multinomial logistic regression)
+        epochs (int): Gradient steps
+        learning_rate (float): Adam step size
+        l2 (float): Weight decay on the weight matrices
+        balance (bool): Weight samples by inverse label frequency
+        seed (int): Initialization seed
+        logger (logging.Logger, optional): Progress output
+
+    Returns:
+        EmotionModel: Trained model over PARAM_NAMES
+    """
+    if logger is None:
+        logger = logging.getLogger(__name__)
+    for label in labels:
+        if label not in EMOTION_HUES:
+            logger.warning(f"Label {label!r} has no hue in EMOTION_HUES and cannot drive the hue blend")
+
+    x = np.clip(np.asarray(frames, dtype=np.float64), 0.0, 1.0)
+    targets = np.asarray(targets)
+    n_samples, n_params = x.shape
+    n_labels = len(labels)
+    one_hot = np.zeros((n_samples, n_labels))
+    one_hot[np.arange(n_samples), targets] = 1.0
+
+    sample_weights = np.ones(n_samples)
+    if balance:
+        counts = np.bincount(targets, minlength=n_labels).astype(np.float64)
+        sample_weights = (n_samples / (n_labels * np.maximum(counts, 1)))[targets]
+    sample_weights /= sample_weights.sum()
+
+    rng = np.random.default_rng(seed)
+    sizes = [n_params] + ([hidden] if hidden else []) + [n_labels]
+    params = []
+    for fan_in, fan_out in zip(sizes[:-1], sizes[1:]):
+        params.append(rng.normal(0.0, np.sqrt(2.0 / fan_in), (fan_in, fan_out)) if hidden else np.zeros((fan_in, fan_out)))
+        params.append(np.zeros(fan_out))
+    moments = [np.zeros_like(p) for p in params]
+    velocities = [np.zeros_like(p) for p in params]
+    beta1, beta2, eps = 0.9, 0.999, 1e-8
+
+    for epoch in range(1, epochs + 1):
+        # Forward
+        activations = [x]
+        for i in range(0, len(params), 2):
+            z = activations[-1] @ params[i] + params[i + 1]
+            if i < len(params) - 2:
+                z = np.maximum(z, 0.0)
+            activations.append(z)
+        probabilities = _softmax(activations[-1], np.empty_like(activations[-1]))
+
+        # Backward (weighted mean cross-entropy)
+        grads = [None] * len(params)
+        delta = (probabilities - one_hot) * sample_weights[:, np.newaxis]
+        for i in range(len(params) - 2, -1, -2):
+            grads[i] = activations[i // 2].T @ delta + l2 * params[i]
+            grads[i + 1] = delta.sum(axis=0)
+            if i > 0:
+                delta = (delta @ params[i].T) * (activations[i // 2] > 0)
+
+        for p, g, m, v in zip(params, grads, moments, velocities):
+            m *= beta1
+            m += (1 - beta1) * g
+            v *= beta2
+            v += (1 - beta2) * g * g
+            p -= learning_rate * (m / (1 - beta1 ** epoch)) / (np.sqrt(v / (1 - beta2 ** epoch)) + eps)
+
+        if epoch % 100 == 0 or epoch == epochs:
+            loss = -float((sample_weights * np.log(probabilities[np.arange(n_samples), targets] + 1e-12)).sum())
+            logger.info(f"Epoch {epoch}: loss {loss:.4f}")
+
+    layers = [(params[i], params[i + 1]) for i in range(0, len(params), 2)]
+    return EmotionModel(layers, labels)
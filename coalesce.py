@@ -0,0 +1,175 @@
+import struct
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from ringbuffer import RECORD_DTYPE
+from unified_expressions import PARAM_NAMES
+
+# Header: unrecognized count, slot count, merged and filtered counts on
+# separate cache lines
+_INDEX = struct.Struct('<Q')
+_UNRECOGNIZED_OFFSET = 0
+_SLOTS_OFFSET = 64
+_MERGED_OFFSET = 128
+_FILTERED_OFFSET = 192
+_HEADER_SIZE = 256
+
+# Per slot: write sequence (scanned by the consumer), then value and timestamp
+_ENTRY = struct.Struct('<dd')
+_ENTRY_DTYPE = np.dtype([('value', '<f8'), ('timestamp', '<f8')])
+
+
+class LatestValueTable:
+    """
+    Latest-value-wins parameter table in shared memory.
+
+    Instead of queueing every message, the producer overwrites the slot's
+    value and bumps its write sequence. The consumer collects only the slots
+    whose sequence changed since its last read, so repeated updates to a
+    parameter coalesce and memory is fixed at one entry per slot however
+    bursty the input is. Superseded updates and unrecognized addresses are
+    counted rather than stored.
+
+    The producer side has the same ``push`` as RingBuffer, and ``pop_batch``
+    returns the same records, so the two transports are interchangeable.
+    One producer and one consumer, as with the ring.
+    """
+
+    def __init__(self, name=None, slots=None, create=True):
+        """
+        Args:
+            name (str, optional): Shared memory block name (generated if None)
+            slots (int, optional): Number of parameter slots (defaults to FACIAL_PARAMS)
+            create (bool): Create the block, or attach to an existing one
+        """
+        if create:
+            if slots is None:
+                slots = len(PARAM_NAMES)
+            size = _HEADER_SIZE + slots * (8 + _ENTRY.size)
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+            self._shm.buf[:size] = bytes(size)
+            _INDEX.pack_into(self._shm.buf, _SLOTS_OFFSET, slots)
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+            slots = _INDEX.unpack_from(self._shm.buf, _SLOTS_OFFSET)[0]
+
+        self.name = self._shm.name
+        self.slots = slots
+        self._owner = create
+        self._buf = self._shm.buf
+        self._entries_offset = _HEADER_SIZE + slots * 8
+
+        self._seq = np.ndarray((slots,), dtype='<u8', buffer=self._shm.buf, offset=_HEADER_SIZE)
+        self._entries = np.ndarray((slots,), dtype=_ENTRY_DTYPE, buffer=self._shm.buf,
+                                   offset=self._entries_offset)
+
+        # Producer-side copy of the sequences, so a push never reads shared memory
+        self._write_seq = self._seq.tolist()
+        self._unrecognized = _INDEX.unpack_from(self._buf, _UNRECOGNIZED_OFFSET)[0]
+        self._merged = _INDEX.unpack_from(self._buf, _MERGED_OFFSET)[0]
+        self._filtered = _INDEX.unpack_from(self._buf, _FILTERED_OFFSET)[0]
+
+        # Consumer side: sequences at the last read, and what was coalesced away
+        self._read_seq = self._seq.copy()
+        self.delivered = 0
+        self.coalesced = 0
+
+    @classmethod
+    def attach(cls, name):
+        """Attach to a table created by another process."""
+        return cls(name=name, create=False)
+
+    # Producer side
+
+    def push(self, slot, value, timestamp):
+        """
+        Overwrite one slot with its newest value.
+
+        Args:
+            slot (int): Parameter slot; negative slots (unrecognized addresses,
+                sequence markers) are only counted
+            value (float): Parameter value
+            timestamp (float): Receive time (time.monotonic())
+
+        Returns:
+            bool: Always True; older unread values are superseded, never blocked on
+        """
+        if slot < 0:
+            self._unrecognized += 1
+            _INDEX.pack_into(self._buf, _UNRECOGNIZED_OFFSET, self._unrecognized)
+            return True
+
+        _ENTRY.pack_into(self._buf, self._entries_offset + slot * _ENTRY.size, value, timestamp)
+        # Publish the new value only after it is fully written
+        seq = self._write_seq[slot] + 1
+        self._write_seq[slot] = seq
+        _INDEX.pack_into(self._buf, _HEADER_SIZE + slot * 8, seq)
+        return True
+
+    def count_merged(self, count):
+        """Count messages the producer folded into other records (binary bit planes)."""
+        self._merged += count
+        _INDEX.pack_into(self._buf, _MERGED_OFFSET, self._merged)
+
+    def count_filtered(self, count):
+        """Count messages the producer's address filter dropped."""
+        self._filtered += count
+        _INDEX.pack_into(self._buf, _FILTERED_OFFSET, self._filtered)
+
+    # Consumer side
+
+    def pending(self):
+        """Number of slots with an unread value."""
+        return int(np.count_nonzero(self._seq != self._read_seq))
+
+    def pop_batch(self, max_records=None):
+        """
+        Read the newest value of every slot written since the last call.
+
+        Returns:
+            np.ndarray: One RECORD_DTYPE record per changed slot (possibly empty)
+        """
+        seq = self._seq.copy()
+        changed = np.flatnonzero(seq != self._read_seq)
+        if max_records is not None:
+            changed = changed[:max_records]
+
+        records = np.empty(len(changed), dtype=RECORD_DTYPE)
+        if len(changed) == 0:
+            return records
+
+        writes = int((seq[changed] - self._read_seq[changed]).sum())
+        self._read_seq[changed] = seq[changed]
+        self.delivered += len(changed)
+        self.coalesced += writes - len(changed)
+
+        entries = self._entries[changed]
+        records['slot'] = changed
+        records['value'] = entries['value']
+        records['timestamp'] = entries['timestamp']
+        return records
+
+    @property
+    def unrecognized(self):
+        """Messages with an unrecognized address, counted by the producer."""
+        return _INDEX.unpack_from(self._buf, _UNRECOGNIZED_OFFSET)[0]
+
+    @property
+    def merged(self):
+        """Messages the producer folded into other records instead of pushing them."""
+        return _INDEX.unpack_from(self._buf, _MERGED_OFFSET)[0]
+
+    @property
+    def filtered(self):
+        """Messages the producer's address filter dropped."""
+        return _INDEX.unpack_from(self._buf, _FILTERED_OFFSET)[0]
+
+    def close(self):
+        """Detach, and free the block if this side created it."""
+        self._seq = None
+        self._entries = None
+        self._buf = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
@@ -0,0 +1,159 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import time
+
+# Default minimum seconds between sampled log blocks, per category
+DEFAULT_SAMPLE_INTERVALS = {
+    'breakdown': 0.5,       # Per-parameter emotion contributions
+    'hue': 0.5,             # Hue blend details
+    'tick': 0.0,            # Per-tick dominant emotion / hue lines
+    'messages': 0.0,        # Per-message lines at debug level 2
+}
+
+# Listener started by start_queue_logging, until stop_queue_logging
+_listeners = []
+
+
+class LogSampler:
+    """
+    Per-category rate limiter for diagnostic log blocks.
+
+    Call sites check ``allow(category)`` before building a log block, so
+    skipped blocks cost one dict lookup and a clock read, with no
+    formatting and no LogRecord.
+    """
+
+    def __init__(self, intervals=None):
+        self.intervals = dict(DEFAULT_SAMPLE_INTERVALS)
+        if intervals:
+            self.intervals.update(intervals)
+        self._next_allowed = {}
+        self.suppressed = {}
+
+    def configure(self, intervals):
+        """Update per-category intervals (seconds, 0 = log every time)."""
+        self.intervals.update(intervals)
+        self._next_allowed.clear()
+
+    def allow(self, category):
+        """
+        Check whether a block in ``category`` may be logged now.
+
+        Returns:
+            bool: True at most once per configured interval
+        """
+        interval = self.intervals.get(category, 0.0)
+        if interval <= 0:
+            return True
+
+        now = time.monotonic()
+        if now < self._next_allowed.get(category, 0.0):
+            self.suppressed[category] = self.suppressed.get(category, 0) + 1
+            return False
+
+        self._next_allowed[category] = now + interval
+        return True
+
+
+# Shared sampler used by the processor and sentiment modules
+log_sampler = LogSampler()
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """
+    Format records as one JSON object per line.
+
+    Structured fields passed as ``extra={'data': {...}}`` are written under
+    ``data``.
+    """
+
+    def format(self, record):
+        entry = {
+            'time': record.created,
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        data = getattr(record, 'data', None)
+        if data is not None:
+            entry['data'] = data
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=float)
+
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that enqueues records unformatted.
+
+    The stock handler formats the message on the calling thread. Here that
+    is left to the listener thread. This is safe because records never leave
+    the process and the hot paths only log immutable arguments.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+def parse_sample_intervals(specs):
+    """
+    Parse CATEGORY=SECONDS strings from the command line.
+
+    Args:
+        specs (list): e.g. ['breakdown=5', 'messages=0.01']
+
+    Returns:
+        dict: Category -> interval in seconds
+    """
+    intervals = {}
+    for spec in specs or []:
+        category, _, seconds = spec.partition('=')
+        if not category or not seconds:
+            raise ValueError(f"Invalid log sample spec: {spec!r} (expected CATEGORY=SECONDS)")
+        intervals[category] = float(seconds)
+    return intervals
+
+
+def start_queue_logging(level, handlers):
+    """
+    Route all logging through a queue drained by a background thread.
+
+    The calling thread only enqueues the LogRecord. Formatting and the
+    console/file writes happen on the listener thread.
+
+    Args:
+        level (int): Root logger level
+        handlers (list): Handlers the listener thread writes to
+
+    Returns:
+        logging.handlers.QueueListener: The started listener
+    """
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(LazyQueueHandler(log_queue))
+    root.setLevel(level)
+
+    stop_queue_logging()
+    listener.start()
+    _listeners.append(listener)
+    atexit.register(stop_queue_logging)
+    return listener
+
+
+def stop_queue_logging():
+    """
+    Stop the listener started by start_queue_logging, writing out queued records.
+
+    Processor loops call this when they end: multiprocessing children leave
+    through os._exit and skip atexit, which would lose the tail of the log.
+    Safe to call more than once.
+    """
+    while _listeners:
+        _listeners.pop().stop()
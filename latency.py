@@ -0,0 +1,137 @@
+import numpy as np
+
+# Pipeline stages, in the order they happen to a message
+STAGES = (
+    'queue',        # Listener receive -> processor dequeue (thread pool, Queue or ring)
+    'wait',         # Oldest pending message dequeued -> tick start (throttle / tick rate)
+    'score',        # Emotion scoring and hue blend
+    'smooth',       # Hue smoothing
+    'send',         # OSC output
+    'end_to_end',   # Oldest pending message received -> output sent
+)
+
+
+class LatencyHistogram:
+    """
+    Log-linear (HDR-style) histogram of durations in microseconds.
+
+    Values below ``2 ** (precision_bits + 1)`` us get one bucket each; above
+    that, every power of two is split into ``2 ** precision_bits`` buckets,
+    so the relative error stays below ``2 ** -precision_bits`` (about 3% by
+    default). Recording is a bit-length and an index computation, O(1) and
+    without allocation; percentiles walk the fixed bucket list.
+    """
+
+    def __init__(self, precision_bits=5, max_seconds=60.0):
+        """
+        Args:
+            precision_bits (int): Sub-buckets per power of two, as a power of two
+            max_seconds (float): Larger values are clamped into the last bucket
+        """
+        self.precision_bits = precision_bits
+        self.max_us = int(max_seconds * 1e6)
+        self.counts = [0] * (self._index(self.max_us) + 1)
+        self.count = 0
+        self.total_us = 0
+        self.max_seen_us = 0
+
+    def _index(self, value_us):
+        shift = value_us.bit_length() - self.precision_bits - 1
+        if shift <= 0:
+            return value_us
+        return (shift << self.precision_bits) + (value_us >> shift)
+
+    def _bucket_upper(self, index):
+        """Largest value (us) that lands in bucket ``index``."""
+        sub_buckets = 1 << self.precision_bits
+        if index < 2 * sub_buckets:
+            return index
+        shift = (index >> self.precision_bits) - 1
+        return ((index - (shift << self.precision_bits) + 1) << shift) - 1
+
+    def record(self, seconds, count=1):
+        """
+        Record a duration in seconds (negative values count as 0).
+
+        Args:
+            seconds (float): Duration
+            count (int): Number of messages that shared this duration
+        """
+        value_us = int(seconds * 1e6)
+        if value_us < 0:
+            value_us = 0
+        elif value_us > self.max_us:
+            value_us = self.max_us
+        self.counts[self._index(value_us)] += count
+        self.count += count
+        self.total_us += value_us * count
+        if value_us > self.max_seen_us:
+            self.max_seen_us = value_us
+
+    def record_many(self, seconds):
+        """Record an array of durations in seconds."""
+        if len(seconds) == 0:
+            return
+        values_us = np.clip((np.asarray(seconds) * 1e6).astype(np.int64), 0, self.max_us)
+        shifts = np.maximum(
+            np.floor(np.log2(np.maximum(values_us, 1))).astype(np.int64) - self.precision_bits, 0
+        )
+        indexes = (shifts << self.precision_bits) + (values_us >> shifts)
+        bins = np.bincount(indexes)
+        counts = self.counts
+        for index in np.flatnonzero(bins).tolist():
+            counts[index] += int(bins[index])
+        self.count += len(values_us)
+        self.total_us += int(values_us.sum())
+        self.max_seen_us = max(self.max_seen_us, int(values_us.max()))
+
+    def percentile(self, percent):
+        """
+        Upper bound of the bucket holding the given percentile.
+
+        Returns:
+            float: Duration in milliseconds (0 if empty)
+        """
+        if self.count == 0:
+            return 0.0
+        rank = max(1, int(np.ceil(self.count * percent / 100)))
+        index = int(np.searchsorted(np.cumsum(self.counts), rank))
+        return min(self._bucket_upper(index), self.max_seen_us) / 1000
+
+    def summary(self):
+        """Count, mean, p50/p99/p999 and max in milliseconds."""
+        return {
+            'count': self.count,
+            'mean_ms': self.total_us / self.count / 1000 if self.count else 0.0,
+            'p50_ms': self.percentile(50),
+            'p99_ms': self.percentile(99),
+            'p999_ms': self.percentile(99.9),
+            'max_ms': self.max_seen_us / 1000,
+        }
+
+    def reset(self):
+        self.counts = [0] * len(self.counts)
+        self.count = 0
+        self.total_us = 0
+        self.max_seen_us = 0
+
+
+class LatencyTracker:
+    """One LatencyHistogram per pipeline stage (see STAGES)."""
+
+    def __init__(self, stages=STAGES, **histogram_options):
+        self.histograms = {stage: LatencyHistogram(**histogram_options) for stage in stages}
+
+    def __getitem__(self, stage):
+        return self.histograms[stage]
+
+    def record(self, stage, seconds):
+        self.histograms[stage].record(seconds)
+
+    def summary(self):
+        """Stage -> histogram summary, for stages with samples."""
+        return {
+            stage: histogram.summary()
+            for stage, histogram in self.histograms.items()
+            if histogram.count
+        }
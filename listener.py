@@ -1,20 +1,195 @@
 from pythonosc import dispatcher, osc_server
+from resolver import AddressResolver
+from binary_params import BinaryParamDecoder
+from ringbuffer import RingBuffer
+from osc_decoder import FastOSCReceiver
+from address_filter import AddressFilter, DropReport
+from sequence import SEQUENCE_ADDRESS, SEQUENCE_SLOT
+import time
 
 def receive_osc(queue, address, *args):
-    data = (address, args[0])       # Store address and value
+    data = (address, args[0], time.monotonic())     # Store address, value and receive time
     queue.put(data)                 # Send data to the processor
     #print(f"Received OSC: {data}")
 
-def start_listener(queue, ip, port):
+def receive_osc_filtered(queue, address_filter, address, *args):
+    """receive_osc behind an AddressFilter; dropped messages never reach the queue."""
+    receive_time = time.monotonic()
+    if address_filter.allows(address):
+        queue.put((address, args[0], receive_time))
+    report = address_filter.take_report(receive_time)
+    if report is not None:
+        queue.put(DropReport(report, receive_time))
+
+def make_address_filter(allow):
+    """AddressFilter for a listener's ``allow`` argument (None = no filtering)."""
+    if allow is None:
+        return None
+    address_filter = AddressFilter(allow)
+    extra = f" + {', '.join(address_filter.patterns)}" if address_filter.patterns else ""
+    print(f"Forwarding only FACIAL_PARAMS addresses{extra}")
+    return address_filter
+
+def start_listener(queue, ip, port, allow=None):
+    """
+    Listen for OSC and put each message on the Queue.
+
+    The pythonosc dispatcher hands over one message at a time, so bit planes
+    of binary parameters cannot be collapsed here; each one crosses the
+    Queue and is decoded by the processor. start_fast_listener collapses them.
+
+    Args:
+        allow (list, optional): Enable the AddressFilter, with these extra
+            prefixes or globs; drop counts go to the processor as DropReports
+    """
+    address_filter = make_address_filter(allow)
 
     disp = dispatcher.Dispatcher()
-    disp.set_default_handler(lambda addr, *args: receive_osc(queue, addr, *args))
+    if address_filter is None:
+        disp.set_default_handler(lambda addr, *args: receive_osc(queue, addr, *args))
+    else:
+        disp.set_default_handler(lambda addr, *args: receive_osc_filtered(queue, address_filter, addr, *args))
     
     server = osc_server.ThreadingOSCUDPServer((ip, port), disp)
     print(f"Listening for OSC messages on {ip}:{port}...")
     server.serve_forever()
 
 
+def receive_osc_ring(ring, resolver, address, *args, address_filter=None):
+    timestamp = time.monotonic()
+    if address_filter is not None:
+        allowed = address_filter.allows(address)
+        report = address_filter.take_report(timestamp)
+        if report is not None:
+            ring.count_filtered(sum(report.values()))
+        if not allowed:
+            return
+    slot = resolver.resolve(address)
+    if slot is None:
+        # Unrecognized addresses are only counted by the processor
+        slot = SEQUENCE_SLOT if address == SEQUENCE_ADDRESS else -1
+    ring.push(slot, args[0], timestamp)
+
+def start_ring_listener(ring_name, ip, port, buffer_class=RingBuffer, allow=None):
+    """
+    Listen for OSC and write pre-resolved records into a shared RingBuffer.
+
+    Uses a blocking (single-threaded) server, since the ring buffer supports
+    only one producer. ``buffer_class`` may also be coalesce.LatestValueTable.
+    With ``allow``, filtered messages are dropped before they take a record;
+    their total goes to the processor through the buffer's filtered count.
+    """
+    ring = buffer_class.attach(ring_name)
+    resolver = AddressResolver()
+    address_filter = make_address_filter(allow)
+
+    disp = dispatcher.Dispatcher()
+    disp.set_default_handler(lambda addr, *args: receive_osc_ring(ring, resolver, addr, *args,
+                                                                  address_filter=address_filter))
+
+    server = osc_server.BlockingOSCUDPServer((ip, port), disp)
+    print(f"Listening for OSC messages on {ip}:{port} (ring buffer transport)...")
+    server.serve_forever()
+
+
+def start_fast_listener(queue, ip, port, allow=None):
+    """
+    Raw-socket listener that sends lists of (address, value) pairs to the processor.
+
+    Bit planes of binary parameters are decoded here and collapsed to one
+    (base address, decoded value) pair per group and batch, which the
+    processor stores like any other value (and forwards as such). Each
+    Queue item is (pairs, receive_time, merged), where ``merged`` counts the
+    bit plane messages folded away.
+    """
+    address_filter = make_address_filter(allow)
+    resolver = AddressResolver()
+    resolve = resolver.resolve
+
+    binary = BinaryParamDecoder(resolver.name_to_slot)
+    binary_bits = binary.slot_table(len(resolver.param_names))
+    base_addresses = {}             # Bit plane address -> base parameter address
+
+    def collapse_bits(batch):
+        decoded = {}
+        values = []
+        bits = 0
+        for address, value in batch:
+            slot = resolve(address)
+            bit = None if slot is None else binary_bits[slot]
+            if bit is None:
+                values.append((address, value))
+                continue
+            bits += 1
+            base_address = base_addresses.get(address)
+            if base_address is None:
+                base_address = address.rpartition('/')[0] + '/' + binary.base_names[bit[0]]
+                base_addresses[address] = base_address
+            decoded[base_address] = binary.apply(bit, value)[1]
+        values.extend(decoded.items())
+        return values, bits - len(decoded)
+
+    def handle_batch(batch):
+        receive_time = time.monotonic()
+        if address_filter is not None:
+            batch = address_filter.filter_batch(batch)
+            report = address_filter.take_report(receive_time)
+            if report is not None:
+                queue.put(DropReport(report, receive_time))
+            if not batch:
+                return
+        values, merged = collapse_bits(batch)
+        queue.put((values, receive_time, merged))
+
+    receiver = FastOSCReceiver(ip, port)
+    print(f"Listening for OSC messages on {ip}:{port} (fast decoder)...")
+    receiver.serve_forever(handle_batch)
+
+
+def start_fast_ring_listener(ring_name, ip, port, buffer_class=RingBuffer, allow=None):
+    """Raw-socket listener that writes pre-resolved records into a shared RingBuffer (or LatestValueTable)."""
+    ring = buffer_class.attach(ring_name)
+    resolver = AddressResolver()
+    resolve = resolver.resolve
+    push = ring.push
+    address_filter = make_address_filter(allow)
+
+    # Bit planes are decoded here and collapsed to one record per group and
+    # batch; the ring counts the messages merged away
+    binary = BinaryParamDecoder(resolver.name_to_slot)
+    binary_bits = binary.slot_table(len(resolver.param_names))
+
+    def handle_batch(batch):
+        timestamp = time.monotonic()
+        if address_filter is not None:
+            batch = address_filter.filter_batch(batch)
+            report = address_filter.take_report(timestamp)
+            if report is not None:
+                ring.count_filtered(sum(report.values()))
+        decoded = {}
+        bits = 0
+        for address, value in batch:
+            slot = resolve(address)
+            if slot is None:
+                push(SEQUENCE_SLOT if address == SEQUENCE_ADDRESS else -1, value, timestamp)
+                continue
+            bit = binary_bits[slot]
+            if bit is not None:
+                base_slot, base_value = binary.apply(bit, value)
+                decoded[base_slot] = base_value
+                bits += 1
+            else:
+                push(slot, value, timestamp)
+        for base_slot, value in decoded.items():
+            push(base_slot, value, timestamp)
+        if bits > len(decoded):
+            ring.count_merged(bits - len(decoded))
+
+    receiver = FastOSCReceiver(ip, port)
+    print(f"Listening for OSC messages on {ip}:{port} (fast decoder, ring buffer transport)...")
+    receiver.serve_forever(handle_batch)
+
+
 '''# Unit testing
 from multiprocessing import Queue, Process
 from processor import process_data
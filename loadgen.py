@@ -0,0 +1,400 @@
+import argparse
+import json
+import socket
+import struct
+import time
+import urllib.error
+import urllib.request
+from multiprocessing import Process, Queue
+
+import numpy as np
+
+from binary_params import BINARY_PARAMS
+from metrics import METRIC_PREFIX
+from sender import _osc_string
+from sequence import SEQUENCE_ADDRESS
+from unified_expressions import FACIAL_PARAMS, PARAM_ALIASES
+
+IP = "127.0.0.1"
+LISTEN_PORT = 9002                  # main.py's listen port
+METRICS_URL = "http://127.0.0.1:9464/metrics"
+
+# VRCFT sends both the legacy and the v2 parameter paths
+ADDRESS_PREFIXES = ("/avatar/parameters/", "/avatar/parameters/v2/")
+UNKNOWN_PREFIX = "/avatar/parameters/LoadTest"
+
+_INT = struct.Struct('>i')
+_FLOAT = struct.Struct('>f')
+_BUNDLE_HEADER = b'#bundle\x00' + struct.pack('>Q', 1)
+
+
+def encode_message(address, value):
+    """Encode a single-argument OSC message (float, int or bool)."""
+    if value is True or value is False:
+        return _osc_string(address) + _osc_string(',T' if value else ',F')
+    if isinstance(value, int):
+        return _osc_string(address) + _osc_string(',i') + _INT.pack(value)
+    return _osc_string(address) + _osc_string(',f') + _FLOAT.pack(value)
+
+
+def build_traffic(messages, unrecognized=0.0, change_probability=0.5, seed=0):
+    """
+    Generate a VRCFT-like message stream.
+
+    Every parameter in FACIAL_PARAMS is tracked under one of its alias
+    spellings and address prefixes, and follows a random walk. Each frame
+    sends the parameters that changed, in a shuffled order. Binary groups
+    (BINARY_PARAMS) are sent as their bit planes (bools), like VRCFT's
+    binary parameter mode. A fraction of messages is replaced by unknown
+    addresses.
+
+    Args:
+        messages (int): Length of the stream
+        unrecognized (float): Fraction of messages with unknown addresses
+        change_probability (float): Chance that a parameter changes per frame
+        seed (int): Random seed
+
+    Returns:
+        list: (address, value) pairs
+    """
+    rng = np.random.default_rng(seed)
+
+    bit_names = set()
+    groups = []
+    for base_name, (bits, negative) in BINARY_PARAMS.items():
+        suffixes = [str(1 << i) for i in range(bits)] + (["Negative"] if negative else [])
+        names = [base_name + suffix for suffix in suffixes if base_name + suffix in PARAM_ALIASES]
+        if names:
+            bit_names.update(names)
+            bit_names.add(base_name)
+            groups.append((base_name, names))
+
+    floats = []
+    for name, info in FACIAL_PARAMS.items():
+        spellings = [name] + [alt for alt in info['alt_names'] if alt in PARAM_ALIASES]
+        if any(spelling in bit_names for spelling in spellings):
+            continue
+        floats.append(ADDRESS_PREFIXES[rng.integers(len(ADDRESS_PREFIXES))] + spellings[rng.integers(len(spellings))])
+
+    # (address, group, bit); the Negative flag is the bit after the magnitude
+    bit_addresses = [(ADDRESS_PREFIXES[0] + bit_name, g, bit) for g, (_, names) in enumerate(groups)
+                     for bit, bit_name in enumerate(names)]
+    unknown = [f"{UNKNOWN_PREFIX}{i}" for i in range(16)]
+
+    values = rng.random(len(floats))
+    levels = rng.integers(0, 32, len(groups))
+
+    stream = []
+    while len(stream) < messages:
+        frame = []
+        changed = rng.random(len(floats)) < change_probability
+        values = np.clip(values + rng.normal(0.0, 0.05, len(floats)), 0.0, 1.0)
+        frame.extend((floats[i], float(values[i])) for i in np.flatnonzero(changed))
+
+        changed_groups = rng.random(len(groups)) < change_probability
+        levels = np.where(changed_groups, rng.integers(0, 32, len(groups)), levels)
+        for address, g, bit in bit_addresses:
+            if changed_groups[g]:
+                frame.append((address, bool(levels[g] >> bit & 1)))
+
+        for i in rng.permutation(len(frame)):
+            stream.append(frame[i])
+
+    stream = stream[:messages]
+    for i in np.flatnonzero(rng.random(len(stream)) < unrecognized):
+        stream[i] = (unknown[rng.integers(len(unknown))], float(rng.random()))
+    return stream
+
+
+def build_datagrams(stream, bundle_size=0, marker_every=64):
+    """
+    Pre-encode a stream into datagrams with sequence markers.
+
+    With ``bundle_size`` > 0 every datagram is a bundle of that many
+    messages whose first element is a marker. Otherwise every message is its
+    own datagram, with a marker datagram after every ``marker_every``
+    messages.
+
+    Returns:
+        tuple: (datagrams as bytearrays, marker payload offset per datagram
+            or None, OSC messages per datagram)
+    """
+    marker = encode_message(SEQUENCE_ADDRESS, 0)
+    datagrams = []
+    offsets = []
+    sizes = []
+
+    if bundle_size > 0:
+        for start in range(0, len(stream) - bundle_size + 1, bundle_size):
+            data = bytearray(_BUNDLE_HEADER)
+            data += _INT.pack(len(marker)) + marker
+            offsets.append(len(data) - 4)
+            for address, value in stream[start:start + bundle_size]:
+                message = encode_message(address, value)
+                data += _INT.pack(len(message)) + message
+            datagrams.append(data)
+            sizes.append(bundle_size + 1)
+    else:
+        for i, (address, value) in enumerate(stream):
+            datagrams.append(bytearray(encode_message(address, value)))
+            offsets.append(None)
+            sizes.append(1)
+            if marker_every and (i + 1) % marker_every == 0:
+                datagrams.append(bytearray(marker))
+                offsets.append(len(marker) - 4)
+                sizes.append(1)
+
+    return datagrams, offsets, sizes
+
+
+def run_sender(target, datagrams, offsets, sizes, rate, duration, first_seq, stride, results):
+    """
+    Send pre-encoded datagrams at ``rate`` OSC messages per second (process target).
+
+    Pacing works on message credit: every pass sends as many datagrams as
+    the elapsed time allows (up to a burst limit), so rates far above the
+    timer resolution hold on average. Markers are numbered first_seq, first_seq + stride, ...
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 4 * 1024 * 1024)
+    sendto = sock.sendto
+    pack_into = _INT.pack_into
+    count = len(datagrams)
+
+    seq = first_seq
+    sent = datagrams_sent = errors = 0
+    i = 0
+    clock = time.perf_counter
+    start = clock()
+    end = start + duration
+    now = start
+    while now < end:
+        credit = rate * (now - start) - sent
+        if credit < sizes[i]:
+            time.sleep(min(0.0005, sizes[i] / rate))
+        else:
+            # Bounded bursts, so a sender that falls behind still stops on time
+            for _ in range(256):
+                if credit < sizes[i]:
+                    break
+                data = datagrams[i]
+                offset = offsets[i]
+                if offset is not None:
+                    pack_into(data, offset, seq)
+                    seq += stride
+                try:
+                    sendto(data, target)
+                    datagrams_sent += 1
+                except OSError:
+                    errors += 1         # ENOBUFS: the local send queue is full
+                sent += sizes[i]
+                credit -= sizes[i]
+                i = i + 1 if i + 1 < count else 0
+        now = clock()
+
+    sock.close()
+    results.put({'messages': sent, 'datagrams': datagrams_sent, 'send_errors': errors,
+                 'seconds': clock() - start, 'next_seq': seq})
+
+
+def scrape_metrics(url, timeout=1.0):
+    """
+    Read the processor's unlabelled metrics from its Prometheus endpoint.
+
+    Returns:
+        dict: Metric name without the prefix -> value, or None if unreachable
+    """
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            text = response.read().decode('utf-8')
+    except (urllib.error.URLError, OSError):
+        return None
+    metrics = {}
+    for line in text.splitlines():
+        if line.startswith(METRIC_PREFIX) and '{' not in line:
+            name, _, value = line.partition(' ')
+            metrics[name[len(METRIC_PREFIX):]] = float(value)
+    return metrics
+
+
+def udp_receive_errors():
+    """System-wide UDP receive buffer drops (Linux /proc/net/snmp), or None."""
+    try:
+        with open('/proc/net/snmp', encoding='ascii') as f:
+            rows = [line.split() for line in f if line.startswith('Udp:')]
+    except OSError:
+        return None
+    header, values = rows[0], rows[1]
+    return int(values[header.index('RcvbufErrors')])
+
+
+def _absorbed(metrics):
+    """
+    Messages the pipeline received: processed, dropped by the listener's
+    address filter, or merged into one value with other bit planes of a
+    binary parameter. Filter counts arrive in periodic reports, so with
+    --filter up to one report interval of drops may be missing at the end.
+    """
+    return (metrics['messages_total'] + metrics.get('filtered_messages_total', 0.0)
+            + metrics.get('merged_messages_total', 0.0))
+
+
+def run_step(target, traffic, rate, duration, processes=1, first_seq=0, metrics_url=METRICS_URL,
+             sample_interval=0.25, drain_timeout=30.0):
+    """
+    Offer one rate for ``duration`` seconds and measure what the processor absorbed.
+
+    Marker loss is left out (None) when no marker reached the processor,
+    as with the latest-value transport, which only counts them.
+
+    Args:
+        target (tuple): Listener (ip, port)
+        traffic (tuple): Datagrams, marker offsets and sizes from build_datagrams
+        rate (float): Offered OSC messages per second, markers included
+        duration (float): Seconds of sending
+        processes (int): Sender processes sharing the rate
+        first_seq (int): First marker sequence number
+        metrics_url (str, optional): Processor metrics endpoint (None = sender side only)
+        sample_interval (float): Seconds between metric samples while sending
+        drain_timeout (float): Most seconds to wait for the processor to catch up
+
+    Returns:
+        dict: Offered and sustained rates, loss, queue growth and kernel drops
+    """
+    datagrams, offsets, sizes = traffic
+    before = scrape_metrics(metrics_url) if metrics_url else None
+    kernel_before = udp_receive_errors()
+
+    results = Queue()
+    senders = [Process(target=run_sender, args=(target, datagrams, offsets, sizes, rate / processes, duration,
+                                                first_seq + index, processes, results), daemon=True)
+               for index in range(processes)]
+    start = time.perf_counter()
+    for sender in senders:
+        sender.start()
+
+    # Processor counters and queue depth while sending
+    samples = []
+    while time.perf_counter() - start < duration:
+        time.sleep(sample_interval)
+        if before is not None:
+            metrics = scrape_metrics(metrics_url)
+            if metrics is not None:
+                samples.append((time.perf_counter() - start, _absorbed(metrics), metrics.get('queue_depth')))
+
+    sent = [results.get() for _ in senders]
+    for sender in senders:
+        sender.join()
+
+    messages = sum(result['messages'] for result in sent)
+    seconds = max(result['seconds'] for result in sent)
+    step = {
+        'rate': rate,
+        'processes': processes,
+        'messages_sent': messages,
+        'datagrams_sent': sum(result['datagrams'] for result in sent),
+        'send_errors': sum(result['send_errors'] for result in sent),
+        'offered_rate': messages / seconds if seconds > 0 else 0.0,
+        'next_seq': max(result['next_seq'] for result in sent),
+    }
+
+    if before is not None and samples:
+        # Rate absorbed while sending, then let the processor drain its backlog
+        during = [sample for sample in samples if sample[0] <= seconds]
+        if during:
+            step['sustained_rate'] = (during[-1][1] - _absorbed(before)) / during[-1][0]
+        depths = [(t, depth) for t, _, depth in samples if depth is not None]
+        if len(depths) >= 2:
+            t, depth = np.array(depths).T
+            step['queue_depth_max'] = float(depth.max())
+            step['queue_growth_per_second'] = float(np.polyfit(t, depth, 1)[0])
+
+        deadline = time.monotonic() + drain_timeout
+        last = None
+        after = scrape_metrics(metrics_url)
+        while after is not None and time.monotonic() < deadline and (
+                last is None or _absorbed(after) != _absorbed(last) or after.get('queue_depth', 0)):
+            last = after
+            time.sleep(0.5)
+            after = scrape_metrics(metrics_url)
+        if after is not None:
+            absorbed = _absorbed(after) - _absorbed(before)
+            step['messages_absorbed'] = int(absorbed)
+            step['loss_fraction'] = 1 - absorbed / messages if messages else 0.0
+            received = after['sequence_received_total'] - before['sequence_received_total']
+            expected = after['sequence_expected_total'] - before['sequence_expected_total']
+            step['markers_received'] = int(received)
+            step['markers_lost'] = max(0, int(expected - received)) if received else None
+
+    kernel_after = udp_receive_errors()
+    if kernel_before is not None and kernel_after is not None:
+        step['kernel_drops'] = kernel_after - kernel_before
+    return step
+
+
+def print_step(step):
+    line = (f"rate {step['rate']:>9.0f}: offered {step['offered_rate']:9.0f} msg/s "
+            f"({step['datagrams_sent']} datagrams, {step['send_errors']} send errors)")
+    if 'sustained_rate' in step:
+        line += f", sustained {step['sustained_rate']:9.0f} msg/s"
+    if 'loss_fraction' in step:
+        markers = "not seen" if step['markers_lost'] is None else f"{step['markers_lost']} lost"
+        line += f", loss {step['loss_fraction'] * 100:6.2f}% (markers {markers})"
+    if 'queue_growth_per_second' in step:
+        line += f", queue {step['queue_growth_per_second']:+.0f} items/s (max {step['queue_depth_max']:.0f})"
+    if 'kernel_drops' in step:
+        line += f", kernel drops {step['kernel_drops']}"
+    print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Synthetic VRCFT OSC load for stress-testing the listener')
+    parser.add_argument('--ip', default=IP, help='Listener IP')
+    parser.add_argument('--port', type=int, default=LISTEN_PORT, help='Listener port')
+    parser.add_argument('--rate', type=float, action='append', metavar='MSG_PER_SEC',
+                        help='Offered OSC messages per second, markers included (default 1000); '
+                             'repeat to ramp through several rates')
+    parser.add_argument('--duration', type=float, default=10.0,
+                        help='Seconds per rate')
+    parser.add_argument('--bundle', type=int, default=0, metavar='N',
+                        help='Send bundles of N messages plus a sequence marker (0 = single messages)')
+    parser.add_argument('--marker-every', type=int, default=64, metavar='N',
+                        help='Without bundles, send a sequence marker after every N messages')
+    parser.add_argument('--unrecognized', type=float, default=0.0, metavar='FRACTION',
+                        help='Fraction of messages with unknown addresses')
+    parser.add_argument('--processes', type=int, default=1,
+                        help='Sender processes (one process tops out at a few 100k datagrams/s)')
+    parser.add_argument('--metrics', default=METRICS_URL, metavar='URL',
+                        help='Processor metrics endpoint (run main.py with --metrics-port); '
+                             'loss, sustained rate and queue growth come from here')
+    parser.add_argument('--no-metrics', action='store_true',
+                        help='Only report the sender side and kernel drops')
+    parser.add_argument('--pool', type=int, default=65536,
+                        help='Distinct pre-encoded messages cycled through')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=None, metavar='PATH',
+                        help='Also write the results as JSON')
+    args = parser.parse_args()
+
+    metrics_url = None if args.no_metrics else args.metrics
+    if metrics_url and scrape_metrics(metrics_url) is None:
+        print(f"No metrics at {metrics_url}; reporting the sender side only")
+        metrics_url = None
+
+    stream = build_traffic(args.pool, args.unrecognized, seed=args.seed)
+    traffic = build_datagrams(stream, args.bundle, args.marker_every)
+    print(f"{len(traffic[0])} pre-encoded datagrams, {sum(traffic[2])} messages "
+          f"({args.unrecognized:.0%} unrecognized), target {args.ip}:{args.port}")
+
+    steps = []
+    seq = 0
+    for rate in args.rate or [1000.0]:
+        step = run_step((args.ip, args.port), traffic, rate, args.duration, args.processes, seq, metrics_url)
+        seq = step['next_seq']
+        print_step(step)
+        steps.append(step)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'args': vars(args), 'steps': steps}, f, indent=2)
+        print(f"Results written to {args.output}")
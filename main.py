@@ -1,6 +1,14 @@
 from multiprocessing import Queue, Process
-from listener import start_listener
-from processor import process_data
+from listener import start_listener, start_ring_listener, start_fast_listener, start_fast_ring_listener
+from processor import process_data, process_ring, process_latest, process_replay
+from ringbuffer import RingBuffer
+from coalesce import LatestValueTable
+from async_pipeline import start_async_pipeline
+from diagnostics import parse_sample_intervals
+from smoothing import FILTERS
+from profiling import PROFILE_MODES, run_profiled
+from address_filter import parse_patterns
+from output_gate import HUE_DEADBAND, SCORE_DEADBAND, KEEPALIVE_SECONDS
 import argparse
 
 
@@ -9,6 +17,7 @@ LISTEN_PORT = 9002
 SEND_PORT = 9000
 DEBUG_LEVEL = 1
 DEBUG_THROTTLE = 1000
+RING_CAPACITY = 65536
 
 
 if __name__ == "__main__":
@@ -18,14 +27,150 @@ if __name__ == "__main__":
                         help='Debug level: 0=minimal, 1=normal, 2=verbose')
     parser.add_argument('--throttle', type=int, default=DEBUG_THROTTLE,
                         help='Throttle rate in milliseconds')
+    parser.add_argument('--rate', type=float, default=None, metavar='HZ',
+                        help='Score and send at a fixed rate (e.g. 30/60/90) instead of on message arrival')
+    parser.add_argument('--smoothing', default='circular_box', choices=FILTERS,
+                        help='Hue smoothing filter; circular_* variants average around the colour wheel')
+    parser.add_argument('--smoothing-window', type=int, default=10,
+                        help='Window size for box/weighted smoothing')
+    parser.add_argument('--shared-state', default=None, metavar='NAME',
+                        help='Publish parameter frames to a shared memory block with this name')
+    parser.add_argument('--send-ip', default=IP,
+                        help='OSC output target IP')
+    parser.add_argument('--send-port', type=int, default=SEND_PORT,
+                        help='OSC output target port')
+    parser.add_argument('--forward', action='store_true',
+                        help='Forward recognized input parameters to the output target (queue transport and async mode)')
+    parser.add_argument('--output-prefix', default=None, metavar='PREFIX',
+                        help='Also publish every emotion score as PREFIX/<emotion>, bundled with the hue '
+                             '(e.g. /avatar/parameters/mood)')
+    parser.add_argument('--output-deadband', type=float, default=HUE_DEADBAND, metavar='DELTA',
+                        help='Only resend the hue after it moved by more than this (around the colour wheel)')
+    parser.add_argument('--score-deadband', type=float, default=SCORE_DEADBAND, metavar='DELTA',
+                        help='Only resend an emotion score after it moved by more than this (--output-prefix)')
+    parser.add_argument('--output-max-rate', type=float, default=None, metavar='HZ',
+                        help='Send outputs at most this often (default: on every tick that changed)')
+    parser.add_argument('--output-keepalive', type=float, default=KEEPALIVE_SECONDS, metavar='SECONDS',
+                        help='Resend unchanged outputs after this many seconds (0 = every tick)')
+    parser.add_argument('--log-jsonl', default=None, metavar='PATH',
+                        help='Also write structured JSON-lines log records to PATH')
+    parser.add_argument('--log-sample', action='append', default=[], metavar='CATEGORY=SECONDS',
+                        help='Log at most one block per interval for a category '
+                             '(breakdown, hue, tick, messages); may be repeated')
+    parser.add_argument('--mode', default='multiprocess', choices=['multiprocess', 'async'],
+                        help='multiprocess=separate listener and processor processes, async=single-process asyncio loop')
+    parser.add_argument('--transport', default='queue', choices=['queue', 'ring', 'latest'],
+                        help='Listener to processor transport: queue=multiprocessing.Queue, ring=shared memory ring buffer, '
+                             'latest=shared memory table keeping only the newest value per parameter')
+    parser.add_argument('--listener', default='pythonosc', choices=['pythonosc', 'fast'],
+                        help='pythonosc=threaded pythonosc server, fast=raw-socket decoder with batching')
+    parser.add_argument('--ring-size', type=int, default=RING_CAPACITY,
+                        help='Ring buffer capacity in records (ring transport only)')
+    parser.add_argument('--filter', action='store_true',
+                        help='Drop addresses that are not FACIAL_PARAMS names or aliases in the listener, '
+                             'before they reach the processor')
+    parser.add_argument('--allow', action='append', default=[], metavar='PATTERN',
+                        help='Also forward addresses with this prefix or glob (e.g. /avatar/parameters/Mood*); '
+                             'implies --filter, may be repeated or comma-separated')
+    parser.add_argument('--model', default=None, metavar='PATH',
+                        help='Score emotions with a trained model (see train_classifier.py) instead of EMOTION_WEIGHTS')
+    parser.add_argument('--metrics-port', type=int, default=None, metavar='PORT',
+                        help='Serve Prometheus metrics on http://127.0.0.1:PORT/metrics')
+    parser.add_argument('--stats-prefix', default=None, metavar='PREFIX',
+                        help='Send processor stats as OSC to PREFIX/<metric> (e.g. /moodhue/stats)')
+    parser.add_argument('--stats-interval', type=float, default=1.0,
+                        help='Seconds between OSC stats bundles')
+    parser.add_argument('--record', default=None, metavar='PATH',
+                        help='Record every received message to a binary session file')
+    parser.add_argument('--replay', default=None, metavar='PATH',
+                        help='Feed a recorded session through the processor instead of listening for OSC')
+    parser.add_argument('--replay-speed', type=float, default=1.0,
+                        help='Replay speed (1=real time, 0=as fast as possible)')
+    parser.add_argument('--profile', default=None, choices=PROFILE_MODES,
+                        help='Profile the processor: cpu=cProfile (.pstats), sample=sampling timer '
+                             '(collapsed stacks, Unix), alloc=tracemalloc plus per-tick allocation counts. '
+                             'Written on shutdown, or on SIGUSR1 where available')
+    parser.add_argument('--profile-output', default='profile', metavar='PREFIX',
+                        help='Profile files are written as PREFIX.<process>.<ext>')
+    parser.add_argument('--profile-listener', action='store_true',
+                        help='Also profile the listener process (multiprocess mode)')
     args = parser.parse_args()
     
     print(f"Starting with debug level {args.debug} and throttle rate {args.throttle}ms")
     
-    queue = Queue()
-
-    listener_process = Process(target=start_listener, args=(queue, IP, LISTEN_PORT))
-    processor_process = Process(target=process_data, args=(queue, args.debug, args.throttle))
+    processor_options = {
+        'shared_state_name': args.shared_state,
+        'output_prefix': args.output_prefix,
+        'forward': args.forward,
+        'rate_hz': args.rate,
+        'smoothing': args.smoothing,
+        'smoothing_window': args.smoothing_window,
+        'record_path': args.record,
+        'model_path': args.model,
+        'metrics_port': args.metrics_port,
+        'stats_prefix': args.stats_prefix,
+        'stats_interval': args.stats_interval,
+        'track_allocations': args.profile == 'alloc',
+        'output_deadband': args.output_deadband,
+        'score_deadband': args.score_deadband,
+        'output_max_rate': args.output_max_rate,
+        'output_keepalive': args.output_keepalive,
+        'log_options': {
+            'jsonl_path': args.log_jsonl,
+            'sample_intervals': parse_sample_intervals(args.log_sample),
+        },
+    }
+    
+    allow = parse_patterns(args.allow) if args.filter or args.allow else None
+    
+    def profiled(target, name, enabled=True):
+        """Process target and leading args, wrapped in run_profiled when profiling."""
+        if args.profile is None or not enabled:
+            return target, ()
+        return run_profiled, (args.profile, f"{args.profile_output}.{name}", target)
+    
+    if args.replay is not None:
+        target, prefix = profiled(process_replay, 'replay')
+        try:
+            target(*prefix, args.replay, args.debug, args.throttle, args.send_ip, args.send_port,
+                   speed=args.replay_speed, **processor_options)
+        except KeyboardInterrupt:
+            print("Shutting down...")
+        raise SystemExit(0)
+    
+    if args.mode == 'async':
+        target, prefix = profiled(start_async_pipeline, 'async')
+        try:
+            target(*prefix, IP, LISTEN_PORT, args.debug, args.throttle,
+                   send_ip=args.send_ip, send_port=args.send_port, allow=allow, **processor_options)
+        except KeyboardInterrupt:
+            print("Shutting down...")
+        raise SystemExit(0)
+    
+    ring = None
+    if args.transport == 'ring':
+        ring = RingBuffer(capacity=args.ring_size)
+        listener_target = start_fast_ring_listener if args.listener == 'fast' else start_ring_listener
+        listener_args = (ring.name, IP, LISTEN_PORT)
+        processor_target = process_ring
+        processor_args = (ring.name, args.debug, args.throttle, args.send_ip, args.send_port)
+    elif args.transport == 'latest':
+        ring = LatestValueTable()
+        listener_target = start_fast_ring_listener if args.listener == 'fast' else start_ring_listener
+        listener_args = (ring.name, IP, LISTEN_PORT, LatestValueTable)
+        processor_target = process_latest
+        processor_args = (ring.name, args.debug, args.throttle, args.send_ip, args.send_port)
+    else:
+        queue = Queue()
+        listener_target = start_fast_listener if args.listener == 'fast' else start_listener
+        listener_args = (queue, IP, LISTEN_PORT)
+        processor_target = process_data
+        processor_args = (queue, args.debug, args.throttle, args.send_ip, args.send_port)
+    
+    target, prefix = profiled(listener_target, 'listener', enabled=args.profile_listener)
+    listener_process = Process(target=target, args=prefix + listener_args, kwargs={'allow': allow})
+    target, prefix = profiled(processor_target, 'processor')
+    processor_process = Process(target=target, args=prefix + processor_args, kwargs=processor_options)
 
     # Fix: Add True to make processes daemon
     listener_process.daemon = True
@@ -40,3 +185,6 @@ if __name__ == "__main__":
         processor_process.join()
     except KeyboardInterrupt:
         print("Shutting down...")
+    finally:
+        if ring is not None:
+            ring.close()
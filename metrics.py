@@ -0,0 +1,216 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+METRIC_PREFIX = "moodhue_"
+TOP_UNRECOGNIZED = 10
+QUANTILES = (0.5, 0.99, 0.999)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + '}'
+
+
+class MetricsExporter:
+    """
+    Publish processor counters as Prometheus text and/or OSC stats.
+
+    Nothing is computed on the message path: the exporter reads the counters
+    the processor already keeps (``error_tracking``, the latency histograms,
+    sender and scorer counts) when a scrape or a stats send happens. Transport
+    specific gauges such as queue depth are registered with ``add_gauge``.
+    """
+
+    def __init__(self, processor, stats_prefix=None, stats_interval=1.0):
+        """
+        Args:
+            processor (FacialProcessor): Processor whose counters are exported
+            stats_prefix (str, optional): Send scalar metrics as OSC to
+                PREFIX/<metric> every ``stats_interval`` seconds
+            stats_interval (float): Seconds between OSC stats bundles
+        """
+        self.processor = processor
+        self.gauges = {}
+        self.server = None
+
+        self.stats_interval = stats_interval
+        self.next_stats_time = 0.0
+        self.stats_prefix = stats_prefix.rstrip('/') if stats_prefix else None
+        self._stats_names = None
+        self._stats_addresses = None
+
+    def add_gauge(self, name, help_text, read):
+        """
+        Register a gauge read on every collection.
+
+        Args:
+            name (str): Metric name without the prefix
+            help_text (str): HELP line
+            read (callable): Returns the current value (errors skip the gauge)
+        """
+        self.gauges[name] = (help_text, read)
+
+    def scalars(self):
+        """
+        Current scalar metrics.
+
+        Returns:
+            list: (name, type, help, value) tuples
+        """
+        processor = self.processor
+        error_tracking = processor.error_tracking
+        sender = processor.sender
+
+        metrics = [
+            ('messages_total', 'counter', 'Messages received',
+             error_tracking['total_messages']),
+            ('recognized_messages_total', 'counter', 'Messages matched to a facial parameter',
+             error_tracking['recognized_messages']),
+            ('unrecognized_messages_total', 'counter', 'Messages with an unknown address',
+             error_tracking['unrecognized_messages']),
+            ('filtered_messages_total', 'counter', 'Messages dropped by the listener address filter',
+             error_tracking['filtered_messages']),
+            ('merged_messages_total', 'counter', 'Binary parameter bit planes the listener merged into one value',
+             error_tracking['merged_messages']),
+            ('sequence_received_total', 'counter', 'Load generator sequence markers received, all runs',
+             processor.sequence.received_total),
+            ('sequence_expected_total', 'counter', 'Load generator sequence markers sent, all runs',
+             processor.sequence.expected_total),
+            ('sequence_lost', 'gauge', 'Load generator sequence markers missing in the current run',
+             processor.sequence.lost),
+            ('processing_errors_total', 'counter', 'Exceptions in the processing loop',
+             error_tracking['processing_errors']),
+            ('ticks_total', 'counter', 'Scoring and send steps',
+             processor.ticks),
+            ('tick_rate_hz', 'gauge', 'Recent tick rate',
+             processor.tick_rate()),
+            ('rescores_total', 'counter', 'Ticks that rescored emotions',
+             processor.scorer.updates),
+            ('output_sends_total', 'counter', 'Ticks whose output passed the gate',
+             processor.output_gate.sends),
+            ('output_suppressed_total', 'counter', 'Ticks whose output the gate held back (unchanged or rate-limited)',
+             processor.output_gate.suppressed),
+            ('output_keepalives_total', 'counter', 'Unchanged outputs resent as keepalives',
+             processor.output_gate.keepalives),
+            ('sends_total', 'counter', 'OSC datagrams sent',
+             getattr(sender, 'sends', 0)),
+            ('send_errors_total', 'counter', 'OSC send failures',
+             getattr(sender, 'errors', 0)),
+            ('uptime_seconds', 'gauge', 'Seconds since the processor started',
+             time.time() - processor.start_time),
+        ]
+
+        for name, (help_text, read) in self.gauges.items():
+            try:
+                value = read()
+            except (NotImplementedError, OSError, ValueError):
+                continue
+            metrics.append((name, 'gauge', help_text, value))
+        return metrics
+
+    def render_prometheus(self):
+        """Render all metrics in the Prometheus text exposition format."""
+        lines = []
+        for name, metric_type, help_text, value in self.scalars():
+            name = METRIC_PREFIX + name
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            lines.append(f"{name} {float(value)!r}")
+
+        name = METRIC_PREFIX + 'unrecognized_messages_by_param'
+        lines.append(f"# HELP {name} Messages per unknown parameter (top {TOP_UNRECOGNIZED})")
+        lines.append(f"# TYPE {name} gauge")
+        unrecognized = sorted(self.processor.error_tracking['unrecognized_params'].items(),
+                              key=lambda item: item[1], reverse=True)
+        for param, count in unrecognized[:TOP_UNRECOGNIZED]:
+            lines.append(f"{name}{_labels({'param': param})} {count}")
+
+        name = METRIC_PREFIX + 'filtered_messages_by_address'
+        lines.append(f"# HELP {name} Messages dropped by the listener filter per address (top {TOP_UNRECOGNIZED})")
+        lines.append(f"# TYPE {name} gauge")
+        filtered = sorted(self.processor.error_tracking['filtered_addresses'].items(),
+                          key=lambda item: item[1], reverse=True)
+        for address, count in filtered[:TOP_UNRECOGNIZED]:
+            lines.append(f"{name}{_labels({'address': address})} {count}")
+
+        name = METRIC_PREFIX + 'latency_seconds'
+        lines.append(f"# HELP {name} Pipeline stage latency")
+        lines.append(f"# TYPE {name} summary")
+        for stage, histogram in self.processor.latency.histograms.items():
+            for quantile in QUANTILES:
+                value = histogram.percentile(quantile * 100) / 1000
+                lines.append(f"{name}{_labels({'stage': stage, 'quantile': quantile})} {value!r}")
+            lines.append(f"{name}_sum{_labels({'stage': stage})} {histogram.total_us / 1e6!r}")
+            lines.append(f"{name}_count{_labels({'stage': stage})} {histogram.count}")
+
+        return '\n'.join(lines) + '\n'
+
+    def serve_http(self, host="127.0.0.1", port=9464):
+        """
+        Serve ``/metrics`` from a background thread.
+
+        Args:
+            host (str): Address to bind (local only by default)
+            port (int): HTTP port
+        """
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = exporter.render_prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass                # Scrapes would flood the processor log
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        thread = threading.Thread(target=self.server.serve_forever, name='metrics-http', daemon=True)
+        thread.start()
+        return self.server
+
+    def maybe_send_stats(self, now=None):
+        """Send the scalar metrics and latency p50/p99 as one OSC bundle, at most once per interval."""
+        if self.stats_prefix is None:
+            return
+        if now is None:
+            now = time.monotonic()
+        if now < self.next_stats_time:
+            return
+        self.next_stats_time = now + self.stats_interval
+
+        names = []
+        values = []
+        for name, _, _, value in self.scalars():
+            names.append(name)
+            values.append(float(value))
+        for stage, histogram in self.processor.latency.histograms.items():
+            names.append(f"latency/{stage}/p50_ms")
+            values.append(histogram.percentile(50))
+            names.append(f"latency/{stage}/p99_ms")
+            values.append(histogram.percentile(99))
+
+        # Rebuild the address list only when the metric set changes
+        names = tuple(names)
+        if names != self._stats_names:
+            self._stats_names = names
+            self._stats_addresses = tuple(f"{self.stats_prefix}/{name}" for name in names)
+        self.processor.sender.send_bundle(self._stats_addresses, values)
+
+    def close(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
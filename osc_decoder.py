@@ -0,0 +1,186 @@
+import select
+import socket
+import struct
+
+_INT = struct.Struct('>i')
+_FLOAT = struct.Struct('>f')
+
+BUNDLE_PREFIX = b'#bundle\x00'
+_BUNDLE_HEADER_SIZE = 16            # "#bundle\0" + 8-byte time tag
+MAX_BUNDLE_DEPTH = 8                # Deeper nesting is counted as malformed
+
+_TAG_FLOAT = ord('f')
+_TAG_INT = ord('i')
+_TAG_TRUE = ord('T')
+_TAG_FALSE = ord('F')
+_COMMA = ord(',')
+
+
+def _padded(length):
+    """Size of an OSC string of ``length`` bytes including its null padding."""
+    return (length // 4 + 1) * 4
+
+
+class OSCDecoder:
+    """
+    Minimal OSC decoder for the single-value messages VRCFT sends.
+
+    Decodes ``,f``, ``,i``, ``,T`` and ``,F`` messages and (nested)
+    ``#bundle`` containers (up to MAX_BUNDLE_DEPTH levels) with
+    ``struct.unpack_from`` over the receive buffer. Only the first argument is decoded, matching what the processor
+    uses. Anything else is counted and skipped instead of raising.
+    """
+
+    def __init__(self):
+        # Raw address bytes -> decoded str, so each address is decoded once
+        self._addresses = {}
+        self.messages = 0
+        self.skipped = 0
+        self.malformed = 0
+
+    def decode(self, buf, size, out):
+        """
+        Decode one datagram.
+
+        Args:
+            buf (bytearray): Receive buffer
+            size (int): Number of valid bytes in ``buf``
+            out (list): Decoded (address, value) pairs are appended here
+        """
+        try:
+            self._decode(buf, memoryview(buf), 0, size, out)
+        except (struct.error, IndexError, UnicodeDecodeError):
+            self.malformed += 1
+
+    def _decode(self, buf, view, start, end, out, depth=0):
+        if buf.startswith(BUNDLE_PREFIX, start, end):
+            if depth >= MAX_BUNDLE_DEPTH:
+                self.malformed += 1
+                return
+            pos = start + _BUNDLE_HEADER_SIZE
+            while pos + 4 <= end:
+                element_size = _INT.unpack_from(view, pos)[0]
+                pos += 4
+                if element_size <= 0 or pos + element_size > end:
+                    self.malformed += 1
+                    return
+                self._decode(buf, view, pos, pos + element_size, out, depth + 1)
+                pos += element_size
+            return
+
+        address_end = buf.find(0, start, end)
+        if address_end < 0:
+            self.malformed += 1
+            return
+
+        tag_start = start + _padded(address_end - start)
+        if tag_start + 1 >= end or buf[tag_start] != _COMMA:
+            self.malformed += 1
+            return
+
+        tag = buf[tag_start + 1]
+        if tag == _TAG_FLOAT or tag == _TAG_INT:
+            tag_end = buf.find(0, tag_start, end)
+            if tag_end < 0:
+                self.malformed += 1
+                return
+            arg_start = tag_start + _padded(tag_end - tag_start)
+            if arg_start + 4 > end:
+                # Truncated; the reused buffer would yield stale bytes
+                self.malformed += 1
+                return
+            if tag == _TAG_FLOAT:
+                value = _FLOAT.unpack_from(view, arg_start)[0]
+            else:
+                value = _INT.unpack_from(view, arg_start)[0]
+        elif tag == _TAG_TRUE:
+            value = True
+        elif tag == _TAG_FALSE:
+            value = False
+        else:
+            self.skipped += 1
+            return
+
+        raw_address = bytes(view[start:address_end])
+        address = self._addresses.get(raw_address)
+        if address is None:
+            address = raw_address.decode('utf-8')
+            self._addresses[raw_address] = address
+
+        self.messages += 1
+        out.append((address, value))
+
+    def stats(self):
+        return {
+            'messages': self.messages,
+            'skipped': self.skipped,
+            'malformed': self.malformed,
+        }
+
+
+class FastOSCReceiver:
+    """
+    Lean UDP receive path that bypasses the pythonosc server and dispatcher.
+
+    Datagrams are read into one reused buffer on a single thread and decoded
+    with OSCDecoder. Decoded (address, value) pairs are handed on in batches:
+    a batch is flushed once it reaches ``batch_size`` or the socket has no
+    more pending datagrams.
+    """
+
+    def __init__(self, ip, port, batch_size=256, recv_buffer_bytes=4 * 1024 * 1024):
+        """
+        Args:
+            ip (str): Address to bind
+            port (int): Port to bind
+            batch_size (int): Maximum pairs per batch
+            recv_buffer_bytes (int): Requested kernel receive buffer size
+        """
+        self.batch_size = batch_size
+        self.decoder = OSCDecoder()
+        self.datagrams = 0
+
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            # A large kernel buffer absorbs bursts while we are busy decoding
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, recv_buffer_bytes)
+        except OSError:
+            pass
+        self.sock.bind((ip, port))
+        self.sock.setblocking(False)
+
+        self._buf = bytearray(65536)
+
+    def serve_forever(self, handle_batch):
+        """
+        Receive until the process exits.
+
+        Args:
+            handle_batch (callable): Called with each list of (address, value) pairs
+        """
+        sock = self.sock
+        buf = self._buf
+        decode = self.decoder.decode
+        batch_size = self.batch_size
+        batch = []
+
+        while True:
+            try:
+                size = sock.recv_into(buf)
+            except (BlockingIOError, InterruptedError):
+                if batch:
+                    handle_batch(batch)
+                    batch = []
+                select.select([sock], [], [])
+                continue
+
+            self.datagrams += 1
+            decode(buf, size, batch)
+
+            if len(batch) >= batch_size:
+                handle_batch(batch)
+                batch = []
+
+    def close(self):
+        self.sock.close()
+
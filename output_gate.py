@@ -0,0 +1,110 @@
+import numpy as np
+
+# Default gate settings (see FacialProcessor / main.py --output-*)
+HUE_DEADBAND = 0.002
+SCORE_DEADBAND = 0.01
+KEEPALIVE_SECONDS = 5.0
+
+
+class OutputGate:
+    """
+    Change-driven gate in front of the sender.
+
+    Each tick offers the current outputs. They go out only when at least
+    one output moved by more than its deadband since it was last sent, no
+    faster than ``max_rate_hz``, and otherwise every ``keepalive`` seconds
+    so receivers that missed a packet or joined late catch up.
+
+    ``sent`` holds the values last sent. Outputs that changed by less than
+    their deadband keep their old value there, so a bundle resends them
+    unchanged and receivers see (and sync) only the outputs that moved.
+    A keepalive takes every current value, so drift that stayed under the
+    deadband reaches receivers at least once per keepalive period.
+    Nothing here allocates per tick.
+    """
+
+    def __init__(self, deadbands, max_rate_hz=None, keepalive=KEEPALIVE_SECONDS, circular=()):
+        """
+        Args:
+            deadbands (sequence): Minimum change to resend, per output
+            max_rate_hz (float, optional): Most sends per second (None = every tick)
+            keepalive (float, optional): Resend unchanged outputs after this
+                many seconds (0 = every tick, None = never)
+            circular (iterable): Indices of outputs on a 0-1 wheel (hue), where
+                0.99 -> 0.01 is a change of 0.02
+        """
+        self.deadbands = np.array(deadbands, dtype=np.float64)
+        self.min_interval = 1.0 / max_rate_hz if max_rate_hz else 0.0
+        self.keepalive = keepalive
+        self.circular = tuple(circular)
+
+        n_outputs = len(self.deadbands)
+        self.sent = np.zeros(n_outputs)
+        self._delta = np.zeros(n_outputs)
+        self._changed = np.zeros(n_outputs, dtype=bool)
+        self.last_send = None
+
+        self.sends = 0
+        self.keepalives = 0
+        self.suppressed_deadband = 0
+        self.suppressed_rate = 0
+
+    @property
+    def suppressed(self):
+        """Ticks that did not send."""
+        return self.suppressed_deadband + self.suppressed_rate
+
+    def update(self, values, now):
+        """
+        Offer the current outputs.
+
+        Args:
+            values (np.ndarray): Current output values, one per deadband
+            now (float): Current time.monotonic()
+
+        Returns:
+            bool: True if ``sent`` should go out now
+        """
+        if self.last_send is None:
+            np.copyto(self.sent, values)
+            self.last_send = now
+            self.sends += 1
+            return True
+
+        delta = self._delta
+        np.subtract(values, self.sent, out=delta)
+        np.absolute(delta, out=delta)
+        for index in self.circular:
+            distance = delta.item(index)
+            if distance > 0.5:
+                delta[index] = 1.0 - distance
+        changed = self._changed
+        np.greater(delta, self.deadbands, out=changed)
+        has_changes = np.count_nonzero(changed) > 0
+
+        elapsed = now - self.last_send
+        keepalive_due = self.keepalive is not None and elapsed >= self.keepalive
+        if not has_changes and not keepalive_due:
+            self.suppressed_deadband += 1
+            return False
+        if elapsed < self.min_interval:
+            self.suppressed_rate += 1
+            return False
+
+        if keepalive_due:
+            np.copyto(self.sent, values)
+        else:
+            np.copyto(self.sent, values, where=changed)
+        if not has_changes:
+            self.keepalives += 1
+        self.last_send = now
+        self.sends += 1
+        return True
+
+    def stats(self):
+        return {
+            'sends': self.sends,
+            'keepalives': self.keepalives,
+            'suppressed_deadband': self.suppressed_deadband,
+            'suppressed_rate': self.suppressed_rate,
+        }
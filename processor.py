@@ -1,18 +1,48 @@
-from sender import send_hue_shift, send_message
+from sender import OSCSender, HUE_SHIFT_ADDRESS, ntp_time_tag
 import math
-from collections import deque
+import numpy as np
 import time
+from queue import Empty
 import datetime
 import logging
 import traceback
-from unified_expressions import FACIAL_PARAMS
+import atexit
+import signal
+import sys
+import threading
+from diagnostics import JsonLinesFormatter, log_sampler, start_queue_logging, stop_queue_logging
+from state import ParameterState
+from ringbuffer import RingBuffer
+from coalesce import LatestValueTable
+from scheduler import TickScheduler
+from resolver import AddressResolver
+from binary_params import BinaryParamDecoder
+from latency import LatencyTracker
+from metrics import MetricsExporter
+from recording import SessionRecorder, load_session, replay_session
 from sentiment import (
-    calculate_emotion_scores, 
-    calculate_emotion_hue, 
-    smooth_value
+    get_emotion_engine,
+    log_score_breakdown,
+    HueBlender,
+    IncrementalScorer
 )
+from smoothing import make_filter
+from classifier import EmotionModel, ModelScorer
+from profiling import AllocationCounter
+from address_filter import DropReport
+from sequence import SEQUENCE_ADDRESS, SEQUENCE_SLOT, SequenceCounter
+from output_gate import OutputGate, HUE_DEADBAND, SCORE_DEADBAND, KEEPALIVE_SECONDS
 
-def setup_logging(debug_level):
+def setup_logging(debug_level, jsonl_path=None, sample_intervals=None):
+    """
+    Configure queue-backed logging for a processor process.
+    
+    Args:
+        debug_level (int): 0=warnings, 1=info, 2=debug
+        jsonl_path (str, optional): Also write structured JSON-lines records here
+        sample_intervals (dict, optional): Category -> minimum seconds between
+            sampled log blocks (see diagnostics.LogSampler)
+    """
     log_levels = {
         0: logging.WARNING,
         1: logging.INFO,
@@ -30,143 +60,891 @@ def setup_logging(debug_level):
     file_handler = logging.FileHandler('facial_processing.log', mode='w', encoding='utf-8')
     file_handler.setFormatter(formatter)
     
-    logging.basicConfig(
-        level=log_levels.get(debug_level, logging.INFO),
-        handlers=[console_handler, file_handler]
-    )
+    handlers = [console_handler, file_handler]
+    if jsonl_path is not None:
+        jsonl_handler = logging.FileHandler(jsonl_path, mode='w', encoding='utf-8')
+        jsonl_handler.setFormatter(JsonLinesFormatter())
+        handlers.append(jsonl_handler)
+    
+    # Console and file writes happen on a background thread
+    start_queue_logging(log_levels.get(debug_level, logging.INFO), handlers)
+    
+    # Daemon children are stopped with SIGTERM; leave through the processor
+    # loops' finally blocks so the queued log tail is written
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    
+    if sample_intervals:
+        log_sampler.configure(sample_intervals)
     
     return logging.getLogger(__name__)
 
-def process_data(queue, debug_level=1, throttle_ms=1000):
-    # Setup logging
-    logger = setup_logging(debug_level)
-    logger.info(f"Starting facial parameter processor")
-    logger.info(f"Debug Level: {debug_level}, Throttle: {throttle_ms}ms")
-    
-    facial_params = FACIAL_PARAMS.copy()
-    
-    # Create a mapping from all possible names to standard parameter names
-    param_name_mapping = {}
-    for std_name, data in facial_params.items():
-        param_name_mapping[std_name] = std_name
-        for alt_name in data["alt_names"]:
-            param_name_mapping[alt_name] = std_name
-    
-    # Create a rolling window for smoothing output
-    window_size = 10
-    value_history = deque(maxlen=window_size)
-    for _ in range(window_size):
-        value_history.append(0)
-    
-    # Error tracking
-    error_tracking = {
-        'total_messages': 0,
-        'recognized_messages': 0,
-        'unrecognized_messages': 0,
-        'processing_errors': 0,
-        'unrecognized_params': {}
-    }
+class FacialProcessor:
+    """
+    Parameter state, emotion scoring and output for one processing loop.
     
-    # Performance tracking
-    start_time = time.time()
-    last_update_time = time.time()
+    Transports feed it either (address, value) messages or pre-resolved
+    (slot, value, timestamp) records, then call ``maybe_update`` to run the
+    throttled scoring and send step.
+    """
     
-    while True:
-        try:
-            # Retrieve OSC message
-            address, value = queue.get(timeout=5)
-            error_tracking['total_messages'] += 1
-
-            # Log incoming message at debug level
-            logger.debug(f"Received: {address} = {value:.4f}")
-            
-            # Parameter name extraction and matching
-            parts = address.split('/')
-            param_name = parts[-1]
-            
-            # Matching logic
-            matched = False
-            std_param_name = None
+    def __init__(self, logger, throttle_ms=1000, shared_state_name=None, sender=None, forward=False,
+                 output_prefix=None, smoothing='circular_box', smoothing_window=10, record_path=None,
+                 metrics_port=None, stats_prefix=None, stats_interval=1.0, model_path=None,
+                 track_allocations=False, output_deadband=HUE_DEADBAND, score_deadband=SCORE_DEADBAND,
+                 output_max_rate=None, output_keepalive=KEEPALIVE_SECONDS):
+        self.logger = logger
+        self.debug_enabled = logger.isEnabledFor(logging.DEBUG)
+        self.throttle_ms = throttle_ms
+        
+        # Output (pre-encoded OSC), optionally forwarding recognized inputs
+        if sender is None:
+            sender = OSCSender(verbose=logger.isEnabledFor(logging.DEBUG))
+        self.sender = sender
+        self.forward = forward
+        
+        # Scoring backend: hand-tuned EMOTION_WEIGHTS, or a trained model
+        if model_path is not None:
+            self.engine = EmotionModel.load(model_path)
+            logger.info(f"Scoring with model {model_path} ({len(self.engine.labels)} labels, "
+                        f"{self.engine.hidden_units} hidden units)")
+        else:
+            self.engine = get_emotion_engine()
+        
+        # With an output prefix, every emotion score goes out alongside the hue
+        self.output_addresses = None
+        if output_prefix is not None:
+            labels = self.engine.labels
+            self.output_addresses = (HUE_SHIFT_ADDRESS,) + tuple(
+                f"{output_prefix.rstrip('/')}/{label}" for label in labels
+            )
+        
+        # Current parameter values, indexed by slot
+        self.state = ParameterState(shared_name=shared_state_name)
+        self.values = self.state.values
+        
+        # Resolve full OSC addresses to parameter slots once, then memoize
+        self.resolver = AddressResolver(self.state.aliases, self.state.param_names)
+        
+        # Binary-encoded parameters are stored only as their decoded value
+        self.binary = BinaryParamDecoder(self.state.aliases)
+        self.binary_bits = self.binary.slot_table(len(self.state))
+        self.binary_mask = np.array([bit is not None for bit in self.binary_bits])
+        
+        # Rescore only emotions whose weighted parameters changed (models
+        # rescore the whole vector when anything changed)
+        if model_path is not None:
+            self.scorer = ModelScorer(self.engine)
+        else:
+            self.scorer = IncrementalScorer(self.engine)
+        self.scorer_dirty = self.scorer.dirty
+        self.scorer_relevant = self.scorer.relevant.tolist()
+        
+        # Scores live in the scorer's buffer, rewritten in place on every
+        # rescore; the tick path only ever reads them
+        self.scores = self.scorer.scores
+        self.hue_blender = HueBlender(self.engine.labels)
+        self.hue = None
+        
+        # Output bundle values: hue, then every score
+        self.output_values = np.zeros(1 + len(self.scores))
+        self.output_scores = self.output_values[1:]
+        
+        # Sends only when an output moved past its deadband (or for keepalives)
+        if self.output_addresses is None:
+            self.gated_values = self.output_values[:1]
+            deadbands = [output_deadband]
+        else:
+            self.gated_values = self.output_values
+            deadbands = [output_deadband] + [score_deadband] * len(self.scores)
+        self.output_gate = OutputGate(deadbands, output_max_rate, output_keepalive, circular=(0,))
+        
+        # Per-stage latency histograms; receive time of the oldest message
+        # not yet reflected in the output, and when it was dequeued
+        self.latency = LatencyTracker()
+        self.queue_latency = self.latency['queue']
+        self.pending_since = None
+        self.pending_dequeued = None
+        
+        # Streaming filter for the output hue (O(1) per tick)
+        self.hue_filter = make_filter(smoothing, window=smoothing_window)
+        
+        # Optional session recording of every received message
+        self.recorder = None
+        if record_path is not None:
+            self.recorder = SessionRecorder(record_path, self.state.param_names)
+            atexit.register(self.recorder.close)
+            logger.info(f"Recording session to {record_path}")
+        
+        # Error tracking
+        self.error_tracking = {
+            'total_messages': 0,
+            'recognized_messages': 0,
+            'unrecognized_messages': 0,
+            'coalesced_messages': 0,
+            'filtered_messages': 0,
+            'merged_messages': 0,
+            'processing_errors': 0,
+            'unrecognized_params': {},
+            'filtered_addresses': {}
+        }
+        
+        # Load generator sequence markers (loadgen.py), for loss measurements
+        self.sequence = SequenceCounter()
+        
+        # Performance tracking
+        self.start_time = time.time()
+        self.last_update_time = time.time()
+        self.last_summary_mark = 0
+        
+        # Tick count and smoothed tick interval, for the metrics export
+        self.ticks = 0
+        self.last_tick_time = None
+        self.tick_interval = 0.0
+        
+        # Optional per-tick allocation accounting (--profile alloc)
+        self.allocations = AllocationCounter() if track_allocations else None
+        
+        # Metrics over HTTP (Prometheus text) and/or as OSC stats bundles
+        self.metrics = None
+        if metrics_port is not None or stats_prefix is not None:
+            self.metrics = MetricsExporter(self, stats_prefix, stats_interval)
+            if metrics_port is not None:
+                self.metrics.serve_http(port=metrics_port)
+                logger.info(f"Serving metrics on http://127.0.0.1:{metrics_port}/metrics")
+        if self.allocations is not None:
+            self.add_gauge('tick_allocated_blocks_max', 'Most net allocated blocks in one tick',
+                           lambda: self.allocations.blocks_max)
+            self.add_gauge('tick_peak_bytes_max', 'Largest transient allocation peak in one tick (bytes)',
+                           lambda: self.allocations.peak_bytes_max)
+    
+    def mark_received(self, receive_time, count=1):
+        """
+        Record the queue latency of messages stamped by the listener.
+        
+        Args:
+            receive_time (float): Listener time.monotonic() stamp
+            count (int): Number of messages sharing the stamp
+        """
+        now = time.monotonic()
+        self.queue_latency.record(now - receive_time, count)
+        if self.pending_since is None:
+            self.pending_since = receive_time
+            self.pending_dequeued = now
+    
+    def handle_message(self, address, value, receive_time=None):
+        """
+        Apply one (address, value) OSC message to the parameter state.
+        
+        Args:
+            address (str): OSC address
+            value (float, int or bool): Message argument
+            receive_time (float, optional): Listener time.monotonic() stamp
+        """
+        if receive_time is not None:
+            self.mark_received(receive_time)
+        self.apply_message(address, value, receive_time)
+    
+    def apply_message(self, address, value, receive_time=None):
+        """
+        handle_message without the queue latency accounting.
+        
+        Used for batches whose shared stamp was already passed to
+        mark_received; ``receive_time`` only timestamps the recording.
+        
+        Args:
+            address (str): OSC address
+            value (float, int or bool): Message argument
+            receive_time (float, optional): Listener time.monotonic() stamp
+        """
+        logger = self.logger
+        error_tracking = self.error_tracking
+        error_tracking['total_messages'] += 1
+        
+        # Log incoming message at debug level (sampled)
+        log_message = self.debug_enabled and log_sampler.allow('messages')
+        if log_message:
+            logger.debug("Received: %s = %.4f", address, value)
+        
+        # Parameter matching (memoized per address)
+        slot = self.resolver.resolve(address)
+        
+        if self.recorder is not None:
+            if slot is not None:
+                self.recorder.append(slot, value, receive_time)
+            else:
+                self.recorder.append(SEQUENCE_SLOT if address == SEQUENCE_ADDRESS else -1, value, receive_time)
+        
+        if slot is not None:
+            error_tracking['recognized_messages'] += 1
+            if log_message:
+                logger.debug("Matched: %s -> %s", address, self.resolver.param_names[slot])
             
-            # Direct mapping
-            if param_name in param_name_mapping:
-                std_param_name = param_name_mapping[param_name]
-                facial_params[std_param_name]["value"] = value
-                matched = True
-                error_tracking['recognized_messages'] += 1
-                logger.debug(f"Direct Match: {param_name} -> {std_param_name}")
+            if self.forward:
+                self.sender.send(address, value, echo=False)
             
-            # Fallback matching if not directly matched
-            if not matched:
-                # Case-insensitive matching
-                for possible_name in param_name_mapping.keys():
-                    if possible_name.lower() == param_name.lower():
-                        std_param_name = param_name_mapping[possible_name]
-                        facial_params[std_param_name]["value"] = value
-                        matched = True
-                        error_tracking['recognized_messages'] += 1
-                        logger.info(f"Fuzzy Match: {param_name} -> {std_param_name}")
-                        break
+            # Bit planes of binary parameters update their decoded base value
+            bit = self.binary_bits[slot]
+            if bit is not None:
+                slot, value = self.binary.apply(bit, value)
             
-            # Track unrecognized parameters
-            if not matched:
-                error_tracking['unrecognized_messages'] += 1
-                error_tracking['unrecognized_params'][param_name] = \
-                    error_tracking['unrecognized_params'].get(param_name, 0) + 1
-                logger.warning(f"Unrecognized Parameter: {param_name} = {value:.4f}")
+            self.values[slot] = value
+            if self.scorer_relevant[slot]:
+                self.scorer_dirty[slot] = True
+        
+        # Sequence markers are counted, not tracked as unknown parameters
+        elif address == SEQUENCE_ADDRESS:
+            self.sequence.record(value)
+        
+        # Track unrecognized parameters
+        else:
+            param_name = self.resolver.param_name(address)
+            seen_count = error_tracking['unrecognized_params'].get(param_name, 0)
+            error_tracking['unrecognized_messages'] += 1
+            error_tracking['unrecognized_params'][param_name] = seen_count + 1
             
-            # Only process and send updates at the throttled rate
+            # Warn once per parameter; repeats are counted in the summary
+            if seen_count == 0:
+                logger.warning("Unrecognized Parameter: %s = %.4f", param_name, value)
+            elif log_message:
+                logger.debug("Unrecognized Parameter: %s = %.4f", param_name, value)
+    
+    def record_dropped(self, counts):
+        """
+        Account for messages the listener's AddressFilter dropped.
+        
+        Args:
+            counts (dict): Address -> dropped messages, from a DropReport
+        """
+        filtered = self.error_tracking['filtered_addresses']
+        for address, count in counts.items():
+            filtered[address] = filtered.get(address, 0) + count
+        self.error_tracking['filtered_messages'] += sum(counts.values())
+    
+    def record_filtered(self, count):
+        """
+        Account for filtered messages known only as a total (ring transports).
+        
+        Args:
+            count (int): Messages the listener's AddressFilter dropped
+        """
+        self.error_tracking['filtered_messages'] += count
+    
+    def record_merged(self, count):
+        """
+        Account for bit plane messages the listener merged into one value.
+        
+        Args:
+            count (int): Messages that never reached the processor themselves
+        """
+        self.error_tracking['merged_messages'] += count
+    
+    def handle_records(self, records, live=True):
+        """
+        Apply a batch of pre-resolved records to the parameter state.
+        
+        Args:
+            records (np.ndarray): Records with ringbuffer.RECORD_DTYPE;
+                a slot of -1 marks an unrecognized address
+            live (bool): Timestamps are this session's listener receive
+                times (False for replayed recordings)
+        """
+        count = len(records)
+        if count == 0:
+            return
+        
+        if live:
+            now = time.monotonic()
+            timestamps = records['timestamp']
+            self.queue_latency.record_many(now - timestamps)
+            if self.pending_since is None:
+                self.pending_since = float(timestamps.min())
+                self.pending_dequeued = now
+        
+        if self.recorder is not None:
+            self.recorder.append_batch(records)
+        
+        slots = records['slot']
+        recognized = slots >= 0
+        recognized_count = int(np.count_nonzero(recognized))
+        
+        # Sequence markers from the ring listeners are counted, not tracked
+        # as unknown parameters
+        markers = slots == SEQUENCE_SLOT
+        marker_count = int(np.count_nonzero(markers))
+        if marker_count:
+            for value in records['value'][markers].tolist():
+                self.sequence.record(value)
+        
+        # Bit planes of binary parameters are decoded one by one, in order
+        is_bit = recognized & self.binary_mask[np.maximum(slots, 0)]
+        if is_bit.any():
+            recognized_plain = recognized & ~is_bit
+            binary_bits = self.binary_bits
+            for slot, value in zip(slots[is_bit].tolist(), records['value'][is_bit].tolist()):
+                base_slot, decoded = self.binary.apply(binary_bits[slot], value)
+                self.values[base_slot] = decoded
+                self.scorer_dirty[base_slot] = True
+        else:
+            recognized_plain = recognized
+        
+        # Records are in arrival order, so later updates to a slot win
+        recognized_slots = slots[recognized_plain]
+        self.values[recognized_slots] = records['value'][recognized_plain]
+        self.scorer.mark_many(recognized_slots)
+        
+        error_tracking = self.error_tracking
+        error_tracking['total_messages'] += count
+        error_tracking['recognized_messages'] += recognized_count
+        error_tracking['unrecognized_messages'] += count - recognized_count - marker_count
+    
+    def maybe_update(self):
+        """Run the scoring and send step if the throttle interval has elapsed."""
+        current_time = time.time()
+        time_diff_ms = (current_time - self.last_update_time) * 1000
+        
+        if time_diff_ms >= self.throttle_ms:
+            self.tick(current_time)
+    
+    def tick(self, current_time=None, timestamp=None):
+        """
+        Run one scoring and send step, plus the periodic summary.
+        
+        Args:
+            current_time (float, optional): Wall-clock time for the throttle
+            timestamp (float, optional): Monotonic time of this step, passed
+                to update(); replay supplies the recorded time
+        """
+        if current_time is None:
             current_time = time.time()
-            time_diff_ms = (current_time - last_update_time) * 1000
+        
+        if self.allocations is not None:
+            self.allocations.begin()
+            self.update(timestamp)
+            self.allocations.end()
+        else:
+            self.update(timestamp)
+        
+        if self.recorder is not None:
+            self.recorder.flush()
+        
+        now = time.monotonic()
+        if self.last_tick_time is not None:
+            self.tick_interval += 0.1 * (now - self.last_tick_time - self.tick_interval)
+        self.last_tick_time = now
+        self.ticks += 1
+        
+        if self.metrics is not None:
+            self.metrics.maybe_send_stats(now)
+        
+        # Update the last update time
+        self.last_update_time = current_time
+        
+        # Periodic summary logging, once per 100 new messages
+        summary_mark = self.error_tracking['total_messages'] // 100
+        if summary_mark != self.last_summary_mark:
+            self.last_summary_mark = summary_mark
+            self.log_summary()
+    
+    def update(self, timestamp=None):
+        """
+        Score the current parameter state and send the resulting hue.
+        
+        Args:
+            timestamp (float, optional): Monotonic time the hue filter and
+                output gate see for this step (default: now). Replay passes
+                the recorded time, so its output does not depend on how fast
+                the session is played back.
+        """
+        logger = self.logger
+        
+        score_start = time.monotonic()
+        
+        # Publish the frame for other local readers (no-op unless shared)
+        self.state.publish()
+        
+        # Rescore and reblend only when a weighted parameter changed. Nothing
+        # here allocates unless a sampled log block is written.
+        if self.scorer.update(self.values) or self.hue is None:
+            self.hue = self.hue_blender.blend(self.scores)
             
-            if time_diff_ms >= throttle_ms:
-                # Get current parameter values
-                current_values = {name: data["value"] for name, data in facial_params.items()}
-                
-                # Calculate emotion scores
-                emotion_scores, dominant_emotion, dominant_score = calculate_emotion_scores(current_values)
-                
-                # Calculate hue based on emotion blend
-                hue = calculate_emotion_hue(emotion_scores)
-                
-                # Smooth the hue value
-                smoothed_hue = smooth_value(value_history, hue, 'simple_average')
-                
-                # Log the hue value and emotion details
-                logger.info(f"Dominant Emotion: {dominant_emotion} (Score: {dominant_score:.2f})")
-                logger.info(f"Emotion Scores: {emotion_scores}")
-                logger.info(f"Calculated Hue: {smoothed_hue:.3f}")
+            if logger.isEnabledFor(logging.INFO) and log_sampler.allow('breakdown'):
+                log_score_breakdown(self.engine, self.values, self.emotion_scores, logger)
+        
+        # Smooth the hue value
+        smooth_start = time.monotonic()
+        if timestamp is None:
+            timestamp = smooth_start
+        smoothed_hue = self.hue_filter.update(self.hue, timestamp)
+        send_start = time.monotonic()
+        
+        # Log the hue value and emotion details (sampled). The logged scores
+        # are a copy, since the queue handler formats records later and the
+        # buffer is rewritten on the next rescore.
+        if logger.isEnabledFor(logging.INFO) and log_sampler.allow('tick'):
+            emotion_scores = self.emotion_scores
+            dominant_emotion = self.dominant_emotion
+            logger.info("Dominant Emotion: %s (Score: %.2f)", dominant_emotion, self.dominant_score)
+            logger.info("Emotion Scores: %s", emotion_scores)
+            logger.info("Calculated Hue: %.3f", smoothed_hue, extra={'data': {
+                'dominant_emotion': dominant_emotion,
+                'emotion_scores': emotion_scores,
+                'hue': smoothed_hue,
+            }})
+        
+        # Send smoothed hue value, plus all emotion scores as one bundle,
+        # when the output gate lets them through
+        self.output_values[0] = smoothed_hue
+        if self.output_addresses is not None:
+            np.copyto(self.output_scores, self.scores)
+        gate = self.output_gate
+        if gate.update(self.gated_values, timestamp):
+            if self.output_addresses is None:
+                self.sender.send_hue_shift(gate.sent.item(0))
+            else:
+                self.sender.send_bundle(self.output_addresses, gate.sent, time_tag=ntp_time_tag())
+        
+        # Stage latencies; the oldest pending message is now reflected in the output
+        send_end = time.monotonic()
+        latency = self.latency
+        latency['score'].record(smooth_start - score_start)
+        latency['smooth'].record(send_start - smooth_start)
+        latency['send'].record(send_end - send_start)
+        if self.pending_since is not None:
+            latency['wait'].record(score_start - self.pending_dequeued)
+            latency['end_to_end'].record(send_end - self.pending_since)
+            self.pending_since = None
+    
+    @property
+    def emotion_scores(self):
+        """Current scores as a new label -> score dict."""
+        return self.engine.to_dict(self.scores)
+    
+    @property
+    def dominant_emotion(self):
+        """Highest-scoring label (computed on access, only logging needs it)."""
+        return self.engine.labels[int(self.scores.argmax())]
+    
+    @property
+    def dominant_score(self):
+        return float(self.scores.max())
+    
+    def add_gauge(self, name, help_text, read):
+        """Export a transport-specific gauge (no-op when metrics are off)."""
+        if self.metrics is not None:
+            self.metrics.add_gauge(name, help_text, read)
+    
+    def tick_rate(self):
+        """Recent ticks per second (exponentially smoothed)."""
+        return 1.0 / self.tick_interval if self.tick_interval > 0 else 0.0
+    
+    def log_summary(self):
+        logger = self.logger
+        if not logger.isEnabledFor(logging.INFO):
+            return                  # The f-strings below would be built for nothing
+        error_tracking = self.error_tracking
+        elapsed_time = time.time() - self.start_time
+        
+        logger.info("Parameter Processing Summary:")
+        logger.info(f"  Total Messages: {error_tracking['total_messages']}")
+        logger.info(f"  Recognized: {error_tracking['recognized_messages']} ({error_tracking['recognized_messages']/error_tracking['total_messages']*100:.2f}%)")
+        logger.info(f"  Unrecognized: {error_tracking['unrecognized_messages']} ({error_tracking['unrecognized_messages']/error_tracking['total_messages']*100:.2f}%)")
+        logger.info(f"  Processing Rate: {error_tracking['total_messages']/elapsed_time:.2f} msg/sec")
+        logger.info(f"  Resolver: {self.resolver.stats()}")
+        logger.info(f"  Rescoring: {self.scorer.updates} updates, {self.scorer.skipped} skipped ticks")
+        if error_tracking['coalesced_messages']:
+            logger.info(f"  Coalesced: {error_tracking['coalesced_messages']} superseded updates")
+        if error_tracking['merged_messages']:
+            logger.info(f"  Merged in listener: {error_tracking['merged_messages']} binary bit plane messages")
+        if error_tracking['filtered_messages']:
+            top = sorted(error_tracking['filtered_addresses'].items(), key=lambda x: x[1], reverse=True)[:5]
+            top = f" (top: {', '.join(f'{address}={count}' for address, count in top)})" if top else ""
+            logger.info(f"  Filtered in listener: {error_tracking['filtered_messages']}{top}")
+        gate = self.output_gate
+        logger.info(f"  Output: {gate.sends} sends ({gate.keepalives} keepalives), {gate.suppressed} suppressed "
+                    f"({gate.suppressed_deadband} unchanged, {gate.suppressed_rate} rate-limited)")
+        if self.sequence.received:
+            stats = self.sequence.summary()
+            logger.info(f"  Load generator sequence: {stats['received']} of {stats['expected']} markers "
+                        f"({stats['loss_fraction']*100:.2f}% lost, {stats['reordered']} reordered)")
+        
+        # Latency percentiles per pipeline stage
+        latency = self.latency.summary()
+        if latency:
+            logger.info("Latency (ms):")
+            for stage, stats in latency.items():
+                logger.info(f"    {stage:10s} p50 {stats['p50_ms']:8.3f}  p99 {stats['p99_ms']:8.3f}  "
+                            f"p999 {stats['p999_ms']:8.3f}  max {stats['max_ms']:8.3f}  (n={stats['count']})")
+        
+        if self.allocations is not None and self.allocations.ticks:
+            stats = self.allocations.summary()
+            logger.info(f"  Allocations per tick: {stats['blocks_mean']:.1f} net blocks (max {stats['blocks_max']}), "
+                        f"{stats['peak_bytes_mean']:.0f} peak bytes (max {stats['peak_bytes_max']})")
+        
+        # Log top unrecognized parameters
+        if error_tracking['unrecognized_params']:
+            logger.info("Top Unrecognized Parameters:")
+            for param, count in sorted(error_tracking['unrecognized_params'].items(), key=lambda x: x[1], reverse=True)[:5]:
+                logger.info(f"    {param}: {count} occurrences")
+
+
+def add_scheduler_gauges(processor, scheduler):
+    """Export fixed-rate scheduler health through the processor's metrics."""
+    processor.add_gauge('missed_deadlines', 'Tick deadlines skipped because a tick ran late',
+                        lambda: scheduler.missed_deadlines)
+    processor.add_gauge('tick_jitter_max_seconds', 'Largest tick start lateness',
+                        lambda: scheduler.jitter_max)
+
+
+def handle_queue_item(processor, item):
+    """
+    Apply one Queue item.
+    
+    Items are (address, value, receive_time) from receive_osc, or
+    (batch, receive_time, merged) from the fast listener, where batch is a
+    list of (address, value) pairs and ``merged`` counts bit plane messages
+    it folded away. Filtering listeners also send DropReports.
+    """
+    if type(item) is DropReport:
+        processor.record_dropped(item.counts)
+    elif type(item[0]) is list:
+        batch, receive_time, merged = item
+        if merged:
+            processor.record_merged(merged)
+        processor.mark_received(receive_time, len(batch))
+        for address, value in batch:
+            processor.apply_message(address, value, receive_time)
+    else:
+        address, value, receive_time = item
+        processor.handle_message(address, value, receive_time)
+
+
+def process_data(queue, debug_level=1, throttle_ms=1000,
+                 send_ip="127.0.0.1", send_port=9000, log_options=None, rate_hz=None,
+                 **processor_options):
+    # Setup logging
+    logger = setup_logging(debug_level, **(log_options or {}))
+    try:
+        logger.info(f"Starting facial parameter processor")
+        logger.info(f"Debug Level: {debug_level}, Throttle: {throttle_ms}ms")
+        
+        sender = OSCSender(send_ip, send_port, verbose=debug_level >= 2)
+        processor = FacialProcessor(logger, throttle_ms, sender=sender, **processor_options)
+        processor.add_gauge('queue_depth', 'Items waiting in the listener queue', queue.qsize)
+        
+        if rate_hz:
+            run_scheduled_queue(queue, processor, rate_hz)
+            return
+        
+        while True:
+            try:
+                # Retrieve OSC message, or a list of them from the fast listener
+                item = queue.get(timeout=5)
+                handle_queue_item(processor, item)
                 
-                # Send smoothed hue value
-                send_hue_shift(smoothed_hue)
-                #send_message(address, value)   # really buggy, slow, and glitchy.
+                # Only process and send updates at the throttled rate
+                processor.maybe_update()
+            
+            except Exception as e:
+                processor.error_tracking['processing_errors'] += 1
+                logger.error(f"Processing Error: {str(e)}")
+                logger.error(traceback.format_exc())
                 
-                # Update the last update time
-                last_update_time = current_time
+                if "Empty" in str(e):
+                    logger.warning("No OSC messages received in the last 5 seconds")
                 
-                # Periodic summary logging
-                if error_tracking['total_messages'] % 100 == 0:
-                    current_time = time.time()
-                    elapsed_time = current_time - start_time
-                    
-                    logger.info("Parameter Processing Summary:")
-                    logger.info(f"  Total Messages: {error_tracking['total_messages']}")
-                    logger.info(f"  Recognized: {error_tracking['recognized_messages']} ({error_tracking['recognized_messages']/error_tracking['total_messages']*100:.2f}%)")
-                    logger.info(f"  Unrecognized: {error_tracking['unrecognized_messages']} ({error_tracking['unrecognized_messages']/error_tracking['total_messages']*100:.2f}%)")
-                    logger.info(f"  Processing Rate: {error_tracking['total_messages']/elapsed_time:.2f} msg/sec")
-                    
-                    # Log top unrecognized parameters
-                    if error_tracking['unrecognized_params']:
-                        logger.info("Top Unrecognized Parameters:")
-                        for param, count in sorted(error_tracking['unrecognized_params'].items(), key=lambda x: x[1], reverse=True)[:5]:
-                            logger.info(f"    {param}: {count} occurrences")
+                time.sleep(1)  # Prevent rapid error logging
+    finally:
+        stop_queue_logging()
+
+
+def run_scheduled_queue(queue, processor, rate_hz, max_drain=100000):
+    """
+    Drive scoring and sending at a fixed rate, independent of message arrival.
+    
+    Input is applied as it arrives while waiting for the next deadline. At
+    each deadline everything already pending is drained first, so the tick
+    sees the newest state. Ticks keep running when input stops.
+    
+    Args:
+        queue (multiprocessing.Queue): Input queue from the listener
+        processor (FacialProcessor): Processor to feed and tick
+        rate_hz (float): Tick rate
+        max_drain (int): Upper bound on items drained before a single tick
+    """
+    logger = processor.logger
+    scheduler = TickScheduler(rate_hz)
+    scheduler.add_stage(lambda: logger.info("Scheduler: %s", scheduler.stats()), every_seconds=10)
+    add_scheduler_gauges(processor, scheduler)
+    logger.info(f"Fixed-rate scheduling at {rate_hz} Hz")
+    last_receive_time = time.monotonic()
+    
+    while True:
+        try:
+            # Apply input as it arrives until the next deadline
+            timeout = scheduler.time_until_deadline()
+            if timeout > 0:
+                try:
+                    handle_queue_item(processor, queue.get(timeout=timeout))
+                    last_receive_time = time.monotonic()
+                except Empty:
+                    pass
+                continue
+            
+            # Deadline reached: drain everything already pending, then tick
+            for _ in range(max_drain):
+                try:
+                    item = queue.get_nowait()
+                except Empty:
+                    break
+                handle_queue_item(processor, item)
+                last_receive_time = time.monotonic()
+            
+            if time.monotonic() - last_receive_time >= 5:
+                logger.warning("No OSC messages received in the last 5 seconds")
+                last_receive_time = time.monotonic()
+            
+            scheduler.run_tick(processor.tick)
         
         except Exception as e:
-            error_tracking['processing_errors'] += 1
+            # No sleep here, a stalled loop would freeze the output
+            processor.error_tracking['processing_errors'] += 1
             logger.error(f"Processing Error: {str(e)}")
             logger.error(traceback.format_exc())
+
+
+def process_ring(ring_name, debug_level=1, throttle_ms=1000,
+                 send_ip="127.0.0.1", send_port=9000, poll_interval=0.0005, log_options=None,
+                 rate_hz=None, **processor_options):
+    """
+    Processing loop fed by a shared-memory RingBuffer instead of a Queue.
+    
+    Args:
+        ring_name (str): Name of the RingBuffer shared memory block
+        debug_level (int): Debug level (0-2)
+        throttle_ms (int): Throttle rate in milliseconds
+        send_ip (str): Output OSC target IP
+        send_port (int): Output OSC target port
+        poll_interval (float): Sleep in seconds when the ring is empty
+        log_options (dict, optional): Passed on to setup_logging
+        rate_hz (float, optional): Tick at a fixed rate instead of throttling
+            on message arrival
+        **processor_options: Passed on to FacialProcessor
+    """
+    # Setup logging
+    logger = setup_logging(debug_level, **(log_options or {}))
+    try:
+        logger.info(f"Starting facial parameter processor (ring buffer transport)")
+        logger.info(f"Debug Level: {debug_level}, Throttle: {throttle_ms}ms")
+        
+        ring = RingBuffer.attach(ring_name)
+        sender = OSCSender(send_ip, send_port, verbose=debug_level >= 2)
+        processor = FacialProcessor(logger, throttle_ms, sender=sender, **processor_options)
+        processor.add_gauge('queue_depth', 'Records waiting in the ring buffer', ring.pending)
+        processor.add_gauge('dropped_messages', 'Records dropped because the ring buffer was full',
+                            lambda: ring.dropped)
+        last_receive_time = time.time()
+        warned_dropped = 0
+        counted_merged = 0
+        counted_filtered = 0
+        
+        scheduler = None
+        if rate_hz:
+            scheduler = TickScheduler(rate_hz)
+            scheduler.add_stage(lambda: logger.info("Scheduler: %s", scheduler.stats()), every_seconds=10)
+            add_scheduler_gauges(processor, scheduler)
+            logger.info(f"Fixed-rate scheduling at {rate_hz} Hz")
+        
+        while True:
+            try:
+                records = ring.pop_batch()
+                
+                if len(records) == 0:
+                    if time.time() - last_receive_time >= 5:
+                        logger.warning("No OSC messages received in the last 5 seconds")
+                        last_receive_time = time.time()
+                else:
+                    last_receive_time = time.time()
+                    processor.handle_records(records)
+                    
+                    merged = ring.merged
+                    if merged != counted_merged:
+                        processor.record_merged(merged - counted_merged)
+                        counted_merged = merged
+                    
+                    dropped = ring.dropped
+                    if dropped != warned_dropped:
+                        logger.warning(f"Ring buffer full, {dropped - warned_dropped} records dropped")
+                        warned_dropped = dropped
+                
+                # Filter reports can arrive while no record does
+                filtered = ring.filtered
+                if filtered != counted_filtered:
+                    processor.record_filtered(filtered - counted_filtered)
+                    counted_filtered = filtered
+                
+                if scheduler is None:
+                    # Only process and send updates at the throttled rate
+                    if len(records) == 0:
+                        time.sleep(poll_interval)
+                        continue
+                    processor.maybe_update()
+                elif scheduler.due():
+                    # Drain anything that arrived meanwhile, then tick
+                    processor.handle_records(ring.pop_batch())
+                    scheduler.run_tick(processor.tick)
+                elif len(records) == 0:
+                    time.sleep(min(poll_interval, scheduler.time_until_deadline()))
             
-            if "Empty" in str(e):
-                logger.warning("No OSC messages received in the last 5 seconds")
+            except Exception as e:
+                processor.error_tracking['processing_errors'] += 1
+                logger.error(f"Processing Error: {str(e)}")
+                logger.error(traceback.format_exc())
+                if scheduler is None:
+                    time.sleep(1)  # Prevent rapid error logging
+    finally:
+        stop_queue_logging()
+
+
+
+def process_latest(table_name, debug_level=1, throttle_ms=1000,
+                   send_ip="127.0.0.1", send_port=9000, poll_interval=0.0005, log_options=None,
+                   rate_hz=None, **processor_options):
+    """
+    Processing loop fed by a coalescing LatestValueTable.
+    
+    Only the newest value per parameter reaches the processor, so a slow
+    tick never builds a backlog. Superseded updates are counted as
+    coalesced, and unrecognized addresses only as a count.
+    
+    Args:
+        table_name (str): Name of the LatestValueTable shared memory block
+        debug_level (int): Debug level (0-2)
+        throttle_ms (int): Throttle rate in milliseconds
+        send_ip (str): Output OSC target IP
+        send_port (int): Output OSC target port
+        poll_interval (float): Sleep in seconds when nothing changed
+        log_options (dict, optional): Passed on to setup_logging
+        rate_hz (float, optional): Tick at a fixed rate instead of throttling
+            on message arrival
+        **processor_options: Passed on to FacialProcessor
+    """
+    # Setup logging
+    logger = setup_logging(debug_level, **(log_options or {}))
+    try:
+        logger.info(f"Starting facial parameter processor (latest-value transport)")
+        logger.info(f"Debug Level: {debug_level}, Throttle: {throttle_ms}ms")
+        
+        table = LatestValueTable.attach(table_name)
+        sender = OSCSender(send_ip, send_port, verbose=debug_level >= 2)
+        processor = FacialProcessor(logger, throttle_ms, sender=sender, **processor_options)
+        processor.add_gauge('queue_depth', 'Parameters with an unread value', table.pending)
+        processor.add_gauge('coalesced_messages', 'Updates superseded before they were read',
+                            lambda: table.coalesced)
+        error_tracking = processor.error_tracking
+        last_receive_time = time.time()
+        counted_unrecognized = 0
+        counted_coalesced = 0
+        counted_merged = 0
+        counted_filtered = 0
+        
+        scheduler = None
+        if rate_hz:
+            scheduler = TickScheduler(rate_hz)
+            scheduler.add_stage(lambda: logger.info("Scheduler: %s", scheduler.stats()), every_seconds=10)
+            add_scheduler_gauges(processor, scheduler)
+            logger.info(f"Fixed-rate scheduling at {rate_hz} Hz")
+        
+        while True:
+            try:
+                records = table.pop_batch()
+                processor.handle_records(records)
+                
+                # Account for messages that never became a record
+                unrecognized = table.unrecognized - counted_unrecognized
+                coalesced = table.coalesced - counted_coalesced
+                if unrecognized or coalesced:
+                    counted_unrecognized += unrecognized
+                    counted_coalesced += coalesced
+                    error_tracking['total_messages'] += unrecognized + coalesced
+                    error_tracking['recognized_messages'] += coalesced
+                    error_tracking['unrecognized_messages'] += unrecognized
+                    error_tracking['coalesced_messages'] += coalesced
+                
+                merged = table.merged
+                if merged != counted_merged:
+                    processor.record_merged(merged - counted_merged)
+                    counted_merged = merged
+                filtered = table.filtered
+                if filtered != counted_filtered:
+                    processor.record_filtered(filtered - counted_filtered)
+                    counted_filtered = filtered
+                
+                received = len(records) or unrecognized
+                if not received:
+                    if time.time() - last_receive_time >= 5:
+                        logger.warning("No OSC messages received in the last 5 seconds")
+                        last_receive_time = time.time()
+                else:
+                    last_receive_time = time.time()
+                
+                if scheduler is None:
+                    # Only process and send updates at the throttled rate
+                    if not received:
+                        time.sleep(poll_interval)
+                        continue
+                    processor.maybe_update()
+                elif scheduler.due():
+                    # Pick up anything that changed meanwhile, then tick
+                    processor.handle_records(table.pop_batch())
+                    scheduler.run_tick(processor.tick)
+                elif not received:
+                    time.sleep(min(poll_interval, scheduler.time_until_deadline()))
             
-            time.sleep(1)  # Prevent rapid error logging
+            except Exception as e:
+                processor.error_tracking['processing_errors'] += 1
+                logger.error(f"Processing Error: {str(e)}")
+                logger.error(traceback.format_exc())
+                if scheduler is None:
+                    time.sleep(1)  # Prevent rapid error logging
+    finally:
+        stop_queue_logging()
+
+
+def process_replay(path, debug_level=1, throttle_ms=1000,
+                   send_ip="127.0.0.1", send_port=9000, speed=1.0, log_options=None, rate_hz=None,
+                   **processor_options):
+    """
+    Feed a recorded session through the processor instead of listening on UDP.
+    
+    Args:
+        path (str): Session file written with --record
+        debug_level (int): Debug level (0-2)
+        throttle_ms (int): Tick interval in recorded time (milliseconds)
+        send_ip (str): Output OSC target IP
+        send_port (int): Output OSC target port
+        speed (float): Playback speed (1 = real time, 0 = as fast as possible)
+        log_options (dict, optional): Passed on to setup_logging
+        rate_hz (float, optional): Tick rate in recorded time, overrides throttle_ms
+        **processor_options: Passed on to FacialProcessor
+    
+    Returns:
+        dict: Replay statistics (see recording.replay_session)
+    """
+    # Setup logging
+    logger = setup_logging(debug_level, **(log_options or {}))
+    try:
+        logger.info(f"Replaying session {path}")
+        
+        records = load_session(path)
+        sender = OSCSender(send_ip, send_port, verbose=debug_level >= 2)
+        processor = FacialProcessor(logger, throttle_ms, sender=sender, **processor_options)
+        interval = 1.0 / rate_hz if rate_hz else throttle_ms / 1000
+        
+        stats = replay_session(processor, records, interval, speed=speed)
+        if processor.error_tracking['total_messages']:
+            processor.log_summary()
+        logger.info("Replay: %s", stats)
+        return stats
+    finally:
+        stop_queue_logging()
@@ -0,0 +1,201 @@
+import cProfile
+import os
+import pstats
+import signal
+import sys
+import tracemalloc
+
+PROFILE_MODES = ('cpu', 'sample', 'alloc')
+
+
+class Profiler:
+    """
+    Process-wide profiler that writes its results on stop or on SIGUSR1.
+
+    Modes:
+        cpu: cProfile, written as ``<prefix>.pstats`` plus a text summary
+        sample: SIGPROF sampling timer (Unix), written as collapsed stacks
+            (``<prefix>.collapsed``) for flame graph tools; much lower
+            overhead than cProfile
+        alloc: tracemalloc, written as a text report of the top allocation
+            sites and a ``<prefix>.snapshot`` for tracemalloc comparisons
+    """
+
+    def __init__(self, mode, path_prefix, sample_interval=0.001, alloc_frames=10):
+        """
+        Args:
+            mode (str): One of PROFILE_MODES
+            path_prefix (str): Output files are written as <path_prefix>.<ext>
+            sample_interval (float): Seconds of CPU time between samples
+            alloc_frames (int): Traceback depth kept per allocation
+        """
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode: {mode}")
+        if mode == 'sample' and not hasattr(signal, 'setitimer'):
+            raise ValueError("Sampling profiler needs signal.setitimer (not available on this platform)")
+
+        self.mode = mode
+        self.path_prefix = path_prefix
+        self.sample_interval = sample_interval
+        self.alloc_frames = alloc_frames
+        self.running = False
+        self.dumps = 0
+
+        self._profile = None
+        self._stacks = {}
+
+    def start(self):
+        if self.mode == 'cpu':
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        elif self.mode == 'sample':
+            signal.signal(signal.SIGPROF, self._sample)
+            signal.setitimer(signal.ITIMER_PROF, self.sample_interval, self.sample_interval)
+        else:
+            tracemalloc.start(self.alloc_frames)
+        self.running = True
+
+    def stop(self):
+        """Stop profiling and write the results."""
+        if not self.running:
+            return
+        # A further Ctrl+C or the parent's terminate() must not cut the dump short
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+        if self.mode == 'cpu':
+            self._profile.disable()
+        elif self.mode == 'sample':
+            signal.setitimer(signal.ITIMER_PROF, 0, 0)
+        self.dump()
+        if self.mode == 'alloc':
+            tracemalloc.stop()
+        self.running = False
+
+    def _sample(self, signum, frame):
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+            frame = frame.f_back
+        key = ';'.join(reversed(stack))
+        self._stacks[key] = self._stacks.get(key, 0) + 1
+
+    def dump(self):
+        """Write the results collected so far (profiling continues)."""
+        self.dumps += 1
+        if self.mode == 'cpu':
+            running = self.running
+            self._profile.disable()
+            stats = pstats.Stats(self._profile)
+            stats.dump_stats(self.path_prefix + '.pstats')
+            with open(self.path_prefix + '.txt', 'w', encoding='utf-8') as f:
+                stats.stream = f
+                stats.sort_stats('cumulative').print_stats(40)
+                stats.sort_stats('tottime').print_stats(40)
+            if running:
+                self._profile.enable()
+            written = [self.path_prefix + '.pstats', self.path_prefix + '.txt']
+
+        elif self.mode == 'sample':
+            with open(self.path_prefix + '.collapsed', 'w', encoding='utf-8') as f:
+                for stack, count in sorted(self._stacks.items()):
+                    f.write(f"{stack} {count}\n")
+            written = [self.path_prefix + '.collapsed']
+
+        else:
+            snapshot = tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+            ))
+            snapshot.dump(self.path_prefix + '.snapshot')
+            current, peak = tracemalloc.get_traced_memory()
+            with open(self.path_prefix + '.txt', 'w', encoding='utf-8') as f:
+                f.write(f"Traced memory: current {current} bytes, peak {peak} bytes\n\n")
+                f.write("Top allocation sites:\n")
+                for stat in snapshot.statistics('lineno')[:40]:
+                    f.write(f"  {stat}\n")
+                f.write("\nLargest tracebacks:\n")
+                for stat in snapshot.statistics('traceback')[:10]:
+                    f.write(f"\n  {stat}\n")
+                    for line in stat.traceback.format():
+                        f.write(f"    {line}\n")
+            written = [self.path_prefix + '.snapshot', self.path_prefix + '.txt']
+
+        print(f"Profile ({self.mode}) written to {', '.join(written)}")
+
+    def install_signal_handlers(self):
+        """
+        Dump on SIGUSR1 (where available) and turn SIGTERM into a clean exit.
+
+        multiprocessing terminates daemon children with SIGTERM, which would
+        otherwise kill the process before the results are written.
+        """
+        if hasattr(signal, 'SIGUSR1'):
+            signal.signal(signal.SIGUSR1, lambda signum, frame: self.dump())
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+
+def run_profiled(mode, path_prefix, target, *args, **kwargs):
+    """
+    Run ``target(*args, **kwargs)`` under a Profiler, writing results when it ends.
+
+    Usable directly as a multiprocessing Process target.
+    """
+    profiler = Profiler(mode, path_prefix)
+    profiler.install_signal_handlers()
+    profiler.start()
+    try:
+        return target(*args, **kwargs)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        profiler.stop()
+
+
+class AllocationCounter:
+    """
+    Per-tick memory accounting.
+
+    Counts net allocated blocks (``sys.getallocatedblocks``) per tick, and
+    with tracemalloc running also the transient peak bytes, which catches
+    temporary objects that are freed before the tick ends.
+    """
+
+    def __init__(self):
+        self.ticks = 0
+        self.blocks_total = 0
+        self.blocks_max = 0
+        self.peak_bytes_total = 0
+        self.peak_bytes_max = 0
+        self._blocks = 0
+        self._traced = 0
+
+    def begin(self):
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+            self._traced = tracemalloc.get_traced_memory()[0]
+        self._blocks = sys.getallocatedblocks()
+
+    def end(self):
+        blocks = sys.getallocatedblocks() - self._blocks
+        self.ticks += 1
+        self.blocks_total += blocks
+        if blocks > self.blocks_max:
+            self.blocks_max = blocks
+        if tracemalloc.is_tracing():
+            peak = tracemalloc.get_traced_memory()[1] - self._traced
+            self.peak_bytes_total += peak
+            if peak > self.peak_bytes_max:
+                self.peak_bytes_max = peak
+
+    def summary(self):
+        """Mean and max net blocks and transient peak bytes per tick."""
+        ticks = self.ticks or 1
+        return {
+            'ticks': self.ticks,
+            'blocks_mean': self.blocks_total / ticks,
+            'blocks_max': self.blocks_max,
+            'peak_bytes_mean': self.peak_bytes_total / ticks,
+            'peak_bytes_max': self.peak_bytes_max,
+        }
@@ -0,0 +1,238 @@
+import json
+import mmap
+import os
+import struct
+import time
+
+import numpy as np
+
+from ringbuffer import RECORD_DTYPE
+from unified_expressions import PARAM_NAMES
+
+# File layout: header, slot-name table (JSON), padding, then RECORD_DTYPE records.
+# The header holds the magic, the name table length and the record count.
+SESSION_MAGIC = b'MHSESS01'
+_HEADER = struct.Struct('<8sIIQ')
+_COUNT_OFFSET = 16
+_ALIGN = 64
+
+
+def _data_offset(names_size):
+    size = _HEADER.size + names_size
+    return (size + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+class SessionRecorder:
+    """
+    Append (slot, value, timestamp) records to a memory-mapped session file.
+
+    Records use the ring buffer layout (ringbuffer.RECORD_DTYPE), so a
+    recording can be fed straight back into ``FacialProcessor.handle_records``.
+    The file grows in chunks and the record count in the header is updated
+    on every ``flush``, so a killed process still leaves a readable file.
+    """
+
+    def __init__(self, path, param_names=PARAM_NAMES, chunk_records=65536):
+        """
+        Args:
+            path (str): Output file (overwritten)
+            param_names (tuple): Slot -> parameter name, stored so a later
+                parameter table can remap the slots on load
+            chunk_records (int): Number of records the file grows by
+        """
+        self.path = path
+        self.chunk_records = chunk_records
+        self.count = 0
+
+        names = json.dumps(list(param_names)).encode('utf-8')
+        self._offset = _data_offset(len(names))
+
+        self._file = open(path, 'w+b')
+        self._file.write(_HEADER.pack(SESSION_MAGIC, len(names), 0, 0))
+        self._file.write(names)
+        self._map = None
+        self._records = None
+        self._capacity = 0
+        self._grow(chunk_records)
+
+    def _grow(self, min_capacity):
+        capacity = self._capacity
+        while capacity < min_capacity:
+            capacity += self.chunk_records
+
+        # The array view must go before the map can be closed
+        self._records = None
+        if self._map is not None:
+            self._map.close()
+
+        self._file.truncate(self._offset + capacity * RECORD_DTYPE.itemsize)
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        self._records = np.ndarray((capacity,), dtype=RECORD_DTYPE, buffer=self._map, offset=self._offset)
+        self._capacity = capacity
+
+    def append(self, slot, value, timestamp=None):
+        """
+        Record one message.
+
+        Args:
+            slot (int): Parameter slot, -1 for unrecognized addresses
+            value (float): Parameter value
+            timestamp (float, optional): Monotonic time, defaults to now
+        """
+        if self.count == self._capacity:
+            self._grow(self.count + 1)
+        if timestamp is None:
+            timestamp = time.monotonic()
+        self._records[self.count] = (slot, value, timestamp)
+        self.count += 1
+
+    def append_batch(self, records):
+        """Record an array of RECORD_DTYPE records."""
+        count = len(records)
+        end = self.count + count
+        if end > self._capacity:
+            self._grow(end)
+        self._records[self.count:end] = records
+        self.count = end
+
+    def flush(self):
+        """Publish the record count in the header."""
+        struct.pack_into('<Q', self._map, _COUNT_OFFSET, self.count)
+
+    def close(self):
+        """Flush and trim the file to the recorded length."""
+        if self._file.closed:
+            return
+        self.flush()
+        self._records = None
+        self._map.close()
+        self._file.truncate(self._offset + self.count * RECORD_DTYPE.itemsize)
+        self._file.close()
+
+
+def load_session(path, param_names=PARAM_NAMES):
+    """
+    Load a recorded session.
+
+    Slots are remapped by name when the file was recorded with a different
+    parameter table; parameters that no longer exist become -1.
+
+    Args:
+        path (str): Session file
+        param_names (tuple): Slot -> parameter name to map onto
+
+    Returns:
+        np.ndarray: RECORD_DTYPE records (read-only memory map when no
+            remapping was needed)
+    """
+    with open(path, 'rb') as f:
+        magic, names_size, _, count = _HEADER.unpack(f.read(_HEADER.size))
+        if magic != SESSION_MAGIC:
+            raise ValueError(f"Not a session recording: {path}")
+        recorded_names = json.loads(f.read(names_size).decode('utf-8'))
+
+    offset = _data_offset(names_size)
+    if count == 0:
+        return np.zeros(0, dtype=RECORD_DTYPE)
+    records = np.memmap(path, dtype=RECORD_DTYPE, mode='r', offset=offset, shape=(count,))
+
+    if tuple(recorded_names) == tuple(param_names):
+        return records
+
+    index = {name: slot for slot, name in enumerate(param_names)}
+    # Extra last entry maps the unrecognized slot (-1) onto itself
+    mapping = np.array([index.get(name, -1) for name in recorded_names] + [-1], dtype=np.int32)
+    remapped = np.array(records)
+    remapped['slot'] = mapping[remapped['slot']]
+    return remapped
+
+
+def tick_boundaries(timestamps, interval):
+    """
+    Tick grid of a recording in recorded time.
+
+    Tick ``i`` applies every record up to ``interval * (i + 1)`` seconds
+    after the first one; the last tick covers the final record.
+
+    Args:
+        timestamps (np.ndarray): Record timestamps, in arrival order
+        interval (float): Seconds of recorded time between ticks
+
+    Returns:
+        tuple: (session time of each tick, end record index of each tick)
+    """
+    first = float(timestamps[0])
+    duration = float(timestamps[-1]) - first
+    boundaries = first + interval * np.arange(1, int(duration // interval) + 2)
+    return boundaries - first, np.searchsorted(timestamps, boundaries, side='right')
+
+
+def replay_session(processor, records, interval, speed=None, on_tick=None):
+    """
+    Feed recorded records through a processor, ticking on recorded time.
+
+    Records are applied in batches at tick boundaries spaced ``interval``
+    seconds apart in recorded time, so the scoring output only depends on
+    the recording and the tick interval, not on how fast the replay runs.
+    Each tick is stamped with its recorded time, which drives the hue
+    filter and output gate in place of the wall clock.
+
+    Args:
+        processor (FacialProcessor): Processor to feed
+        records (np.ndarray): RECORD_DTYPE records, e.g. from load_session
+        interval (float): Seconds of recorded time between ticks
+        speed (float, optional): Playback speed (1 = real time); None or 0
+            replays as fast as possible
+        on_tick (callable, optional): Called with (session_time, processor)
+            after every tick
+
+    Returns:
+        dict: Records, ticks, session duration, wall time and throughput
+    """
+    timestamps = records['timestamp']
+    count = len(records)
+    start = time.perf_counter()
+    ticks = 0
+
+    if count:
+        first = float(timestamps[0])
+        duration = float(timestamps[-1]) - first
+        session_times, ends = tick_boundaries(timestamps, interval)
+
+        begin = 0
+        for session_time, end in zip(session_times.tolist(), ends.tolist()):
+            if speed:
+                delay = start + session_time / speed - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            if end > begin:
+                processor.handle_records(records[begin:end], live=False)
+                begin = end
+            processor.tick(timestamp=first + session_time)
+            ticks += 1
+            if on_tick is not None:
+                on_tick(session_time, processor)
+    else:
+        duration = 0.0
+
+    elapsed = time.perf_counter() - start
+    return {
+        'records': count,
+        'ticks': ticks,
+        'session_seconds': duration,
+        'wall_seconds': elapsed,
+        'records_per_second': count / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def session_info(path):
+    """Basic facts about a session file, for logging."""
+    records = load_session(path)
+    size = os.path.getsize(path)
+    if len(records) == 0:
+        return {'records': 0, 'bytes': size, 'seconds': 0.0}
+    return {
+        'records': len(records),
+        'bytes': size,
+        'seconds': float(records['timestamp'][-1] - records['timestamp'][0]),
+    }
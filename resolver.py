@@ -0,0 +1,116 @@
+from unified_expressions import PARAM_ALIASES, PARAM_NAMES
+
+_MISSING = object()
+
+
+class AddressResolver:
+    """
+    Resolve full OSC addresses to FACIAL_PARAMS slot indices.
+
+    Names are looked up in the immutable alias table built once from
+    FACIAL_PARAMS. Resolved addresses are memoized and unrecognized ones are
+    kept in a negative cache, both bounded by evicting their oldest entry, so
+    in steady state a lookup is a single dict probe with no string splitting.
+    """
+
+    def __init__(self, alias_table=None, param_names=None, max_cached=4096, max_unrecognized=4096):
+        """
+        Args:
+            alias_table (Mapping, optional): Name -> slot, defaults to PARAM_ALIASES
+            param_names (tuple, optional): Slot -> standard name, defaults to PARAM_NAMES
+            max_cached (int): Maximum number of resolved addresses memoized
+            max_unrecognized (int): Maximum number of addresses in the negative cache
+        """
+        if alias_table is None:
+            alias_table = PARAM_ALIASES
+        if param_names is None:
+            param_names = PARAM_NAMES
+
+        self.param_names = tuple(param_names)
+        self.max_cached = max_cached
+        self.max_unrecognized = max_unrecognized
+
+        self.name_to_slot = alias_table
+        self.lower_to_slot = {}
+        for name, slot in self.name_to_slot.items():
+            self.lower_to_slot.setdefault(name.lower(), slot)
+
+        self._cache = {}
+        self._unrecognized = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.direct_matches = 0
+        self.fuzzy_matches = 0
+
+    def resolve(self, address):
+        """
+        Resolve an address to a slot index.
+
+        Args:
+            address (str): Full OSC address, e.g. /avatar/parameters/JawOpen
+
+        Returns:
+            int: Slot index, or None if the address is not a facial parameter
+        """
+        slot = self._cache.get(address, _MISSING)
+        if slot is not _MISSING:
+            self.hits += 1
+            return slot
+
+        if address in self._unrecognized:
+            self.hits += 1
+            self._unrecognized[address] += 1
+            return None
+
+        self.misses += 1
+        return self._resolve_slow(address)
+
+    def _resolve_slow(self, address):
+        param_name = self.param_name(address)
+
+        # Direct mapping
+        slot = self.name_to_slot.get(param_name)
+        if slot is not None:
+            self.direct_matches += 1
+        else:
+            # Case-insensitive matching
+            slot = self.lower_to_slot.get(param_name.lower())
+            if slot is not None:
+                self.fuzzy_matches += 1
+
+        if slot is not None:
+            if len(self._cache) >= self.max_cached:
+                # Many prefixes can carry the same name; keep the memo bounded
+                del self._cache[next(iter(self._cache))]
+            self._cache[address] = slot
+            return slot
+
+        if len(self._unrecognized) >= self.max_unrecognized:
+            # Evict the oldest entry to keep the negative cache bounded
+            del self._unrecognized[next(iter(self._unrecognized))]
+        self._unrecognized[address] = 1
+        return None
+
+    @staticmethod
+    def param_name(address):
+        """Return the parameter name (last path segment) of an address."""
+        return address.rsplit('/', 1)[-1]
+
+    def stats(self):
+        """
+        Snapshot resolver statistics.
+
+        Returns:
+            dict: Cache hit/miss counts and cache sizes
+        """
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'direct_matches': self.direct_matches,
+            'fuzzy_matches': self.fuzzy_matches,
+            'cached_addresses': len(self._cache),
+            'unrecognized_addresses': len(self._unrecognized),
+        }
@@ -0,0 +1,157 @@
+import struct
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Record layout: parameter slot (-1 if unrecognized), value, monotonic timestamp
+RECORD_DTYPE = np.dtype([('slot', '<i4'), ('value', '<f4'), ('timestamp', '<f8')])
+_RECORD = struct.Struct('<ifd')
+
+# Header: write index, read index, dropped, merged and filtered counts on
+# separate cache lines
+_INDEX = struct.Struct('<Q')
+_WRITE_OFFSET = 0
+_READ_OFFSET = 64
+_DROPPED_OFFSET = 128
+_MERGED_OFFSET = 192
+_FILTERED_OFFSET = 256
+_HEADER_SIZE = 320
+
+
+class RingBuffer:
+    """
+    Fixed-size single-producer/single-consumer ring buffer in shared memory.
+
+    Holds (slot, value, timestamp) records. The producer only advances the
+    write index and the consumer only advances the read index, so no lock is
+    needed as long as there is exactly one of each. When the ring is full new
+    records are dropped and counted rather than blocking the producer.
+    """
+
+    def __init__(self, name=None, capacity=65536, create=True):
+        """
+        Args:
+            name (str, optional): Shared memory block name (generated if None)
+            capacity (int): Number of records, rounded up to a power of two
+            create (bool): Create the block, or attach to an existing one
+        """
+        if create:
+            capacity = 1 << max(0, int(capacity) - 1).bit_length()
+            size = _HEADER_SIZE + capacity * RECORD_DTYPE.itemsize
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+            self._shm.buf[:_HEADER_SIZE] = bytes(_HEADER_SIZE)
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+            capacity = (self._shm.size - _HEADER_SIZE) // RECORD_DTYPE.itemsize
+            # Some platforms round the block size up to a page
+            capacity = 1 << (capacity.bit_length() - 1)
+
+        self.name = self._shm.name
+        self.capacity = capacity
+        self._mask = capacity - 1
+        self._owner = create
+        self._buf = self._shm.buf
+        self._records = np.ndarray(
+            (capacity,), dtype=RECORD_DTYPE, buffer=self._shm.buf, offset=_HEADER_SIZE
+        )
+
+        # Producer-side cached indices avoid re-reading our own counter
+        self._write = _INDEX.unpack_from(self._buf, _WRITE_OFFSET)[0]
+        self._read = _INDEX.unpack_from(self._buf, _READ_OFFSET)[0]
+        self._read_limit = self._read + capacity
+        self._merged = _INDEX.unpack_from(self._buf, _MERGED_OFFSET)[0]
+        self._filtered = _INDEX.unpack_from(self._buf, _FILTERED_OFFSET)[0]
+
+    @classmethod
+    def attach(cls, name):
+        """Attach to a ring created by another process."""
+        return cls(name=name, create=False)
+
+    # Producer side
+
+    def push(self, slot, value, timestamp):
+        """
+        Append one record.
+
+        Returns:
+            bool: False if the ring was full and the record was dropped
+        """
+        write = self._write
+        if write >= self._read_limit:
+            # Refresh the consumer position only when we look full
+            self._read_limit = _INDEX.unpack_from(self._buf, _READ_OFFSET)[0] + self.capacity
+            if write >= self._read_limit:
+                dropped = _INDEX.unpack_from(self._buf, _DROPPED_OFFSET)[0]
+                _INDEX.pack_into(self._buf, _DROPPED_OFFSET, dropped + 1)
+                return False
+
+        _RECORD.pack_into(self._buf, _HEADER_SIZE + (write & self._mask) * _RECORD.size,
+                          slot, value, timestamp)
+        # Publish the record only after it is fully written
+        self._write = write + 1
+        _INDEX.pack_into(self._buf, _WRITE_OFFSET, self._write)
+        return True
+
+    def count_merged(self, count):
+        """Count messages the producer folded into other records (binary bit planes)."""
+        self._merged += count
+        _INDEX.pack_into(self._buf, _MERGED_OFFSET, self._merged)
+
+    def count_filtered(self, count):
+        """Count messages the producer's address filter dropped."""
+        self._filtered += count
+        _INDEX.pack_into(self._buf, _FILTERED_OFFSET, self._filtered)
+
+    # Consumer side
+
+    def pending(self):
+        """Number of records waiting to be read."""
+        return _INDEX.unpack_from(self._buf, _WRITE_OFFSET)[0] - self._read
+
+    def pop_batch(self, max_records=None):
+        """
+        Read all pending records (up to ``max_records``).
+
+        Returns:
+            np.ndarray: Copied records with RECORD_DTYPE (possibly empty)
+        """
+        write = _INDEX.unpack_from(self._buf, _WRITE_OFFSET)[0]
+        count = write - self._read
+        if max_records is not None:
+            count = min(count, max_records)
+        if count <= 0:
+            return self._records[:0].copy()
+
+        start = self._read & self._mask
+        end = start + count
+        if end <= self.capacity:
+            batch = self._records[start:end].copy()
+        else:
+            batch = np.concatenate((self._records[start:], self._records[:end - self.capacity]))
+
+        self._read += count
+        _INDEX.pack_into(self._buf, _READ_OFFSET, self._read)
+        return batch
+
+    @property
+    def dropped(self):
+        """Records dropped by the producer because the ring was full."""
+        return _INDEX.unpack_from(self._buf, _DROPPED_OFFSET)[0]
+
+    @property
+    def merged(self):
+        """Messages the producer folded into other records instead of pushing them."""
+        return _INDEX.unpack_from(self._buf, _MERGED_OFFSET)[0]
+
+    @property
+    def filtered(self):
+        """Messages the producer's address filter dropped."""
+        return _INDEX.unpack_from(self._buf, _FILTERED_OFFSET)[0]
+
+    def close(self):
+        """Detach, and free the block if this side created it."""
+        self._records = None
+        self._buf = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
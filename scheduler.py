@@ -0,0 +1,101 @@
+import math
+import time
+
+
+class TickScheduler:
+    """
+    Fixed-rate tick scheduler driven by monotonic deadlines.
+
+    Deadlines advance by a whole interval each tick, so the rate does not
+    drift with processing time. When a tick runs more than one interval late,
+    the missed deadlines are counted and skipped instead of being run back
+    to back. Lower-priority stages can run every N ticks.
+    """
+
+    def __init__(self, rate_hz, clock=time.monotonic):
+        """
+        Args:
+            rate_hz (float): Ticks per second
+            clock (callable): Monotonic clock in seconds
+        """
+        if rate_hz <= 0:
+            raise ValueError(f"Tick rate must be positive, got {rate_hz}")
+
+        self.rate_hz = rate_hz
+        self.interval = 1.0 / rate_hz
+        self.clock = clock
+        self.next_deadline = clock() + self.interval
+        self.stages = []
+
+        self.ticks = 0
+        self.missed_deadlines = 0
+        self.jitter_total = 0.0
+        self.jitter_max = 0.0
+        self.last_jitter = 0.0
+
+    def add_stage(self, callback, every_ticks=None, every_seconds=None):
+        """
+        Run ``callback`` after every N-th tick.
+
+        Args:
+            callback (callable): Called with no arguments
+            every_ticks (int, optional): Run every N ticks
+            every_seconds (float, optional): Alternative to ``every_ticks``
+        """
+        if every_ticks is None:
+            every_ticks = max(1, round((every_seconds or 0) * self.rate_hz))
+        self.stages.append((every_ticks, callback))
+
+    def time_until_deadline(self):
+        """Seconds left until the next tick is due (0 if already due)."""
+        return max(0.0, self.next_deadline - self.clock())
+
+    def due(self):
+        return self.clock() >= self.next_deadline
+
+    def run_tick(self, callback):
+        """
+        Run one tick and schedule the next deadline.
+
+        Args:
+            callback (callable): The tick work, called with no arguments
+        """
+        start = self.clock()
+        lateness = max(0.0, start - self.next_deadline)
+        self.last_jitter = lateness
+        self.jitter_total += lateness
+        if lateness > self.jitter_max:
+            self.jitter_max = lateness
+
+        try:
+            callback()
+            self.ticks += 1
+
+            for every_ticks, stage in self.stages:
+                if self.ticks % every_ticks == 0:
+                    stage()
+        finally:
+            # Always advance, so a failing tick cannot spin the loop
+            self.next_deadline += self.interval
+            now = self.clock()
+            if now >= self.next_deadline:
+                # Skip deadlines we can no longer meet, keeping the tick phase
+                missed = math.floor((now - self.next_deadline) / self.interval) + 1
+                self.missed_deadlines += missed
+                self.next_deadline += missed * self.interval
+
+    def stats(self):
+        """
+        Snapshot tick statistics.
+
+        Returns:
+            dict: Tick count, missed deadlines and jitter (milliseconds)
+        """
+        return {
+            'rate_hz': self.rate_hz,
+            'ticks': self.ticks,
+            'missed_deadlines': self.missed_deadlines,
+            'jitter_mean_ms': self.jitter_total / self.ticks * 1000 if self.ticks else 0.0,
+            'jitter_max_ms': self.jitter_max * 1000,
+            'jitter_last_ms': self.last_jitter * 1000,
+        }
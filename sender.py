@@ -1,9 +1,204 @@
+import socket
+import struct
+import time
 from pythonosc.udp_client import SimpleUDPClient
 
 # Debugging vars for unit testing
 ip = "127.0.0.1"
 port = 9000             # VRChat's OSC receiver port
 
+HUE_SHIFT_ADDRESS = "/avatar/parameters/HueShift"
+
+_FLOAT = struct.Struct('>f')
+_INT = struct.Struct('>i')
+_TIME_TAG = struct.Struct('>Q')
+_BUNDLE_HEADER = b'#bundle\x00' + _TIME_TAG.pack(1)     # Time tag 1 = immediately
+
+# Seconds between the NTP epoch (1900) and the Unix epoch (1970)
+_NTP_DELTA = 2208988800
+
+
+def _osc_string(text):
+    data = text.encode('utf-8')
+    return data + b'\x00' * (4 - len(data) % 4)
+
+
+def ntp_time_tag(timestamp=None):
+    """
+    Encode a Unix timestamp as a 64-bit OSC/NTP time tag.
+
+    Args:
+        timestamp (float, optional): Unix time, defaults to now
+    """
+    if timestamp is None:
+        timestamp = time.time()
+    return int((timestamp + _NTP_DELTA) * (1 << 32))
+
+
+def _type_tag(value):
+    if value is True:
+        return 'T'
+    if value is False:
+        return 'F'
+    if isinstance(value, int):
+        return 'i'
+    return 'f'
+
+
+class BundleTemplate:
+    """
+    Pre-encoded OSC bundle of float messages for a fixed list of addresses.
+
+    Only the float payloads are patched on each send.
+    """
+
+    def __init__(self, addresses):
+        self.addresses = tuple(addresses)
+        self.index = {address: i for i, address in enumerate(self.addresses)}
+        self.data = bytearray(_BUNDLE_HEADER)
+        self.offsets = []
+
+        for address in self.addresses:
+            message = _osc_string(address) + _osc_string(',f')
+            self.data += _INT.pack(len(message) + 4)
+            self.data += message
+            self.offsets.append(len(self.data))
+            self.data += b'\x00' * 4
+
+    def set_time_tag(self, time_tag):
+        """Set the 64-bit NTP time tag (1 means immediately)."""
+        _TIME_TAG.pack_into(self.data, 8, time_tag)
+
+    def pack(self, values):
+        """
+        Patch float payloads in address order.
+
+        Args:
+            values (iterable): One float per address
+        """
+        data = self.data
+        for offset, value in zip(self.offsets, values):
+            _FLOAT.pack_into(data, offset, value)
+        return data
+
+    def unpack(self):
+        """Return the packed payloads as {address: value}."""
+        return {address: _FLOAT.unpack_from(self.data, offset)[0]
+                for address, offset in zip(self.addresses, self.offsets)}
+
+
+class OSCSender:
+    """
+    OSC sender with pre-encoded messages.
+
+    The address and type-tag prefix of every output is encoded once and
+    cached, so a send only patches the 4-byte payload and does one
+    ``sendto``. Several outputs can go out as one bundle per tick.
+    """
+
+    def __init__(self, target_ip=ip, target_port=port, verbose=False):
+        """
+        Args:
+            target_ip (str): Destination IP
+            target_port (int): Destination port
+            verbose (bool): Print every send (debugging, --debug 2)
+        """
+        self.target = (target_ip, target_port)
+        self.verbose = verbose
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sends = 0
+        self.errors = 0
+        self._messages = {}
+        self._bundles = {}
+
+    def _message(self, address, tag):
+        key = (address, tag)
+        message = self._messages.get(key)
+        if message is None:
+            prefix = _osc_string(address) + _osc_string(',' + tag)
+            payload = b'' if tag in 'TF' else b'\x00' * 4
+            message = (bytearray(prefix + payload), len(prefix))
+            self._messages[key] = message
+        return message
+
+    def _sendto(self, data):
+        try:
+            self.sock.sendto(data, self.target)
+            self.sends += 1
+            return True
+        except OSError as e:
+            self.errors += 1
+            print(f"Error sending: {e}")                # Debugging if an error occurs
+            return False
+
+    def send(self, address, value, echo=True):
+        """
+        Send a single message (float, int or bool).
+
+        Args:
+            address (str): OSC address
+            value (float, int or bool): Message argument
+            echo (bool): Print the send when the sender is verbose
+        """
+        tag = _type_tag(value)
+        data, offset = self._message(address, tag)
+        if tag == 'f':
+            _FLOAT.pack_into(data, offset, value)
+        elif tag == 'i':
+            _INT.pack_into(data, offset, value)
+        if self._sendto(data) and self.verbose and echo:
+            print(f"Sent: \"{address}\" : {value}")  # Debugging statement
+
+    def send_hue_shift(self, value):
+        self.send(HUE_SHIFT_ADDRESS, value)
+
+    def bundle(self, addresses):
+        """Return the cached BundleTemplate for an ordered list of addresses."""
+        key = tuple(addresses)
+        template = self._bundles.get(key)
+        if template is None:
+            template = BundleTemplate(key)
+            self._bundles[key] = template
+        return template
+
+    def send_bundle(self, addresses, values, time_tag=1):
+        """
+        Send several float outputs as one OSC bundle.
+
+        Args:
+            addresses (tuple): Output addresses (cached as one template)
+            values (iterable): One float per address
+            time_tag (int): OSC time tag, see ntp_time_tag (1 = immediately)
+        """
+        template = self.bundle(addresses)
+        template.set_time_tag(time_tag)
+        data = template.pack(values)
+        if self._sendto(data) and self.verbose:
+            print(f"Sent bundle: {template.unpack()}")  # Debugging statement
+
+    def close(self):
+        self.sock.close()
+
+
+class NullSender:
+    """OSCSender stand-in that sends nothing (offline replay, benchmarks)."""
+
+    sends = 0
+    errors = 0
+
+    def send(self, address, value, echo=True):
+        pass
+
+    def send_hue_shift(self, value):
+        pass
+
+    def send_bundle(self, addresses, values, time_tag=1):
+        pass
+
+    def close(self):
+        pass
+
+
 client = SimpleUDPClient(ip, port)
 
 def send_message(address, value):
@@ -15,7 +210,7 @@ def send_message(address, value):
 
 def send_hue_shift(value):
     try:
-        client.send_message("/avatar/parameters/HueShift", value)
-        print(f"Sent: \"/avatar/parameters/HueShift\" : {value}")  # Debugging statement
+        client.send_message(HUE_SHIFT_ADDRESS, value)
+        print(f"Sent: \"{HUE_SHIFT_ADDRESS}\" : {value}")  # Debugging statement
     except Exception as e:
         print(f"Error sending: {e}")                # Debugging if an error occurs
@@ -1,6 +1,8 @@
 import numpy as np
 import logging
 from collections import deque
+from unified_expressions import PARAM_NAMES
+from diagnostics import log_sampler
 
 # Retain original emotion-related constants
 COLOR_RANGES = [
@@ -49,41 +51,43 @@ EMOTION_HUES = {
     "scared": 0.69      # Purple
 }
 
-def find_matching_parameter(target_param, current_values, logger=None):
+def match_parameter_key(target_param, keys, logger=None):
     """
-    Find a matching parameter key with flexible matching.
+    Find the key matching a parameter name with flexible matching.
     
     Args:
         target_param (str): The parameter to find
-        current_values (dict): Dictionary of current parameter values
+        keys (iterable): Candidate parameter names
         logger (logging.Logger, optional): Logger for warnings
     
     Returns:
-        float: Matched parameter value or 0
+        str: Matched key, or None if nothing matches
     """
     # Default to root logger if no logger provided
     if logger is None:
         logger = logging.getLogger(__name__)
     
+    keys = list(keys)
+    
     # Direct exact match
-    if target_param in current_values:
-        return current_values[target_param]
+    if target_param in keys:
+        return target_param
     
     # Case-insensitive match
-    case_insensitive = {k.lower(): k for k in current_values.keys()}
+    case_insensitive = {k.lower(): k for k in keys}
     if target_param.lower() in case_insensitive:
-        return current_values[case_insensitive[target_param.lower()]]
+        return case_insensitive[target_param.lower()]
     
     # Partial match with more sophisticated logic
     matches = [
-        (k, v) for k, v in current_values.items() 
+        k for k in keys 
         if target_param.lower() in k.lower() or k.lower() in target_param.lower()
     ]
     
     if matches:
         # Prefer exact word matches over partial
         exact_word_matches = [
-            (k, v) for k, v in matches 
+            k for k in matches 
             if any(word.lower() == target_param.lower() for word in k.split())
         ]
         
@@ -94,87 +98,441 @@ def find_matching_parameter(target_param, current_values, logger=None):
         if len(matches) > 1:
             logger.warning(f"Multiple matches for {target_param}: {matches}")
         
-        return matches[0][1]
+        return matches[0]
+    
+    return None
+
+
+def find_matching_parameter(target_param, current_values, logger=None):
+    """
+    Find a matching parameter key with flexible matching.
+    
+    Args:
+        target_param (str): The parameter to find
+        current_values (dict): Dictionary of current parameter values
+        logger (logging.Logger, optional): Logger for warnings
+    
+    Returns:
+        float: Matched parameter value or 0
+    """
+    # Direct exact match
+    if target_param in current_values:
+        return current_values[target_param]
+    
+    key = match_parameter_key(target_param, current_values.keys(), logger)
+    if key is None:
+        return 0  # Default to 0 if no match
+    return current_values[key]
+
+
+def _as_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+# 0-d bounds: unlike Python floats, these need no conversion per ufunc call
+_ZERO = np.zeros(())
+_ONE = np.ones(())
+
+
+def clip_unit(values, out):
+    """
+    ``np.clip(values, 0, 1, out=out)`` without allocating.
+    
+    np.clip and Python-float bounds both create temporaries on every call,
+    which adds up on the per-tick path.
+    """
+    np.maximum(values, _ZERO, out=out)
+    return np.minimum(out, _ONE, out=out)
+
+
+class EmotionEngine:
+    """
+    Scoring engine compiled once from EMOTION_WEIGHTS.
+    
+    Every weighted parameter is resolved against the FACIAL_PARAMS slot index
+    up front, so a tick is a clip plus one matrix-vector product instead of a
+    name lookup per emotion per parameter.
+    
+    Positive weights contribute ``value * weight`` and negative weights
+    contribute ``(1 - value) * abs(weight)``. The latter equals
+    ``abs(weight) + weight * value``, so both fold into a single signed weight
+    matrix plus a per-emotion bias.
+    """
+    
+    def __init__(self, emotion_weights=None, param_names=PARAM_NAMES, logger=None):
+        if emotion_weights is None:
+            emotion_weights = EMOTION_WEIGHTS
+        if logger is None:
+            logger = logging.getLogger(__name__)
+        
+        self.emotions = tuple(emotion_weights)
+        self.labels = self.emotions + ("neutral",)
+        self.param_names = tuple(param_names)
+        self.neutral_index = len(self.emotions)
+        
+        n_emotions = len(self.emotions)
+        n_params = len(self.param_names)
+        self.weights = np.zeros((n_emotions, n_params))
+        self.bias = np.zeros(n_emotions)
+        self.positive_mask = np.zeros((n_emotions, n_params), dtype=bool)
+        self.negative_mask = np.zeros((n_emotions, n_params), dtype=bool)
+        
+        # (param, slot, weight) per emotion, kept for contribution breakdowns
+        self.columns = {}
+        
+        for row, (emotion, weights) in enumerate(emotion_weights.items()):
+            self.columns[emotion] = []
+            for param, weight in weights.items():
+                key = match_parameter_key(param, self.param_names, logger)
+                slot = self.param_names.index(key) if key is not None else None
+                self.columns[emotion].append((param, slot, weight))
+                
+                if weight < 0:
+                    # Unresolved parameters read as 0, i.e. full contribution
+                    self.bias[row] += abs(weight)
+                if slot is None:
+                    logger.warning(f"No parameter matches {param} for {emotion}")
+                    continue
+                
+                self.weights[row, slot] += weight
+                if weight > 0:
+                    self.positive_mask[row, slot] = True
+                else:
+                    self.negative_mask[row, slot] = True
+        
+        # Scratch for contribution breakdowns
+        self._clipped = np.zeros(n_params)
+    
+    def vector_from_values(self, current_values):
+        """
+        Build a slot-ordered value vector from a parameter dict.
+        
+        Args:
+            current_values (dict): Parameter name -> value
+        
+        Returns:
+            np.ndarray: Values in slot order (missing parameters read as 0)
+        """
+        return np.array(
+            [_as_float(current_values.get(name, 0)) for name in self.param_names],
+            dtype=np.float64
+        )
+    
+    def raw_scores(self, values):
+        """Clipped per-emotion scores before normalization (no neutral)."""
+        clipped = np.clip(values, 0.0, 1.0)
+        return np.clip(self.weights @ clipped + self.bias, 0.0, 1.0)
+    
+    def score(self, values):
+        """
+        Score a single frame.
+        
+        Args:
+            values (np.ndarray): Parameter values in slot order
+        
+        Returns:
+            np.ndarray: Normalized scores ordered like ``self.labels``
+        """
+        return self.score_batch(np.asarray(values, dtype=np.float64)[np.newaxis, :])[0]
+    
+    def score_batch(self, frames):
+        """
+        Score N frames at once.
+        
+        Args:
+            frames (np.ndarray): Array of shape (N, n_params)
+        
+        Returns:
+            np.ndarray: Array of shape (N, len(self.labels))
+        """
+        frames = np.clip(np.asarray(frames, dtype=np.float64), 0.0, 1.0)
+        return self.finalize_batch(frames @ self.weights.T + self.bias)
+    
+    def finalize(self, partial_sums):
+        """
+        Turn one frame's per-emotion sums into normalized scores.
+        
+        Args:
+            partial_sums (np.ndarray): ``weights @ clipped_values + bias``
+        
+        Returns:
+            np.ndarray: Normalized scores ordered like ``self.labels``
+        """
+        return self.finalize_batch(partial_sums[np.newaxis, :])[0]
+    
+    def finalize_batch(self, partial_sums):
+        """Batch form of ``finalize`` for an (N, n_emotions) array."""
+        raw = np.clip(partial_sums, 0.0, 1.0)
+        
+        scores = np.zeros((raw.shape[0], len(self.labels)))
+        totals = raw.sum(axis=1)
+        active = totals > 0
+        scores[active, :self.neutral_index] = raw[active] / totals[active, np.newaxis]
+        scores[~active, :self.neutral_index] = raw[~active]
+        
+        # Dynamic neutral calculation with intensity-based adjustment
+        scores[:, self.neutral_index] = np.maximum(
+            0.0, 1.0 - scores[:, :self.neutral_index].sum(axis=1)
+        )
+        return scores
+    
+    def finalize_into(self, partial_sums, buffer):
+        """
+        Allocation-free ``finalize`` into a preallocated ScoreBuffer.
+        
+        Args:
+            partial_sums (np.ndarray): ``weights @ clipped_values + bias``
+            buffer (ScoreBuffer): Receives the normalized scores
+        
+        Returns:
+            np.ndarray: ``buffer.scores``
+        """
+        emotions = buffer.emotions
+        clip_unit(partial_sums, out=emotions)
+        total = np.dot(buffer.ones, emotions, out=buffer.total).item()
+        if total > 0:
+            emotions /= buffer.total
+            total = np.dot(buffer.ones, emotions, out=buffer.total).item()
+        
+        # Dynamic neutral calculation with intensity-based adjustment
+        buffer.scores[self.neutral_index] = max(0.0, 1.0 - total)
+        return buffer.scores
+    
+    def contributions(self, values):
+        """
+        Per-parameter contributions for a single frame.
+        
+        Args:
+            values (np.ndarray): Parameter values in slot order
+        
+        Returns:
+            dict: Emotion -> {param: contribution}
+        """
+        clipped = clip_unit(values, out=self._clipped)
+        breakdown = {}
+        for emotion, columns in self.columns.items():
+            breakdown[emotion] = {}
+            for param, slot, weight in columns:
+                param_value = clipped[slot] if slot is not None else 0.0
+                breakdown[emotion][param] = (
+                    param_value * weight if weight > 0 
+                    else (1 - param_value) * abs(weight)
+                )
+        return breakdown
+    
+    def to_dict(self, scores):
+        """Map a score vector onto emotion labels."""
+        return {label: float(score) for label, score in zip(self.labels, scores)}
+
+
+class ScoreBuffer:
+    """
+    Preallocated score vector, with the views and scratch that
+    ``EmotionEngine.finalize_into`` writes through.
+    
+    ``scores`` is the same array for the buffer's whole life, so readers
+    that keep it across ticks must copy it.
+    """
+    
+    def __init__(self, n_labels, neutral_index):
+        self.scores = np.zeros(n_labels)
+        self.emotions = self.scores[:neutral_index]
+        self.ones = np.ones(neutral_index)
+        self.total = np.zeros(())
+
+
+class IncrementalScorer:
+    """
+    Keep emotion scores up to date from the parameters that actually changed.
+    
+    Only slots with a nonzero weight in the engine are tracked. Writers mark
+    them dirty as values arrive. On ``update`` each changed slot adds its
+    delta to the partial sums of just the emotions that depend on it (via a
+    CSR reverse index), and the scores are renormalized. When nothing
+    relevant changed, ``update`` returns False and the previous scores stand.
+    
+    Every step writes into buffers allocated here, so a steady-state update
+    allocates no arrays. ``scores`` is updated in place.
+    """
+    
+    def __init__(self, engine=None, resync_interval=1000):
+        """
+        Args:
+            engine (EmotionEngine, optional): Compiled engine, defaults to the shared one
+            resync_interval (int): Recompute the sums from scratch every N updates
+                to stop floating-point drift from accumulating
+        """
+        if engine is None:
+            engine = get_emotion_engine()
+        self.engine = engine
+        self.resync_interval = resync_interval
+        
+        n_params = len(engine.param_names)
+        self.relevant = engine.weights.any(axis=0)
+        
+        # Reverse index (the rows of the transposed weights in CSR form):
+        # relevant slot -> (emotion row, weight) pairs, as Python scalars for
+        # the per-slot loop
+        slot_emotions = []
+        for slot in np.flatnonzero(self.relevant).tolist():
+            rows = np.flatnonzero(engine.weights[:, slot])
+            slot_emotions.append((slot, tuple(zip(rows.tolist(), engine.weights[rows, slot].tolist()))))
+        self.slot_emotions = tuple(slot_emotions)
+        
+        self.dirty = np.zeros(n_params, dtype=bool)
+        self.clipped = np.zeros(n_params)
+        self.partial = np.zeros(len(engine.bias))
+        self.resync()
+        self.buffer = ScoreBuffer(len(engine.labels), engine.neutral_index)
+        self.scores = engine.finalize_into(self.partial, self.buffer)
+        
+        # Scratch for update()
+        self._candidates = np.zeros(n_params, dtype=bool)
+        
+        self.updates = 0
+        self.skipped = 0
+    
+    def mark(self, slot):
+        """Flag one slot as possibly changed."""
+        self.dirty[slot] = True
     
-    return 0  # Default to 0 if no match
+    def mark_many(self, slots):
+        """Flag an array of slots as possibly changed."""
+        self.dirty[slots] = True
+    
+    def update(self, values):
+        """
+        Apply dirty slots and refresh the scores.
+        
+        Args:
+            values (np.ndarray): Current parameter values in slot order
+        
+        Returns:
+            bool: True if the scores changed
+        """
+        dirty = self.dirty
+        candidates = self._candidates
+        np.logical_and(dirty, self.relevant, out=candidates)
+        if not np.count_nonzero(candidates):
+            self.skipped += 1
+            return False
+        
+        # Scalar loop over the relevant slots: .item() and Python floats
+        # avoid the temporaries that fancy indexing would allocate
+        clipped = self.clipped
+        partial = self.partial
+        changed = 0
+        for slot, emotions in self.slot_emotions:
+            if not candidates.item(slot):
+                continue
+            value = values.item(slot)
+            if value < 0.0:
+                value = 0.0
+            elif value > 1.0:
+                value = 1.0
+            delta = value - clipped.item(slot)
+            if delta == 0.0:
+                continue
+            clipped[slot] = value
+            changed += 1
+            for row, weight in emotions:
+                partial[row] = partial.item(row) + weight * delta
+        dirty.fill(False)
+        
+        if not changed:
+            self.skipped += 1
+            return False
+        
+        self.updates += 1
+        if self.updates % self.resync_interval == 0:
+            self.resync()
+        self.engine.finalize_into(partial, self.buffer)
+        return True
+    
+    def resync(self):
+        """Recompute the partial sums from scratch (``weights @ clipped + bias``)."""
+        np.dot(self.engine.weights, self.clipped, out=self.partial)
+        np.add(self.partial, self.engine.bias, out=self.partial)
+
+
+_default_engine = None
+
 
-def calculate_emotion_scores(current_values):
+def get_emotion_engine():
+    """Return the shared engine compiled from EMOTION_WEIGHTS."""
+    global _default_engine
+    if _default_engine is None:
+        _default_engine = EmotionEngine()
+    return _default_engine
+
+
+def calculate_emotion_scores(current_values, engine=None, scores=None):
     """
     Calculate emotion scores with advanced parameter matching and scoring.
     
     Args:
-        current_values (dict): Dictionary of current facial parameter values
+        current_values (dict or np.ndarray): Current facial parameter values,
+            either by name or as a slot-ordered vector
+        engine (EmotionEngine, optional): Compiled engine to score with
+        scores (np.ndarray, optional): Already computed scores for
+            ``current_values`` (e.g. from an IncrementalScorer)
     
     Returns:
         tuple: Emotion scores, dominant emotion, and dominant score
     """
     logger = logging.getLogger(__name__)
+    if engine is None:
+        engine = get_emotion_engine()
+    
+    # Detailed logging is sampled, at most one block per 'breakdown' interval
+    log_details = logger.isEnabledFor(logging.INFO) and log_sampler.allow('breakdown')
+    
+    if isinstance(current_values, dict):
+        # Log input values
+        if log_details and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Input Facial Parameters:")
+            for key, value in current_values.items():
+                logger.debug("  %s: %s", key, value)
+        values = engine.vector_from_values(current_values)
+    else:
+        values = np.asarray(current_values, dtype=np.float64)
     
-    # Log input values
-    logger.debug("Input Facial Parameters:")
-    for key, value in current_values.items():
-        logger.debug(f"  {key}: {value}")
-    
-    emotion_scores = {}
-    detailed_scores = {}
-    
-    for emotion, weights in EMOTION_WEIGHTS.items():
-        score = 0
-        emotion_breakdown = {}
-        
-        logger.debug(f"\nProcessing {emotion} emotion:")
-        
-        for param, weight in weights.items():
-            # Flexible parameter matching
-            param_value = find_matching_parameter(param, current_values, logger)
-            
-            # Safe type conversion
-            try:
-                param_value = float(param_value)
-            except (TypeError, ValueError):
-                logger.warning(f"Invalid value for {param}: {param_value}. Using 0.")
-                param_value = 0
-            
-            # Normalize input values
-            param_value = max(0, min(1, param_value))
-            
-            # Contribution calculation with nuanced weight handling
-            param_contribution = (
-                param_value * weight if weight > 0 
-                else (1 - param_value) * abs(weight)
-            )
-            
-            logger.debug(f"  {param}: value={param_value}, weight={weight}, contribution={param_contribution}")
-            
-            emotion_breakdown[param] = param_contribution
-            score += param_contribution
-        
-        # Clip and store emotion scores
-        emotion_scores[emotion] = max(0, min(1, score))
-        detailed_scores[emotion] = emotion_breakdown
-    
-    # Advanced score normalization
-    total_score = sum(emotion_scores.values())
-    if total_score > 0:
-        emotion_scores = {k: v / total_score for k, v in emotion_scores.items()}
-    
-    # Dynamic neutral calculation with intensity-based adjustment
-    neutral_factor = max(0, 1 - sum(emotion_scores.values()))
-    emotion_scores["neutral"] = neutral_factor
+    if scores is None:
+        scores = engine.score(values)
+    emotion_scores = engine.to_dict(scores)
     
     # Dominant emotion detection
-    dominant_emotion = max(emotion_scores, key=emotion_scores.get)
+    dominant_index = int(np.argmax(scores))
+    dominant_emotion = engine.labels[dominant_index]
     dominant_score = emotion_scores[dominant_emotion]
     
     # Comprehensive result logging
+    if log_details:
+        log_score_breakdown(engine, values, emotion_scores, logger)
+    
+    return emotion_scores, dominant_emotion, dominant_score
+
+
+def log_score_breakdown(engine, values, emotion_scores, logger):
+    """
+    Log final scores with the per-parameter contributions behind them.
+    
+    Args:
+        engine (EmotionEngine): Engine the scores came from
+        values (np.ndarray): Parameter values in slot order
+        emotion_scores (dict): Emotion -> score
+        logger (logging.Logger): Destination
+    """
+    detailed_scores = engine.contributions(values)
     logger.info("\nFinal Emotion Scores:")
     for emotion, score in emotion_scores.items():
-        logger.info(f"  {emotion}: {score:.4f}")
+        logger.info("  %s: %.4f", emotion, score)
         if emotion in detailed_scores:
             for param, contrib in detailed_scores[emotion].items():
-                logger.info(f"    {param}: {contrib:.4f}")
-    
-    return emotion_scores, dominant_emotion, dominant_score
+                logger.info("    %s: %.4f", param, contrib)
 
 
 def map_hue_to_color_description(hue_value):
@@ -192,6 +550,89 @@ def map_hue_to_color_description(hue_value):
     return closest_color[2]
 
 
+class HueBlender:
+    """
+    Blend the top two emotions of a score vector into a hue.
+    
+    Array form of ``calculate_emotion_hue`` for a fixed label order. The top
+    two are found in one pass over the scores without building dicts or
+    sorted lists, so a blend allocates nothing beyond the returned float.
+    Labels without a hue in EMOTION_HUES (and neutral) never take part.
+    """
+    
+    # Emotions whose hue is used as-is when they clearly dominate
+    STRONG_EMOTIONS = ('angry', 'excited', 'surprised', 'happy')
+    
+    def __init__(self, labels):
+        """
+        Args:
+            labels (tuple): Score vector labels, in column order
+        """
+        self.labels = tuple(labels)
+        self.indices = tuple(i for i, label in enumerate(self.labels)
+                             if label != 'neutral' and label in EMOTION_HUES)
+        self.hues = tuple(EMOTION_HUES.get(label, 0.0) for label in self.labels)
+        self.strong = tuple(label in self.STRONG_EMOTIONS for label in self.labels)
+    
+    def blend(self, scores):
+        """
+        Calculate the blended hue for one score vector.
+        
+        Args:
+            scores (np.ndarray): Scores ordered like ``labels``
+        
+        Returns:
+            float: Calculated hue value
+        """
+        # Top two positive scores; ties keep label order like a stable sort
+        primary = secondary = -1
+        primary_score = secondary_score = 0.0
+        for index in self.indices:
+            score = scores.item(index)
+            if score > primary_score:
+                secondary, secondary_score = primary, primary_score
+                primary, primary_score = index, score
+            elif score > secondary_score:
+                secondary, secondary_score = index, score
+        
+        # If no significant emotions, return neutral hue
+        if primary < 0:
+            return EMOTION_HUES['neutral']
+        if secondary < 0:
+            secondary = primary
+        
+        # Calculate blended hue with bias towards extreme emotions
+        primary_hue = self.hues[primary]
+        secondary_hue = self.hues[secondary]
+        
+        # Exponential scoring to emphasize dominant emotions
+        primary_weight = primary_score ** 3  # Cubic to really emphasize the top emotion
+        secondary_weight = (1 - primary_score) ** 2
+        
+        # Blend hues with weighted average
+        blended_hue = (primary_hue * primary_weight + secondary_hue * secondary_weight) / (primary_weight + secondary_weight)
+        
+        # Adjust for extreme emotions
+        if primary_score > 0.7 and self.strong[primary]:
+            blended_hue = primary_hue
+        
+        # Ensure hue is within 0-1 range
+        blended_hue = max(0, min(1, blended_hue))
+        
+        logger = logging.getLogger(__name__)
+        if logger.isEnabledFor(logging.INFO) and log_sampler.allow('hue'):
+            logger.info("Top Emotions Breakdown:")
+            logger.info("Primary Emotion: %s (score: %.4f)", self.labels[primary], primary_score)
+            logger.info("Secondary Emotion: %s", self.labels[secondary])
+            logger.info("Calculated Hue: %.4f", blended_hue)
+            logger.info("Color Description: %s", map_hue_to_color_description(blended_hue))
+        
+        return blended_hue
+
+
+_blenders = {}
+
+
 def calculate_emotion_hue(emotion_scores):
     """
     Calculate hue with improved emotion representation and dynamic range.
@@ -202,52 +643,11 @@ def calculate_emotion_hue(emotion_scores):
     Returns:
         float: Calculated hue value
     """
-    logger = logging.getLogger(__name__)
-    
-    # Filter out neutral and extract top emotions
-    emotion_weights = {k: v for k, v in emotion_scores.items() 
-                       if k != 'neutral' and v > 0}
-    
-    # If no significant emotions, return neutral hue
-    if not emotion_weights:
-        return EMOTION_HUES['neutral']
-    
-    # Sort emotions by score in descending order
-    sorted_emotions = sorted(emotion_weights.items(), key=lambda x: x[1], reverse=True)
-    
-    logger.info("Top Emotions Breakdown:")
-    
-    # Primary and secondary emotion calculation
-    primary_emotion, primary_score = sorted_emotions[0]
-    secondary_emotion = sorted_emotions[1][0] if len(sorted_emotions) > 1 else primary_emotion
-    
-    # Calculate blended hue with bias towards extreme emotions
-    primary_hue = EMOTION_HUES[primary_emotion]
-    secondary_hue = EMOTION_HUES[secondary_emotion]
-    
-    # Exponential scoring to emphasize dominant emotions
-    primary_weight = primary_score ** 3  # Cubic to really emphasize the top emotion
-    secondary_weight = (1 - primary_score) ** 2
-    
-    # Blend hues with weighted average
-    blended_hue = (primary_hue * primary_weight + secondary_hue * secondary_weight) / (primary_weight + secondary_weight)
-    
-    # Adjust for extreme emotions
-    if primary_score > 0.7:  # If dominant emotion is very strong
-        if primary_emotion in ['angry', 'excited']:
-            blended_hue = EMOTION_HUES[primary_emotion]
-        elif primary_emotion in ['surprised', 'happy']:
-            blended_hue = EMOTION_HUES[primary_emotion]
-    
-    # Ensure hue is within 0-1 range
-    blended_hue = max(0, min(1, blended_hue))
-    
-    logger.info(f"Primary Emotion: {primary_emotion} (score: {primary_score:.4f})")
-    logger.info(f"Secondary Emotion: {secondary_emotion}")
-    logger.info(f"Calculated Hue: {blended_hue:.4f}")
-    logger.info(f"Color Description: {map_hue_to_color_description(blended_hue)}")
-    
-    return blended_hue
+    labels = tuple(emotion_scores)
+    blender = _blenders.get(labels)
+    if blender is None:
+        blender = _blenders[labels] = HueBlender(labels)
+    return blender.blend(np.fromiter(emotion_scores.values(), dtype=np.float64, count=len(labels)))
 
 
 # You can keep other utility functions like smooth_value, etc. from the original code
@@ -255,6 +655,9 @@ def smooth_value(value_history, new_value, smoothing_method='simple_average'):
     """
     Smooth a new value using various methods.
     
+    Each call is O(window); the processor uses the streaming filters in
+    smoothing.py instead.
+    
     Args:
         value_history (deque): Deque of previous values
         new_value (float): New value to add
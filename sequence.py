@@ -0,0 +1,86 @@
+# Address of the sequence markers the load generator (loadgen.py) puts in
+# every bundle, or between single messages. The value is an int32 counter.
+SEQUENCE_ADDRESS = "/moodhue/loadgen/seq"
+
+# Record slot for sequence markers on the ring transports (-1 is unrecognized).
+# Record values are float32, so marker numbers stay exact up to 2**24.
+SEQUENCE_SLOT = -2
+
+
+class SequenceCounter:
+    """
+    Datagram loss and reordering from load generator sequence markers.
+
+    Every marker that arrives is counted; the span between the first and
+    the highest sequence number seen is what was sent, so the difference is
+    the number of markers lost on the way (kernel drops, full queues). A
+    number far below the highest one seen starts a new run.
+
+    ``received``, ``expected`` and ``lost`` describe the current run.
+    ``received_total`` and ``expected_total`` add up all runs and never go
+    down, so they can be exported as counters; the loss over any interval is
+    the difference of their increases.
+    """
+
+    def __init__(self, restart_gap=1024):
+        """
+        Args:
+            restart_gap (int): A number this far below the highest seen is
+                treated as a new generator run rather than reordering
+        """
+        self.restart_gap = restart_gap
+        self.received_total = 0
+        self.expected_total = 0
+        self.runs = 0
+        self.reset()
+
+    def reset(self):
+        """Start a new run; the cumulative totals are kept."""
+        self.received = 0
+        self.reordered = 0
+        self.first = None
+        self.highest = None
+
+    def record(self, value):
+        """
+        Count one marker.
+
+        Args:
+            value (int or float): Marker value (sequence number)
+        """
+        seq = int(value)
+        if self.highest is None or seq < self.highest - self.restart_gap:
+            self.reset()
+            self.runs += 1
+            self.first = self.highest = seq
+            self.expected_total += 1
+        elif seq > self.highest:
+            self.expected_total += seq - self.highest
+            self.highest = seq
+        else:
+            self.reordered += 1
+        self.received += 1
+        self.received_total += 1
+
+    @property
+    def expected(self):
+        """Markers sent in the current run, as far as the numbers tell."""
+        return 0 if self.highest is None else self.highest - self.first + 1
+
+    @property
+    def lost(self):
+        """Markers missing in the current run."""
+        return max(0, self.expected - self.received)
+
+    def summary(self):
+        expected = self.expected
+        return {
+            'received': self.received,
+            'expected': expected,
+            'lost': self.lost,
+            'loss_fraction': self.lost / expected if expected else 0.0,
+            'reordered': self.reordered,
+            'runs': self.runs,
+            'received_total': self.received_total,
+            'expected_total': self.expected_total,
+        }
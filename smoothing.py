@@ -0,0 +1,215 @@
+import math
+from collections import deque
+
+TAU = 2 * math.pi
+
+
+class BoxFilter:
+    """Moving average over a fixed window, kept as a running sum (O(1) per update)."""
+
+    def __init__(self, window=10, initial=0.0):
+        """
+        Args:
+            window (int): Number of samples averaged
+            initial (float, optional): Pre-fill the window with this value
+                (None starts empty)
+        """
+        self.window = window
+        self.initial = initial
+        self.reset()
+
+    def reset(self):
+        self.history = deque(maxlen=self.window)
+        self.total = 0.0
+        if self.initial is not None:
+            for _ in range(self.window):
+                self.history.append(self.initial)
+            self.total = self.initial * self.window
+        self.value = self.initial
+
+    def update(self, new_value, timestamp=None):
+        if len(self.history) == self.window:
+            self.total -= self.history[0]
+        self.history.append(new_value)
+        self.total += new_value
+        self.value = self.total / len(self.history)
+        return self.value
+
+
+class WeightedFilter:
+    """
+    Linearly weighted moving average (newest sample weighs ``window``).
+
+    Keeps the plain and weighted running sums, so each update is O(1).
+    """
+
+    def __init__(self, window=10, initial=0.0):
+        self.window = window
+        self.initial = initial
+        self.reset()
+
+    def reset(self):
+        self.history = deque(maxlen=self.window)
+        self.total = 0.0
+        self.weighted_total = 0.0
+        if self.initial is not None:
+            for _ in range(self.window):
+                self.update(self.initial)
+        self.value = self.initial
+
+    def update(self, new_value, timestamp=None):
+        if len(self.history) == self.window:
+            # Every remaining sample loses one weight step, the oldest drops out
+            self.weighted_total -= self.total
+            self.total -= self.history[0]
+        self.history.append(new_value)
+        count = len(self.history)
+        self.total += new_value
+        self.weighted_total += new_value * count
+        self.value = self.weighted_total / (count * (count + 1) / 2)
+        return self.value
+
+
+class EMAFilter:
+    """Incremental exponential moving average."""
+
+    def __init__(self, alpha=0.3, initial=None):
+        """
+        Args:
+            alpha (float): Weight of the newest sample (0-1)
+            initial (float, optional): Starting value (None = first sample)
+        """
+        self.alpha = alpha
+        self.initial = initial
+        self.reset()
+
+    def reset(self):
+        self.value = self.initial
+
+    def update(self, new_value, timestamp=None):
+        if self.value is None:
+            self.value = new_value
+        else:
+            self.value += self.alpha * (new_value - self.value)
+        return self.value
+
+
+class OneEuroFilter:
+    """
+    One Euro filter (Casiez et al., 2012): an EMA whose cutoff rises with speed.
+
+    Steady input is smoothed heavily while fast changes pass with little lag.
+    """
+
+    def __init__(self, min_cutoff=1.0, beta=0.05, d_cutoff=1.0, rate_hz=30.0):
+        """
+        Args:
+            min_cutoff (float): Cutoff frequency (Hz) at rest
+            beta (float): Cutoff increase per unit of speed
+            d_cutoff (float): Cutoff frequency (Hz) for the speed estimate
+            rate_hz (float): Assumed sample rate when no timestamps are given
+        """
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.default_dt = 1.0 / rate_hz
+        self.reset()
+
+    def reset(self):
+        self.value = None
+        self.derivative = 0.0
+        self.last_timestamp = None
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        tau = 1.0 / (TAU * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def update(self, new_value, timestamp=None):
+        if self.value is None:
+            self.value = new_value
+            self.last_timestamp = timestamp
+            return self.value
+
+        dt = self.default_dt
+        if timestamp is not None and self.last_timestamp is not None and timestamp > self.last_timestamp:
+            dt = timestamp - self.last_timestamp
+        self.last_timestamp = timestamp
+
+        derivative = (new_value - self.value) / dt
+        self.derivative += self._alpha(self.d_cutoff, dt) * (derivative - self.derivative)
+
+        cutoff = self.min_cutoff + self.beta * abs(self.derivative)
+        self.value += self._alpha(cutoff, dt) * (new_value - self.value)
+        return self.value
+
+
+class CircularFilter:
+    """
+    Hue-aware wrapper: filters the point on the colour wheel, not the number.
+
+    The hue (0-1) is mapped to an angle and its cosine and sine are smoothed
+    by two inner filters, so 0.02 and 0.94 average to red rather than cyan.
+    """
+
+    def __init__(self, inner_factory):
+        """
+        Args:
+            inner_factory (callable): Returns a new linear filter instance
+        """
+        self.x = inner_factory()
+        self.y = inner_factory()
+        self.value = None
+
+    def reset(self):
+        self.x.reset()
+        self.y.reset()
+        self.value = None
+
+    def update(self, hue, timestamp=None):
+        angle = hue * TAU
+        x = self.x.update(math.cos(angle), timestamp)
+        y = self.y.update(math.sin(angle), timestamp)
+        if x == 0.0 and y == 0.0:
+            # No defined direction (e.g. empty history); keep the raw hue
+            self.value = hue
+        else:
+            self.value = (math.atan2(y, x) / TAU) % 1.0
+        return self.value
+
+
+FILTERS = ('box', 'weighted', 'ema', 'one_euro',
+           'circular_box', 'circular_weighted', 'circular_ema', 'circular_one_euro')
+
+
+def make_filter(name, window=10, alpha=0.3, min_cutoff=1.0, beta=0.05, rate_hz=30.0):
+    """
+    Build a smoothing filter by name.
+
+    Args:
+        name (str): One of FILTERS
+        window (int): Window size for box/weighted filters
+        alpha (float): EMA weight of the newest sample
+        min_cutoff (float): One Euro cutoff at rest (Hz)
+        beta (float): One Euro speed coefficient
+        rate_hz (float): One Euro sample rate used when no timestamps are given
+
+    Returns:
+        Filter object with ``update(value, timestamp=None)``
+    """
+    base = name[len('circular_'):] if name.startswith('circular_') else name
+
+    if base == 'box':
+        factory = lambda: BoxFilter(window)
+    elif base == 'weighted':
+        factory = lambda: WeightedFilter(window)
+    elif base == 'ema':
+        factory = lambda: EMAFilter(alpha)
+    elif base == 'one_euro':
+        factory = lambda: OneEuroFilter(min_cutoff, beta, rate_hz=rate_hz)
+    else:
+        raise ValueError(f"Unknown smoothing method: {name}")
+
+    if name.startswith('circular_'):
+        return CircularFilter(factory)
+    return factory()
@@ -0,0 +1,161 @@
+import struct
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from unified_expressions import PARAM_ALIASES, PARAM_NAMES
+
+# Shared frame layout: uint64 sequence counter followed by float64 values
+_HEADER = struct.Struct('<Q')
+
+
+class ParameterState:
+    """
+    Array-backed store of current facial parameter values.
+
+    Values live in a fixed float64 array indexed by parameter slot (see
+    PARAM_NAMES), next to the immutable alias table used to resolve names.
+    Scoring and smoothing read ``snapshot()`` views directly, so no per-tick
+    dict rebuild or copy is needed.
+
+    When created with ``shared_name``, every ``publish()`` also mirrors the
+    values into a ``multiprocessing.shared_memory`` block guarded by a
+    sequence counter, so other local processes can read consistent frames
+    with ``SharedStateReader``.
+    """
+
+    def __init__(self, param_names=None, alias_table=None, shared_name=None):
+        """
+        Args:
+            param_names (tuple, optional): Slot -> standard name, defaults to PARAM_NAMES
+            alias_table (Mapping, optional): Name -> slot, defaults to PARAM_ALIASES
+            shared_name (str, optional): Name of a shared memory block to publish into
+        """
+        if param_names is None:
+            param_names = PARAM_NAMES
+        if alias_table is None:
+            alias_table = PARAM_ALIASES
+
+        self.param_names = tuple(param_names)
+        self.aliases = alias_table
+        self.values = np.zeros(len(self.param_names), dtype=np.float64)
+
+        self._snapshot = self.values.view()
+        self._snapshot.flags.writeable = False
+
+        self._shm = None
+        self._shared_values = None
+        self._sequence = 0
+        if shared_name is not None:
+            size = _HEADER.size + self.values.nbytes
+            self._shm = shared_memory.SharedMemory(name=shared_name, create=True, size=size)
+            _HEADER.pack_into(self._shm.buf, 0, 0)
+            self._shared_values = np.ndarray(
+                self.values.shape, dtype=np.float64, buffer=self._shm.buf, offset=_HEADER.size
+            )
+            self._shared_values[:] = 0.0
+
+    def __len__(self):
+        return len(self.values)
+
+    def set(self, slot, value):
+        """Store a value by slot index."""
+        self.values[slot] = value
+
+    def set_by_name(self, name, value):
+        """
+        Store a value by standard or alternate parameter name.
+
+        Returns:
+            bool: True if the name is a known parameter
+        """
+        slot = self.aliases.get(name)
+        if slot is None:
+            return False
+        self.values[slot] = value
+        return True
+
+    def get(self, name, default=0.0):
+        """Read a value by standard or alternate parameter name."""
+        slot = self.aliases.get(name)
+        if slot is None:
+            return default
+        return float(self.values[slot])
+
+    def snapshot(self):
+        """
+        Read-only view of the current values (no copy).
+
+        The view tracks later updates; use ``copy()`` to freeze a frame.
+        """
+        return self._snapshot
+
+    def copy(self):
+        """Return an independent copy of the current values."""
+        return self.values.copy()
+
+    def as_dict(self):
+        """Return the current values keyed by standard parameter name."""
+        return dict(zip(self.param_names, self.values.tolist()))
+
+    def publish(self):
+        """Mirror the current frame into shared memory, if enabled."""
+        if self._shm is None:
+            return
+        buf = self._shm.buf
+        # Odd sequence marks a write in progress
+        self._sequence += 1
+        _HEADER.pack_into(buf, 0, self._sequence)
+        self._shared_values[:] = self.values
+        self._sequence += 1
+        _HEADER.pack_into(buf, 0, self._sequence)
+
+    def close(self):
+        """Release the shared memory block, if any."""
+        if self._shm is None:
+            return
+        self._shared_values = None
+        self._shm.close()
+        self._shm.unlink()
+        self._shm = None
+
+
+class SharedStateReader:
+    """Read consistent frames published by a ParameterState in another process."""
+
+    def __init__(self, shared_name, param_names=None):
+        if param_names is None:
+            param_names = PARAM_NAMES
+        self.param_names = tuple(param_names)
+        self._shm = shared_memory.SharedMemory(name=shared_name)
+        self._values = np.ndarray(
+            (len(self.param_names),), dtype=np.float64, buffer=self._shm.buf, offset=_HEADER.size
+        )
+
+    def read(self, out=None, max_retries=100):
+        """
+        Copy the latest complete frame.
+
+        Args:
+            out (np.ndarray, optional): Buffer to copy into
+            max_retries (int): Attempts before giving up on a torn frame
+
+        Returns:
+            tuple: (sequence number, values), or (None, None) if no consistent
+            frame could be read
+        """
+        if out is None:
+            out = np.empty_like(self._values)
+        buf = self._shm.buf
+        for _ in range(max_retries):
+            before = _HEADER.unpack_from(buf, 0)[0]
+            if before & 1:
+                continue
+            np.copyto(out, self._values)
+            if _HEADER.unpack_from(buf, 0)[0] == before:
+                return before, out
+        return None, None
+
+    def close(self):
+        self._values = None
+        self._shm.close()
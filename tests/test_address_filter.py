@@ -0,0 +1,31 @@
+import threading
+
+from address_filter import AddressFilter
+
+
+def test_counts_survive_concurrent_threads():
+    # Small memo and tracking limits force evictions and '<other>' counts
+    address_filter = AddressFilter(max_addresses=8, max_tracked=4, report_interval=0.0)
+    threads, per_thread = 8, 5000
+    reports = []
+
+    def worker(index):
+        for i in range(per_thread):
+            address_filter.allows(f"/other/{index}/{i % 50}")
+            address_filter.allows("/avatar/parameters/JawOpen")
+            report = address_filter.take_report(float(i))
+            if report is not None:
+                reports.append(report)
+
+    workers = [threading.Thread(target=worker, args=(index,)) for index in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    final = address_filter.take_report(float('inf'))
+    if final is not None:
+        reports.append(final)
+
+    assert address_filter.passed == threads * per_thread
+    assert address_filter.dropped == threads * per_thread
+    assert sum(sum(report.values()) for report in reports) == threads * per_thread
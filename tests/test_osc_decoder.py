@@ -0,0 +1,84 @@
+import struct
+
+import pytest
+
+from osc_decoder import BUNDLE_PREFIX, MAX_BUNDLE_DEPTH, OSCDecoder
+
+_INT = struct.Struct('>i')
+_FLOAT = struct.Struct('>f')
+
+
+def osc_string(text):
+    data = text.encode('utf-8')
+    return data + b'\x00' * (4 - len(data) % 4)
+
+
+def message(address, tag, payload):
+    return osc_string(address) + osc_string(',' + tag) + payload
+
+
+def bundle(*elements):
+    data = BUNDLE_PREFIX + b'\x00' * 8
+    for element in elements:
+        data += _INT.pack(len(element)) + element
+    return data
+
+
+FULL = message('/avatar/parameters/JawOpen', 'f', _FLOAT.pack(0.75))
+INT_MESSAGE = message('/avatar/parameters/JawOpen', 'i', _INT.pack(7))
+
+
+def decode(decoder, buf, data):
+    out = []
+    buf[:len(data)] = data
+    decoder.decode(buf, len(data), out)
+    return out
+
+
+def test_decodes_bundle():
+    decoder = OSCDecoder()
+    out = decode(decoder, bytearray(65536), bundle(FULL, bundle(INT_MESSAGE)))
+    assert out == [('/avatar/parameters/JawOpen', 0.75), ('/avatar/parameters/JawOpen', 7)]
+    assert decoder.malformed == 0
+
+
+@pytest.mark.parametrize('data', [
+    FULL[:-4],
+    FULL[:-1],
+    INT_MESSAGE[:-4],
+    # First element's length covers a message without its argument
+    BUNDLE_PREFIX + b'\x00' * 8 + _INT.pack(len(FULL) - 4) + FULL[:-4] + _INT.pack(len(INT_MESSAGE)) + INT_MESSAGE,
+])
+def test_truncated_argument_is_malformed(data):
+    # Decode into a buffer that still holds a complete datagram, like
+    # FastOSCReceiver's reused buffer, so stale payload bytes are available
+    decoder = OSCDecoder()
+    buf = bytearray(65536)
+    decode(decoder, buf, FULL)
+
+    out = decode(decoder, buf, data)
+
+    assert decoder.malformed == 1
+    assert all(value != 0.75 for _, value in out)
+
+
+def test_deep_bundle_nesting_is_malformed():
+    data = FULL
+    for _ in range(3000):
+        data = bundle(data)
+    decoder = OSCDecoder()
+
+    out = decode(decoder, bytearray(len(data)), data)
+
+    assert out == []
+    assert decoder.malformed == 1
+
+
+def test_nesting_up_to_limit_decodes():
+    data = FULL
+    for _ in range(MAX_BUNDLE_DEPTH):
+        data = bundle(data)
+    decoder = OSCDecoder()
+
+    assert decode(decoder, bytearray(len(data)), data) == [('/avatar/parameters/JawOpen', 0.75)]
+    assert decoder.malformed == 0
@@ -0,0 +1,21 @@
+import numpy as np
+
+from output_gate import OutputGate
+
+
+def test_sub_deadband_change_is_held_until_keepalive():
+    gate = OutputGate([0.1, 0.1], keepalive=5.0)
+    assert gate.update(np.array([0.5, 0.5]), 0.0)
+
+    assert not gate.update(np.array([0.55, 0.5]), 1.0)
+    assert gate.update(np.array([0.8, 0.55]), 2.0)
+    np.testing.assert_array_equal(gate.sent, [0.8, 0.5])
+
+
+def test_keepalive_sends_current_values():
+    gate = OutputGate([0.1, 0.1], keepalive=5.0)
+    gate.update(np.array([0.5, 0.5]), 0.0)
+
+    assert gate.update(np.array([0.55, 0.45]), 5.0)
+    np.testing.assert_array_equal(gate.sent, [0.55, 0.45])
+    assert gate.keepalives == 1
@@ -0,0 +1,34 @@
+import logging
+
+import numpy as np
+
+from processor import FacialProcessor
+from recording import RECORD_DTYPE, replay_session
+from sender import NullSender
+from unified_expressions import FACIAL_PARAMS
+
+
+def make_session(count=2000, seed=1):
+    rng = np.random.default_rng(seed)
+    records = np.zeros(count, dtype=RECORD_DTYPE)
+    records['slot'] = rng.integers(0, len(FACIAL_PARAMS), count)
+    records['value'] = rng.random(count)
+    records['timestamp'] = 100.0 + np.cumsum(rng.exponential(0.001, count))
+    return records
+
+
+def replay_outputs(records, speed):
+    processor = FacialProcessor(logging.getLogger(__name__), sender=NullSender(), smoothing='circular_one_euro')
+    outputs = []
+
+    def capture(session_time, processor):
+        outputs.append((processor.output_values.item(0), processor.output_gate.sends))
+
+    replay_session(processor, records, 0.05, speed=speed, on_tick=capture)
+    return outputs
+
+
+def test_replay_output_does_not_depend_on_speed():
+    records = make_session()
+
+    assert replay_outputs(records, speed=None) == replay_outputs(records, speed=20.0)
@@ -0,0 +1,14 @@
+from resolver import AddressResolver
+
+
+def test_caches_stay_bounded_under_address_churn():
+    resolver = AddressResolver(max_cached=16, max_unrecognized=16)
+
+    for i in range(1000):
+        assert resolver.resolve(f"/prefix/{i}/JawOpen") == resolver.resolve("/avatar/parameters/JawOpen")
+        assert resolver.resolve(f"/prefix/{i}/NotAParameter") is None
+
+    stats = resolver.stats()
+    assert stats['cached_addresses'] <= 16
+    assert stats['unrecognized_addresses'] <= 16
+    assert resolver.resolve("/avatar/parameters/JawOpen") is not None
@@ -0,0 +1,8 @@
+from benchmark import TICK_PEAK_BUDGET, check_tick_allocations
+
+
+def test_tick_stays_within_allocation_budget():
+    results = check_tick_allocations(ticks=1000)
+
+    for case in ('rescore', 'steady'):
+        assert results[case]['peak_bytes_max'] <= TICK_PEAK_BUDGET, (case, results[case])
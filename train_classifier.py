@@ -0,0 +1,144 @@
+import argparse
+import csv
+import logging
+import os
+import time
+
+import numpy as np
+
+from classifier import train_model
+from processor import FacialProcessor
+from recording import load_session, replay_session
+from sender import NullSender
+
+
+def read_segments(path):
+    """
+    Read labelled time ranges for a session.
+
+    The CSV has rows ``start,end,label`` in seconds since the first record
+    (a header row is allowed).
+
+    Returns:
+        list: (start, end, label) tuples
+    """
+    segments = []
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.reader(f):
+            if len(row) < 3 or row[0].strip().lower() == 'start':
+                continue
+            segments.append((float(row[0]), float(row[1]), row[2].strip()))
+    return segments
+
+
+def session_frames(path, interval, logger):
+    """
+    Replay a session and sample the parameter vector every ``interval`` seconds.
+
+    Goes through FacialProcessor, so the frames see the same address
+    resolution and binary-parameter decoding as live scoring.
+
+    Returns:
+        tuple: (session times, frames array)
+    """
+    processor = FacialProcessor(logger, sender=NullSender())
+    times = []
+    frames = []
+
+    def capture(session_time, processor):
+        times.append(session_time)
+        frames.append(processor.values.copy())
+
+    replay_session(processor, load_session(path), interval, on_tick=capture)
+    return np.array(times), np.array(frames).reshape(len(frames), len(processor.values))
+
+
+def load_dataset(specs, interval, logger):
+    """
+    Build (frames, label names) from PATH=LABEL or PATH (+ PATH.labels.csv) specs.
+
+    Returns:
+        tuple: (frames, list of label names)
+    """
+    all_frames = []
+    all_labels = []
+    for spec in specs:
+        path, _, label = spec.partition('=')
+        times, frames = session_frames(path, interval, logger)
+
+        if label:
+            keep = np.ones(len(times), dtype=bool)
+            labels = [label] * len(times)
+        else:
+            segments_path = path + '.labels.csv'
+            if not os.path.exists(segments_path):
+                raise SystemExit(f"{path}: give PATH=LABEL or provide {segments_path}")
+            keep = np.zeros(len(times), dtype=bool)
+            labels = [None] * len(times)
+            for start, end, segment_label in read_segments(segments_path):
+                for i in np.flatnonzero((times >= start) & (times < end)):
+                    keep[i] = True
+                    labels[i] = segment_label
+
+        logger.info(f"{path}: {int(keep.sum())} labelled frames of {len(times)}")
+        all_frames.append(frames[keep])
+        all_labels.extend(label for label, kept in zip(labels, keep) if kept)
+
+    return np.concatenate(all_frames), all_labels
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Train an emotion classifier from recorded sessions')
+    parser.add_argument('sessions', nargs='+', metavar='SESSION',
+                        help='PATH=LABEL for a session with one label, or PATH with labelled ranges '
+                             'in PATH.labels.csv (start,end,label in seconds)')
+    parser.add_argument('--output', default='emotion_model.npz', metavar='PATH',
+                        help='Where to write the model')
+    parser.add_argument('--interval', type=float, default=1 / 30,
+                        help='Seconds of recorded time between sampled frames')
+    parser.add_argument('--hidden', type=int, default=0,
+                        help='Hidden units (0 = multinomial logistic regression)')
+    parser.add_argument('--epochs', type=int, default=500)
+    parser.add_argument('--learning-rate', type=float, default=0.01)
+    parser.add_argument('--l2', type=float, default=1e-4)
+    parser.add_argument('--holdout', type=float, default=0.2,
+                        help='Fraction of frames held out for evaluation')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    logger = logging.getLogger('train')
+    quiet = logging.getLogger('train.replay')
+    quiet.setLevel(logging.ERROR)
+
+    frames, label_names = load_dataset(args.sessions, args.interval, quiet)
+    labels = tuple(sorted(set(label_names)))
+    targets = np.array([labels.index(label) for label in label_names])
+    logger.info(f"{len(frames)} frames, labels: "
+                + ", ".join(f"{label}={int((targets == i).sum())}" for i, label in enumerate(labels)))
+
+    rng = np.random.default_rng(args.seed)
+    order = rng.permutation(len(frames))
+    n_holdout = int(len(frames) * args.holdout)
+    test, train = order[:n_holdout], order[n_holdout:]
+
+    model = train_model(frames[train], targets[train], labels, hidden=args.hidden, epochs=args.epochs,
+                        learning_rate=args.learning_rate, l2=args.l2, seed=args.seed, logger=logger)
+
+    # Batch path for evaluation
+    for name, subset in (('train', train), ('holdout', test)):
+        if len(subset):
+            predicted = model.score_batch(frames[subset]).argmax(axis=1)
+            logger.info(f"{name} accuracy: {(predicted == targets[subset]).mean():.3f} ({len(subset)} frames)")
+
+    # Per-tick inference cost
+    frame = frames[0]
+    for _ in range(100):
+        model.score(frame)
+    start = time.perf_counter()
+    for _ in range(1000):
+        model.score(frame)
+    logger.info(f"Single-frame inference: {(time.perf_counter() - start) / 1000 * 1e6:.1f} us")
+
+    model.save(args.output)
+    logger.info(f"Model written to {args.output}")
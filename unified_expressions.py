@@ -1,3 +1,5 @@
+from types import MappingProxyType
+
 """
 FACIAL_PARAMS = {
     # Base VRC Eye params
@@ -333,5 +335,41 @@ FACIAL_PARAMS = {
     "NoseSneerLeft2": {"value": 0, "alt_names": ["NoseSneerLeft2"]},
     "NoseSneerRight2": {"value": 0, "alt_names": ["NoseSneerRight2"]},
     "NoseSneerLeft4": {"value": 0, "alt_names": ["NoseSneerLeft4"]},
-    "NoseSneerRight4": {"value": 0, "alt_names": ["NoseSneerRight4"]}
+    "NoseSneerRight4": {"value": 0, "alt_names": ["NoseSneerRight4"]},
+
+    # Values reconstructed from binary-encoded parameters (see binary_params.py)
+    "smileSadLeft": {"value": 0, "alt_names": ["SmileSadLeft"]},            # Decoded -1..1; negative = sad, positive = smile
+    "smileSadRight": {"value": 0, "alt_names": ["SmileSadRight"]},
+    "smileFrownLeft": {"value": 0, "alt_names": ["SmileFrownLeft"]},
+    "smileFrownRight": {"value": 0, "alt_names": ["SmileFrownRight"]},
+    "noseSneer": {"value": 0, "alt_names": ["NoseSneer"]},
+    "cheekSquint": {"value": 0, "alt_names": ["CheekSquint"]}
 }
+
+
+# Fixed slot layout for array-backed consumers (scoring engine, state store, etc.)
+PARAM_NAMES = tuple(FACIAL_PARAMS)
+PARAM_INDEX = {name: slot for slot, name in enumerate(PARAM_NAMES)}
+
+
+def build_alias_table(facial_params, param_index):
+    """
+    Map every standard and alternate parameter name to its slot.
+
+    Args:
+        facial_params (dict): Parameter table in the FACIAL_PARAMS format
+        param_index (dict): Standard name -> slot
+
+    Returns:
+        MappingProxyType: Read-only name -> slot mapping
+    """
+    # Later entries win, matching the order FACIAL_PARAMS is declared in
+    name_mapping = {}
+    for std_name, data in facial_params.items():
+        name_mapping[std_name] = std_name
+        for alt_name in data["alt_names"]:
+            name_mapping[alt_name] = std_name
+    return MappingProxyType({name: param_index[std] for name, std in name_mapping.items()})
+
+
+PARAM_ALIASES = build_alias_table(FACIAL_PARAMS, PARAM_INDEX)